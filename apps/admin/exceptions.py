@@ -0,0 +1,15 @@
+from fastapi import HTTPException
+
+
+class ArtifactReloadException(HTTPException):
+    def __init__(self, error, active_version):
+        detail = (f"Falha ao recarregar os artefatos: {error}. "
+                  f"Versão ativa mantida: {active_version}")
+        super().__init__(status_code=500, detail=detail)
+
+
+class AdminTokenInvalidException(HTTPException):
+    def __init__(self):
+        detail = ("Token de administração inválido. Necessário o header "
+                  "X-Admin-Token (a recarga fica desativada sem ADMIN_TOKEN)")
+        super().__init__(status_code=403, detail=detail)
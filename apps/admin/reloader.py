@@ -0,0 +1,140 @@
+import os
+import time
+import asyncio
+import logging
+
+from apps.admin.exceptions import ArtifactReloadException
+from settings import config, artifact_paths
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ArtifactReloader:
+    """
+    Troca o bundle de artefatos do worker sem reiniciá-lo.
+
+    O novo bundle é carregado por `load_state` e aquecido por `warmup` em
+    uma thread, fora do event loop, enquanto o estado atual continua
+    atendendo. Só então `app.state` passa a apontar para o novo estado, em
+    uma única atribuição: as requisições em andamento mantêm a referência
+    ao estado antigo e terminam na versão com que começaram.
+
+    Uma falha ao carregar ou aquecer o bundle mantém a versão ativa e o
+    vocabulário com que o `Car` é validado, que só troca em `activate`.
+    """
+
+    def __init__(self, app, load_state, warmup, artifacts_dir: str):
+        self.app = app
+        self.load_state = load_state
+        self.warmup = warmup
+        self.artifacts_dir = artifacts_dir
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self.loaded_at = None
+        self.previous_version = None
+        self._lock = None
+        self._signature = None
+        self._watch_task = None
+
+    def signature(self) -> tuple:
+        """
+        (path, mtime, size) of every file of the bundle, used to detect
+        changes in `artifacts_dir`.
+        """
+        signature = []
+        for path in artifact_paths(self.artifacts_dir).values():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signature.append((path, None, None))
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def activate(self, state):
+        """
+        Makes `state` the one served by the application.
+        """
+        state.RELOADER = self
+        # O cache passa a responder apenas pela nova versão
+        state.PREDICTION_CACHE.set_version(state.MODEL_VERSION)
+        # O Car passa a validar contra o vocabulário do novo estado
+        config.set_valid_brands(state.BRAND_MODELS_BODYWORK)
+        config.set_vocabulary(state.VOCABULARY)
+
+        previous = getattr(self.app.state, 'MODEL_VERSION', None)
+        self.app.state = state
+        if previous is not None and previous != state.MODEL_VERSION:
+            self.previous_version = previous
+        self.loaded_at = time.time()
+        self._signature = self.signature()
+
+    async def reload(self) -> dict:
+        """
+        Loads, warms and activates the bundle currently in `artifacts_dir`.
+        Concurrent calls are serialized.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            try:
+                state = await loop.run_in_executor(
+                    None, self.load_state, self.artifacts_dir)
+                await loop.run_in_executor(None, self.warmup, state)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.exception("Falha ao recarregar os artefatos de %s",
+                                 self.artifacts_dir)
+                raise ArtifactReloadException(
+                    e, self.app.state.MODEL_VERSION) from e
+
+            self.activate(state)
+            self.reloads += 1
+            self.last_error = None
+            elapsed = time.perf_counter() - started
+            logger.info("Artefatos recarregados: versão %s em %.2fs",
+                        state.MODEL_VERSION, elapsed)
+            return {**self.stats(), "reload_seconds": elapsed}
+
+    async def watch(self, interval: float):
+        """
+        Reloads the bundle whenever one of its files changes. A bundle that
+        fails to load is only retried after it changes again.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            signature = self.signature()
+            if signature == self._signature:
+                continue
+            self._signature = signature
+            try:
+                await self.reload()
+            except ArtifactReloadException:
+                pass
+
+    def start_watching(self, interval: float):
+        self._watch_task = asyncio.ensure_future(self.watch(interval))
+
+    def stop_watching(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    def stats(self) -> dict:
+        return {
+            "model_version": self.app.state.MODEL_VERSION,
+            "previous_version": self.previous_version,
+            "artifacts_dir": self.artifacts_dir,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "watching": self._watch_task is not None,
+        }
@@ -0,0 +1,55 @@
+import os
+
+from fastapi import APIRouter, Request
+
+from apps.admin.exceptions import AdminTokenInvalidException
+from apps.auth.middlewares import allowed_token_hashes, token_authorized
+
+router = APIRouter()
+
+# A recarga força uma carga completa e o aquecimento: exige, além do token
+# da API, um token de administração próprio (sem ele, fica desativada)
+ADMIN_TOKEN_HASHES = allowed_token_hashes(
+    os.getenv("ADMIN_TOKEN"), os.getenv("ADMIN_TOKEN_HASHES"))
+
+
+def _admin_token(scope) -> bytes:
+    for name, value in scope["headers"]:
+        if name == b"x-admin-token":
+            return value
+    return b""
+
+
+@router.post("/reload", response_model=dict)
+async def reload_artifacts(request: Request):
+    """
+    Objetivo:
+    - Recarregar o bundle de artefatos (modelo, scaler, encoder, esquema e
+      dataset de referência) de ARTIFACTS_DIR sem reiniciar o worker.
+
+    Descrição:
+    - O novo bundle é carregado e aquecido em segundo plano; as requisições
+      em andamento terminam na versão anterior.
+    - Em caso de falha a versão ativa é mantida e o erro é retornado com
+      status code 500.
+    - Em deploys com vários workers, cada worker recarrega apenas a si
+      mesmo; prefira ARTIFACTS_WATCH_INTERVAL nesse caso.
+    - Exige o header X-Admin-Token com o ADMIN_TOKEN (403 sem ele); sem
+      ADMIN_TOKEN/ADMIN_TOKEN_HASHES definidos, a recarga manual fica
+      desativada.
+
+    Retorna:
+    - JSON com a versão ativa, a anterior e os contadores de recargas.
+    """
+    if not token_authorized(_admin_token(request.scope), ADMIN_TOKEN_HASHES):
+        raise AdminTokenInvalidException()
+    return await request.app.state.RELOADER.reload()
+
+
+@router.get("/artifacts", response_model=dict)
+async def artifacts_status(request: Request):
+    """
+    Returns the active artifacts version, where it was loaded from and the
+    reload counters.
+    """
+    return request.app.state.RELOADER.stats()
@@ -1,17 +1,66 @@
 import os
+import hmac
+import json
+import hashlib
 
 from dotenv import load_dotenv
-from fastapi import Request, status
-from starlette.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+
+from apps.auth.utils import hash_auth_token
 
 load_dotenv()
 
 
 AUTH_TOKEN = os.getenv("AUTH_TOKEN")
+AUTH_TOKEN_HASHES = os.getenv("AUTH_TOKEN_HASHES")
+
+PUBLIC_PATHS = frozenset(
+    ["/docs", "/openapi.json", "/metrics", "/health/live", "/health/ready"])
+
+UNAUTHORIZED_BODY = json.dumps(
+    {"detail": "Token inválido. Necessário autenticação com Bearer Token"},
+    ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+UNAUTHORIZED_HEADERS = [
+    (b"content-length", str(len(UNAUTHORIZED_BODY)).encode()),
+    (b"content-type", b"application/json"),
+]
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+def allowed_token_hashes(tokens: str = AUTH_TOKEN,
+                         hashes: str = AUTH_TOKEN_HASHES) -> tuple:
+    """
+    SHA-256 digests of the accepted tokens: the comma-separated tokens of
+    AUTH_TOKEN and the comma-separated hex digests of AUTH_TOKEN_HASHES
+    (see `apps.auth.utils`), so tokens do not need to live in plain text.
+    """
+    digests = {bytes.fromhex(hash_auth_token(token.strip()))
+               for token in (tokens or "").split(",") if token.strip()}
+    digests.update(bytes.fromhex(digest.strip())
+                   for digest in (hashes or "").split(",") if digest.strip())
+    return tuple(digests)
+
+
+def token_authorized(token: bytes, token_hashes: tuple) -> bool:
+    """
+    Compares the SHA-256 of `token` with every accepted digest, in
+    constant time.
+    """
+    digest = hashlib.sha256(token).digest()
+    # Sem curto-circuito: o tempo não depende de qual token casou
+    authorized = False
+    for allowed in token_hashes:
+        authorized |= hmac.compare_digest(digest, allowed)
+    return authorized
+
+
+def _bearer_token(scope) -> bytes:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            return value[7:] if value.startswith(b"Bearer ") else value
+    return b""
+
+
+class AuthMiddleware:
     """
     Middleware for application access authorization.
 
@@ -19,21 +68,29 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
 
     @token_fixo: string (Fixed token) (provide in header)
+
+    Middleware ASGI puro: sem a task e o wrapper de streaming do corpo do
+    BaseHTTPMiddleware. O token recebido é comparado pelo seu SHA-256 com
+    cada token aceito, em tempo constante.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        token = request.headers.get("Authorization", "").replace("Bearer ", "")
-
-        if request.url.path in ["/docs", "/openapi.json"]:
-            response = await call_next(request)
-            return response
-
-        if token != AUTH_TOKEN:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={
-                    "detail": "Token inválido. Necessário autenticação com Bearer Token",
-                }
-            )
-        response = await call_next(request)
-        return response
+    def __init__(self, app, token_hashes=None):
+        self.app = app
+        self.token_hashes = tuple(
+            allowed_token_hashes() if token_hashes is None else token_hashes)
+
+    def is_authorized(self, token: bytes) -> bool:
+        return token_authorized(token, self.token_hashes)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["path"] in PUBLIC_PATHS
+                or self.is_authorized(_bearer_token(scope))):
+            await self.app(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_401_UNAUTHORIZED,
+            "headers": UNAUTHORIZED_HEADERS,
+        })
+        await send({"type": "http.response.body", "body": UNAUTHORIZED_BODY})
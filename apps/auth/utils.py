@@ -16,3 +16,20 @@ def generate_auth_token():
         json.dumps(
             data,
             sort_keys=True).encode()).hexdigest()
+
+
+def hash_auth_token(token) -> str:
+    """
+    SHA-256 hex digest of a token, the form accepted in AUTH_TOKEN_HASHES.
+    """
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.sha256(token).hexdigest()
+
+
+if __name__ == "__main__":
+    # Gera um token novo: o token vai para o cliente e o hash para
+    # AUTH_TOKEN_HASHES
+    token = generate_auth_token()
+    print(f"token: {token}")
+    print(f"hash:  {hash_auth_token(token)}")
@@ -0,0 +1,123 @@
+import time
+import asyncio
+import bisect
+import logging
+
+from apps.car.executor import PredictionExecutor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+QUEUE_DELAY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250]
+
+
+class MicroBatcher:
+    """
+    Agrupa previsões individuais concorrentes em uma única chamada ao modelo.
+
+    Cada `predict` entra em uma fila; a fila é despachada quando atinge
+    `max_batch_size` itens ou quando a janela de `window_ms` do primeiro
+    item expira. O lote inteiro é previsto de uma vez por `predict_batch`
+    (executado no `PredictionExecutor`) e cada resultado é devolvido à
+    requisição que o aguarda.
+
+    Mantém a distribuição do tamanho dos lotes e do tempo de espera na fila.
+    """
+
+    def __init__(
+            self,
+            predict_batch,
+            executor: PredictionExecutor,
+            window_ms: float = 3.0,
+            max_batch_size: int = 64):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+        self.batches = 0
+        self.items = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.queue_delay_counts = [0] * (len(QUEUE_DELAY_BUCKETS_MS) + 1)
+        self.queue_delay_sum_ms = 0.0
+        self.queue_delay_max_ms = 0.0
+
+    async def predict(self, car: dict):
+        """
+        Enqueues one car and waits for its predicted price.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((car, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self._observe(batch)
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list):
+        cars = [car for car, _, _ in batch]
+        try:
+            predictions = await self.executor.run(self.predict_batch, cars)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def _observe(self, batch: list):
+        now = time.perf_counter()
+        self.batches += 1
+        self.items += len(batch)
+        self.batch_size_counts[
+            bisect.bisect_left(BATCH_SIZE_BUCKETS, len(batch))] += 1
+        for _, _, enqueued_at in batch:
+            delay_ms = (now - enqueued_at) * 1000
+            self.queue_delay_counts[
+                bisect.bisect_left(QUEUE_DELAY_BUCKETS_MS, delay_ms)] += 1
+            self.queue_delay_sum_ms += delay_ms
+            self.queue_delay_max_ms = max(self.queue_delay_max_ms, delay_ms)
+
+    def stats(self) -> dict:
+        """
+        Batch size and queueing delay distributions. Each bucket counts the
+        observations above the previous bound and up to its own bound.
+        """
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0,
+            "batch_size": dict(zip(
+                [str(b) for b in BATCH_SIZE_BUCKETS] + ["+Inf"],
+                self.batch_size_counts)),
+            "queue_delay_ms": dict(zip(
+                [str(b) for b in QUEUE_DELAY_BUCKETS_MS] + ["+Inf"],
+                self.queue_delay_counts)),
+            "avg_queue_delay_ms":
+                self.queue_delay_sum_ms / self.items if self.items else 0,
+            "max_queue_delay_ms": self.queue_delay_max_ms,
+        }
@@ -0,0 +1,173 @@
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from apps.car.utils import PRICE_FORMATS, price_values
+from apps.car.inference import predict_cars
+from apps.car.feature_store import FeatureStatistics
+from apps.car.reference_data import RowIndex
+from apps.metrics.stages import stages_not_recorded
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPRESENTATIVE_COLUMNS = [
+    'year_model',
+    'mileage',
+    'gear',
+    'fuel',
+    'bodywork',
+    'city',
+    'state']
+
+
+def _brand_model_groups(df: pd.DataFrame, index: RowIndex = None):
+    if index is None:
+        return df.groupby(
+            ['brand', 'model'], sort=False, observed=True).indices.items()
+    return (
+        ((brand, model), positions)
+        for brand, brand_positions in index.groups('brand').items()
+        for model, positions in index.subgroups(
+            brand_positions, 'model').items()
+    )
+
+
+def representative_configurations(
+        df: pd.DataFrame,
+        index: RowIndex = None) -> dict:
+    """
+    Calcula, para cada (marca, modelo) do dataset, a combinação mais
+    frequente de características (moda de cada coluna, escolhendo o menor
+    valor em caso de empate, como `DataFrame.mode().iloc[0]`).
+    """
+    configurations = {}
+    for (brand, model), positions in _brand_model_groups(df, index):
+        group = df.iloc[positions]
+        configuration = {
+            column: group[column].mode().iloc[0]
+            for column in REPRESENTATIVE_COLUMNS
+        }
+        configuration['year_model'] = int(configuration['year_model'])
+        configuration['mileage'] = float(configuration['mileage'])
+        configurations[(brand, model)] = configuration
+    return configurations
+
+
+class BrandPredictions:
+    """
+    Previsões de `brand_predict` pré-calculadas por marca.
+
+    As combinações representativas de cada (marca, modelo) dependem apenas
+    do dataset estático e são calculadas uma única vez no carregamento.
+    As previsões de uma marca são feitas em uma única chamada ao modelo,
+    na primeira consulta (ou no warmup), formatadas de uma vez em cada
+    formato de preço e então servidas do cache.
+    """
+
+    def __init__(
+            self,
+            df: pd.DataFrame,
+            brand_models_bodywork: dict,
+            index: RowIndex = None):
+        self.brand_models_bodywork = brand_models_bodywork
+        self.configurations = representative_configurations(df, index)
+        self._predictions = {}
+        self._lock = threading.Lock()
+
+    def cached(self, brand: str, price_format: str = "brl"):
+        """
+        Returns the predictions of `brand` if already computed, else None.
+        """
+        predictions = self._predictions.get(brand)
+        if predictions is None:
+            return None
+        return predictions[price_format]
+
+    def get(
+            self,
+            brand: str,
+            MODEL,
+            NORMALIZER: 'StandardScaler',
+            TRANSFORMER: 'OneHotEncoder',
+            feature_names: list,
+            stats: FeatureStatistics,
+            price_format: str = "brl") -> dict:
+        """
+        Returns the predictions of every model of `brand` with records in
+        the dataset, keyed by model name, with prices in `price_format`.
+        """
+        predictions = self._predictions.get(brand)
+        if predictions is not None:
+            return predictions[price_format]
+
+        with self._lock:
+            if brand not in self._predictions:
+                self._predictions[brand] = self._predict_brand(
+                    brand, MODEL, NORMALIZER, TRANSFORMER, feature_names,
+                    stats)
+            return self._predictions[brand][price_format]
+
+    def clear(self):
+        """
+        Drops the computed predictions; they are recomputed on demand.
+        """
+        with self._lock:
+            self._predictions.clear()
+
+    def warmup(self, MODEL, NORMALIZER, TRANSFORMER, feature_names, stats):
+        """
+        Computes the predictions of every brand ahead of the first request,
+        without recording their stages in the metrics.
+        """
+        with stages_not_recorded():
+            for brand in self.brand_models_bodywork:
+                self.get(brand, MODEL, NORMALIZER, TRANSFORMER, feature_names,
+                         stats)
+        logger.info("Previsões pré-calculadas para %d marcas",
+                    len(self._predictions))
+
+    def _predict_brand(
+            self, brand, MODEL, NORMALIZER, TRANSFORMER, feature_names,
+            stats) -> dict:
+        rows = []
+        for model in self.brand_models_bodywork.get(brand, {}):
+            configuration = self.configurations.get((brand, model))
+            if configuration is None:
+                continue  # Skip if no records exist
+            rows.append({'brand': brand, 'model': model, **configuration})
+
+        if not rows:
+            return {price_format: {} for price_format in PRICE_FORMATS}
+
+        # Transform and predict every model of the brand at once
+        predicted_prices = predict_cars(
+            MODEL, NORMALIZER, TRANSFORMER, feature_names, stats, rows)
+
+        return {
+            price_format: self._entries(
+                rows, price_values(predicted_prices, price_format))
+            for price_format in PRICE_FORMATS
+        }
+
+    @staticmethod
+    def _entries(rows: list, prices: list) -> dict:
+        return {
+            row['model']: {
+                "model": row['model'],
+                "year_model": row['year_model'],
+                "mileage": row['mileage'],
+                "gear": row['gear'],
+                "fuel": row['fuel'],
+                "bodywork": row['bodywork'],
+                "city": row['city'],
+                "state": row['state'],
+                "predicted_value": price
+            }
+            for row, price in zip(rows, prices)
+        }
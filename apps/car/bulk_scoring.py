@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from apps.car.columnar import read_dataset
+from apps.car.data_processing import transform_data, CATEGORICAL_COLUMNS
+from apps.car.feature_store import FeatureStatistics
+from apps.car.model_schema import ModelSchema
+from settings import ARTIFACTS_DIR, artifact_paths
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional
+    pq = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INPUT_COLUMNS = ['brand', 'model', 'year_model', 'mileage', 'gear', 'fuel',
+                 'bodywork', 'city', 'state']
+NUMERIC_INPUT_COLUMNS = ['year_model', 'mileage']
+
+# Artefatos do processo (no pai e em cada worker do pool)
+_scorer = None
+
+
+class BulkScorer:
+    """
+    Precifica lotes de carros (DataFrames no formato do machinetable.csv)
+    com os artefatos carregados uma única vez.
+
+    Cada lote é validado, transformado com `transform_data` e previsto em
+    uma única chamada ao modelo. Linhas com campos ausentes ou inválidos
+    não interrompem o lote: recebem `predicted_price` vazio e o motivo na
+    coluna `error`.
+    """
+
+    def __init__(self, MODEL, NORMALIZER, TRANSFORMER, feature_names,
+                 stats: FeatureStatistics):
+        self.MODEL = MODEL
+        self.NORMALIZER = NORMALIZER
+        self.TRANSFORMER = TRANSFORMER
+        self.feature_names = feature_names
+        self.stats = stats
+
+    @classmethod
+    def load(cls, artifacts_dir: str = ARTIFACTS_DIR) -> "BulkScorer":
+        """
+        Loads the artifact bundle of `artifacts_dir`, like the API.
+        """
+        paths = artifact_paths(artifacts_dir)
+        MODEL = joblib.load(paths['model'])
+        MODEL.n_jobs = 1  # o paralelismo vem dos processos
+        return cls(
+            MODEL,
+            joblib.load(paths['normalizer']),
+            joblib.load(paths['transformer']),
+            ModelSchema.load(paths['model_schema']).feature_names,
+            FeatureStatistics.from_dataframe(read_dataset(paths['original_df'])))
+
+    def score(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns `chunk` with the `predicted_price` (in the unit of the
+        dataset price) and `error` columns appended.
+        """
+        missing = [column for column in INPUT_COLUMNS
+                   if column not in chunk.columns]
+        if missing:
+            raise ValueError(f"Colunas ausentes: {', '.join(missing)}")
+
+        cars = pd.DataFrame(index=chunk.index)
+        for column in NUMERIC_INPUT_COLUMNS:
+            cars[column] = pd.to_numeric(chunk[column], errors='coerce')
+        for column in CATEGORICAL_COLUMNS:
+            cars[column] = chunk[column].astype('string').str.strip().str.upper()
+        cars = cars[INPUT_COLUMNS]
+
+        invalid = cars.isna()
+        valid = ~invalid.any(axis=1).to_numpy()
+
+        predicted = np.full(len(chunk), np.nan)
+        if valid.any():
+            input_data = cars[valid].astype(
+                {column: object for column in CATEGORICAL_COLUMNS})
+            input_data['year_model'] = input_data['year_model'].astype(int)
+            features = transform_data(
+                input_data.reset_index(drop=True), self.NORMALIZER,
+                self.TRANSFORMER, self.feature_names, self.stats)
+            predicted[valid] = self.MODEL.predict(features.to_numpy())
+
+        errors = np.full(len(chunk), '', dtype=object)
+        for position in np.flatnonzero(~valid):
+            fields = invalid.columns[invalid.iloc[position].to_numpy()]
+            errors[position] = f"campos ausentes ou inválidos: {', '.join(fields)}"
+
+        result = chunk.copy()
+        result['predicted_price'] = predicted.round(2)
+        result['error'] = errors
+        return result
+
+
+def _init_worker(artifacts_dir: str):
+    global _scorer
+    if _scorer is None:  # com fork os artefatos já vêm do processo pai
+        _scorer = BulkScorer.load(artifacts_dir)
+
+
+def _score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    with threadpool_limits(limits=1):
+        return _scorer.score(chunk)
+
+
+def read_chunks(path: str, chunk_size: int, offset: int = 0):
+    """
+    Streams the rows of a CSV or Parquet file from `offset` on, in
+    DataFrames of at most `chunk_size` rows.
+    """
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise RuntimeError("Leitura de Parquet requer o pacote pyarrow")
+        skipped = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            if skipped + batch.num_rows <= offset:
+                skipped += batch.num_rows
+                continue
+            chunk = batch.to_pandas()
+            if skipped < offset:
+                chunk = chunk.iloc[offset - skipped:]
+                skipped = offset
+            yield chunk
+        return
+
+    skiprows = (lambda line: 0 < line <= offset) if offset else None
+    yield from pd.read_csv(path, chunksize=chunk_size, skiprows=skiprows)
+
+
+def count_rows(path: str):
+    """
+    Number of rows of a Parquet file (from its metadata); None for CSV.
+    """
+    if path.endswith('.parquet') and pq is not None:
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+
+class Checkpoint:
+    """
+    Progress of an output file: input rows already written and the output
+    size after them. Saved after every chunk, next to the output.
+    """
+
+    def __init__(self, output_path: str):
+        self.path = output_path + '.progress'
+        self.rows = 0
+        self.output_bytes = 0
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as file:
+            data = json.load(file)
+        self.rows = data['rows']
+        self.output_bytes = data['output_bytes']
+        return True
+
+    def save(self, rows: int, output_bytes: int):
+        self.rows = rows
+        self.output_bytes = output_bytes
+        with open(self.path + '.tmp', 'w') as file:
+            json.dump({'rows': rows, 'output_bytes': output_bytes}, file)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def score_file(
+        input_path: str,
+        output_path: str,
+        chunk_size: int = 10000,
+        workers: int = 1,
+        offset: int = 0,
+        resume: bool = False,
+        artifacts_dir: str = ARTIFACTS_DIR) -> dict:
+    """
+    Precifica um arquivo inteiro em streaming, com memória limitada.
+
+    Lê `chunk_size` linhas por vez, precifica cada lote (em até `workers`
+    processos, com no máximo dois lotes em andamento por worker) e grava os
+    resultados no CSV de saída na ordem da entrada, lote a lote. Com
+    `resume`, continua da última linha registrada no checkpoint, descartando
+    uma escrita interrompida no meio.
+    """
+    global _scorer
+    checkpoint = Checkpoint(output_path)
+    if resume and checkpoint.load():
+        offset = checkpoint.rows
+        with open(output_path, 'r+b') as file:
+            file.truncate(checkpoint.output_bytes)
+        logger.info("Retomando a partir da linha %d", offset)
+        mode = 'a'
+    else:
+        mode = 'w'
+
+    total_rows = count_rows(input_path)
+    _scorer = _scorer or BulkScorer.load(artifacts_dir)
+    chunks = read_chunks(input_path, chunk_size, offset)
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(artifacts_dir,))
+        pending = collections.deque()
+
+        def results():
+            for chunk in chunks:
+                pending.append(pool.submit(_score_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    else:
+        pool = None
+
+        def results():
+            for chunk in chunks:
+                yield _score_chunk(chunk)
+
+    rows = offset
+    scored = failed = 0
+    started = time.perf_counter()
+    try:
+        with open(output_path, mode, newline='') as output:
+            for result in results():
+                output_bytes = os.fstat(output.fileno()).st_size
+                result.to_csv(output, header=output_bytes == 0, index=False)
+                output.flush()
+                rows += len(result)
+                scored += len(result)
+                failed += int((result['error'] != '').sum())
+                checkpoint.save(rows, os.fstat(output.fileno()).st_size)
+
+                elapsed = time.perf_counter() - started
+                progress = f"{rows}/{total_rows}" if total_rows else f"{rows}"
+                logger.info("%s linhas | %.0f linhas/s | %d inválidas",
+                            progress, scored / elapsed, failed)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "scored": scored,
+        "failed": failed,
+        "seconds": elapsed,
+        "rows_per_second": scored / elapsed if elapsed else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Precifica um arquivo CSV/Parquet de inventário inteiro')
+    parser.add_argument('input', help='CSV ou .parquet no formato do machinetable.csv')
+    parser.add_argument('--output', required=True, help='CSV de saída')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processos de previsão (padrão: 1)')
+    parser.add_argument('--offset', type=int, default=0,
+                        help='primeira linha da entrada a precificar')
+    parser.add_argument('--resume', action='store_true',
+                        help='continua do checkpoint <output>.progress')
+    parser.add_argument('--artifacts-dir', default=ARTIFACTS_DIR)
+    args = parser.parse_args()
+
+    summary = score_file(
+        args.input, args.output, chunk_size=args.chunk_size,
+        workers=args.workers, offset=args.offset, resume=args.resume,
+        artifacts_dir=args.artifacts_dir)
+    json.dump(summary, sys.stdout)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
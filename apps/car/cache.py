@@ -0,0 +1,97 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Cache LRU em memória para previsões de preço.
+
+    As chaves são o hash canônico dos campos do `Car` junto com a versão
+    dos artefatos carregados, de modo que uma previsão nunca é reaproveitada
+    entre modelos diferentes. O tamanho é limitado (`maxsize`), as entradas
+    menos usadas são descartadas primeiro e, opcionalmente, expiram após
+    `ttl` segundos. `maxsize=0` desativa o cache.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(car: dict, model_version: str) -> str:
+        """
+        Builds the canonical cache key of a car payload.
+        """
+        payload = json.dumps(
+            car, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(
+            f"{model_version}:{payload}".encode()).hexdigest()
+
+    def get(self, key: str):
+        """
+        Returns the cached value for `key`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def set_version(self, version: str):
+        """
+        Registers the active artifacts version, dropping every entry when
+        the artifacts change.
+        """
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,117 @@
+import json
+import hashlib
+
+import pandas as pd
+from fastapi import Request, Response
+
+from settings import CATALOGUE_CACHE_MAX_AGE
+
+# Páginas pré-calculadas de /car/list/{category}: todo page_size até o
+# maior entre este valor e o total da categoria
+DEFAULT_PAGE_SIZE = 10
+
+
+class EncodedResponse:
+    """
+    JSON body encoded once, with its strong ETag.
+    """
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, content):
+        # Mesma serialização do JSONResponse do Starlette
+        self.body = json.dumps(
+            content, ensure_ascii=False, allow_nan=False, indent=None,
+            separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match usa comparação fraca: W/"x" casa com "x"
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag
+               for tag in if_none_match.split(','))
+
+
+def catalogue_response(request: Request, encoded: EncodedResponse) -> Response:
+    """
+    Serves a pre-encoded catalogue body with ETag and Cache-Control,
+    answering 304 when the client already holds the same version.
+    """
+    headers = {
+        'ETag': encoded.etag,
+        'Cache-Control': f'public, max-age={CATALOGUE_CACHE_MAX_AGE}',
+    }
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and _etag_matches(if_none_match, encoded.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=encoded.body, media_type='application/json',
+                    headers=headers)
+
+
+def _pages(category: str, values: list, page_size: int) -> dict:
+    total_results = len(values)
+    total_pages = (total_results + page_size - 1) // page_size
+    pages = {}
+    # Categoria vazia: a rota sempre respondeu a página 0
+    for page in range(1, total_pages + 1) if total_pages else [0]:
+        start = (page - 1) * page_size
+        pages[page] = EncodedResponse({
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "total_results": total_results,
+            category: values[max(start, 0):start + page_size]
+        })
+    return pages
+
+
+class Catalogue:
+    """
+    Respostas das rotas de catálogo (/car/list/{category}, /car/list-brands
+    e /car/list-states) materializadas uma vez por carga dos dados, já
+    serializadas: toda página de cada categoria, a lista de marcas, os
+    modelos de cada marca, as carrocerias de cada modelo, os estados e as
+    cidades de cada estado.
+    """
+
+    def __init__(self, data_valid: pd.DataFrame, state_cities: pd.DataFrame,
+                 brand_models_bodywork: dict):
+        self.values = {}
+        self.categories = {}
+        for category in data_valid.columns:
+            values = data_valid[category].dropna().unique().tolist()
+            self.values[category] = values
+            self.categories[category] = {
+                page_size: _pages(category, values, page_size)
+                for page_size in range(
+                    1, max(len(values), DEFAULT_PAGE_SIZE) + 1)}
+
+        self.brands = EncodedResponse(
+            {"brands": list(brand_models_bodywork.keys())})
+        self.models = {
+            brand: EncodedResponse({"brand": brand, "models": list(models.keys())})
+            for brand, models in brand_models_bodywork.items()}
+        self.bodyworks = {
+            (brand, model): EncodedResponse(
+                {"brand": brand, "model": model, "bodyworks": bodyworks})
+            for brand, models in brand_models_bodywork.items()
+            for model, bodyworks in models.items()}
+
+        self.states = EncodedResponse({"states": state_cities.columns.tolist()})
+        self.cities = {
+            state: EncodedResponse(
+                {"state": state, "cities": state_cities[state].dropna().tolist()})
+            for state in state_cities.columns}
+
+    def category_page(self, category: str, page: int,
+                      page_size: int) -> EncodedResponse:
+        """
+        Page of a category; pages past the end return the last one, as
+        the route always did. Page sizes beyond the whole category are
+        encoded on demand (a single page).
+        """
+        pages = self.categories[category].get(page_size)
+        if pages is None:
+            pages = _pages(category, self.values[category], page_size)
+        return pages[min(page, max(pages))]
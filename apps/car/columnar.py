@@ -0,0 +1,193 @@
+import os
+import json
+import hashlib
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from settings import COLUMNAR_DATASETS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+CODES_FILE = 'codes.npy'
+
+
+def columnar_path(csv_path: str) -> str:
+    """
+    Directory of the columnar copy of `csv_path`: data/x.csv is stored in
+    data/columnar/x/.
+    """
+    directory, filename = os.path.split(csv_path)
+    return os.path.join(directory, 'columnar', os.path.splitext(filename)[0])
+
+
+def _sha256(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def save_columnar(df: pd.DataFrame, output_dir: str, source_sha256: str = None):
+    """
+    Grava um DataFrame em formato colunar binário.
+
+    As colunas numéricas de um mesmo dtype formam um único array 2D em
+    ordem Fortran (`<dtype>.npy`), com cada coluna contígua. As colunas de
+    texto são gravadas como códigos inteiros (`codes.npy`, -1 para nulos)
+    e o vocabulário de cada uma fica no `meta.json`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    columns = []
+    blocks = {}
+    codes = []
+    for name in df.columns:
+        series = df[name]
+        if series.dtype == object:
+            values = series.dropna()
+            if not all(isinstance(value, str) for value in values):
+                raise ValueError(f"Coluna {name} mistura texto e outros tipos")
+            column_codes, categories = pd.factorize(series, sort=True)
+            columns.append({'name': name, 'dtype': 'object',
+                            'index': len(codes),
+                            'categories': categories.tolist()})
+            codes.append(column_codes.astype(np.int32))
+        elif series.dtype.kind in 'biuf':
+            block = blocks.setdefault(series.dtype.name, [])
+            columns.append({'name': name, 'dtype': series.dtype.name,
+                            'index': len(block)})
+            block.append(series.to_numpy())
+        else:
+            raise ValueError(f"dtype não suportado na coluna {name}: {series.dtype}")
+
+    for dtype, arrays in blocks.items():
+        np.save(os.path.join(output_dir, f'{dtype}.npy'),
+                np.asfortranarray(np.column_stack(arrays)))
+    if codes:
+        np.save(os.path.join(output_dir, CODES_FILE),
+                np.asfortranarray(np.column_stack(codes)))
+
+    with open(os.path.join(output_dir, META_FILE), 'w') as file:
+        json.dump({'source_sha256': source_sha256, 'n_rows': len(df),
+                   'columns': columns}, file, ensure_ascii=False)
+
+
+def load_columnar(
+        input_dir: str,
+        mmap: bool = True,
+        categorical: bool = False) -> pd.DataFrame:
+    """
+    Lê um DataFrame gravado por `save_columnar`, com os mesmos dtypes do
+    `pd.read_csv` original. Com `categorical` as colunas de texto são
+    montadas como `category` diretamente dos códigos, sem materializar as
+    strings de cada linha.
+
+    Com `mmap` os arrays são mapeados em memória. Um DataFrame só com
+    colunas numéricas de um mesmo dtype é servido diretamente do mapa
+    (somente leitura, páginas compartilhadas entre os processos); nos
+    demais a montagem do DataFrame copia os valores.
+    """
+    with open(os.path.join(input_dir, META_FILE)) as file:
+        meta = json.load(file)
+    mmap_mode = 'r' if mmap else None
+
+    blocks = {}
+    for column in meta['columns']:
+        dtype = column['dtype']
+        if dtype not in blocks:
+            filename = CODES_FILE if dtype == 'object' else f'{dtype}.npy'
+            blocks[dtype] = np.load(os.path.join(input_dir, filename),
+                                    mmap_mode=mmap_mode)
+
+    names = [column['name'] for column in meta['columns']]
+    if len(blocks) == 1 and 'object' not in blocks:
+        (block,) = blocks.values()
+        order = [column['index'] for column in meta['columns']]
+        if order != list(range(block.shape[1])):
+            block = block[:, order]
+        return pd.DataFrame(block, columns=names, copy=False)
+
+    data = {}
+    for column in meta['columns']:
+        values = blocks[column['dtype']][:, column['index']]
+        if column['dtype'] == 'object' and categorical:
+            values = pd.Categorical.from_codes(values, column['categories'])
+        elif column['dtype'] == 'object':
+            # O código -1 (nulo) indexa o NaN acrescentado ao vocabulário
+            vocabulary = np.array(column['categories'] + [np.nan],
+                                  dtype=object)
+            values = vocabulary[values]
+        data[column['name']] = values
+    return pd.DataFrame(data, columns=names)
+
+
+def build_columnar(csv_path: str, output_dir: str = None) -> str:
+    """
+    Converts `csv_path` into its columnar copy, recording the hash of the
+    source so stale copies are detected.
+    """
+    output_dir = output_dir or columnar_path(csv_path)
+    save_columnar(pd.read_csv(csv_path), output_dir, _sha256(csv_path))
+    return output_dir
+
+
+def is_fresh(csv_path: str) -> bool:
+    """
+    Whether the columnar copy of `csv_path` exists and was built from its
+    current contents. A copy without the CSV next to it is trusted.
+    """
+    meta_path = os.path.join(columnar_path(csv_path), META_FILE)
+    if not os.path.exists(meta_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    with open(meta_path) as file:
+        return json.load(file)['source_sha256'] == _sha256(csv_path)
+
+
+def read_dataset(
+        csv_path: str,
+        mmap: bool = True,
+        columnar: bool = COLUMNAR_DATASETS,
+        categorical: bool = False) -> pd.DataFrame:
+    """
+    Reads a reference dataset from its columnar copy, falling back to
+    parsing the CSV when the copy is missing or out of date. With
+    `categorical` the text columns are returned as `category`.
+    """
+    input_dir = columnar_path(csv_path)
+    if columnar and is_fresh(csv_path):
+        return load_columnar(input_dir, mmap=mmap, categorical=categorical)
+
+    if columnar and os.path.exists(input_dir):
+        logger.warning(
+            "%s desatualizado em relação a %s, lendo o CSV",
+            input_dir, csv_path)
+    df = pd.read_csv(csv_path)
+    if categorical:
+        text_columns = df.select_dtypes(object).columns
+        df[text_columns] = df[text_columns].astype('category')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Converte os CSVs de referência para o formato colunar')
+    parser.add_argument('csv_paths', nargs='+')
+    parser.add_argument('--force', action='store_true',
+                        help='reconstrói mesmo as cópias atualizadas')
+    args = parser.parse_args()
+
+    for csv_path in args.csv_paths:
+        if not args.force and is_fresh(csv_path):
+            logger.info("%s já está atualizado", columnar_path(csv_path))
+            continue
+        output_dir = build_columnar(csv_path)
+        logger.info("%s -> %s", csv_path, output_dir)
+
+
+if __name__ == '__main__':
+    main()
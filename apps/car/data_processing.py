@@ -1,66 +1,89 @@
+import time
 import logging
+from typing import TYPE_CHECKING
 
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+from apps.car.feature_store import FeatureStatistics
+from apps.metrics.stages import observe_stage
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LUXURY_BRANDS = ['AUDI', 'BMW', 'MERCEDES', 'PORSCHE']
 
-def transform_data(
+CATEGORICAL_COLUMNS = [
+    'brand',
+    'model',
+    'gear',
+    'fuel',
+    'bodywork',
+    'city',
+    'state']
+NUMERICAL_COLUMNS = [
+    'year_model',
+    'mileage',
+    'age_years',
+    'price_deviation',
+    'brand_avg_price',
+    'state_avg_price',
+    'city_avg_price',
+    'is_luxury_brand']
+
+
+def add_derived_features(
         input_data: pd.DataFrame,
-        NORMALIZER: StandardScaler,
-        TRANSFORMER: OneHotEncoder,
-        X_test: pd.DataFrame,
-        df: pd.DataFrame) -> pd.DataFrame:
-    # Adicionar features calculadas
+        stats: FeatureStatistics) -> pd.DataFrame:
+    """
+    Adds the computed numeric features (age, price means of the groups,
+    price deviation and luxury flag) to `input_data`, in place. Shared by
+    `transform_data` and the training pipeline, so the model is trained
+    on exactly the features it is served.
+    """
     current_year = pd.Timestamp.now().year
     input_data['age_years'] = current_year - input_data['year_model']
 
-    # Calcular médias dinâmicas com base nos dados
-    input_data['brand_avg_price'] = input_data['brand'].apply(
-        lambda x: df[df['brand'] == x]['price'].mean() if x in df['brand'].values else 0
-    )
-    input_data['state_avg_price'] = input_data['state'].apply(
-        lambda x: df[df['state'] == x]['price'].mean() if x in df['state'].values else 0
-    )
-    input_data['city_avg_price'] = input_data['city'].apply(
-        lambda x: df[df['city'] == x]['price'].mean() if x in df['city'].values else 0
-    )
+    # Consultar médias pré-calculadas do dataset
+    input_data['brand_avg_price'] = [
+        stats.brand_avg_price.get(x, 0) for x in input_data['brand']]
+    input_data['state_avg_price'] = [
+        stats.state_avg_price.get(x, 0) for x in input_data['state']]
+    input_data['city_avg_price'] = [
+        stats.city_avg_price.get(x, 0) for x in input_data['city']]
 
     # Calcular desvio de preço
-    def calculate_price_deviation(row):
-        group = df[(df['model'] == row['model']) & (
-            df['year_model'] == row['year_model'])]
-        group_avg_price = group['price'].mean() if not group.empty else 0
-        return group_avg_price - row['brand_avg_price']
-
-    input_data['price_deviation'] = input_data.apply(
-        calculate_price_deviation, axis=1)
+    input_data['price_deviation'] = [
+        stats.model_year_avg_price.get((model, year_model), 0) - brand_avg_price
+        for model, year_model, brand_avg_price in zip(
+            input_data['model'],
+            input_data['year_model'],
+            input_data['brand_avg_price'])
+    ]
 
     # Identificar marcas de luxo
-    input_data['is_luxury_brand'] = input_data['brand'].apply(
-        lambda x: 1 if x in ['AUDI', 'BMW', 'MERCEDES', 'PORSCHE'] else 0
-    )
+    input_data['is_luxury_brand'] = input_data['brand'].isin(
+        LUXURY_BRANDS).astype(int)
+    return input_data
+
+
+def transform_data(
+        input_data: pd.DataFrame,
+        NORMALIZER: 'StandardScaler',
+        TRANSFORMER: 'OneHotEncoder',
+        feature_names: list,
+        stats: FeatureStatistics) -> pd.DataFrame:
+    started = time.perf_counter()
+
+    # Adicionar features calculadas
+    add_derived_features(input_data, stats)
+    started = observe_stage('transform_data.group_means', started)
 
     # Separar colunas categóricas e numéricas
-    categorical_columns = [
-        'brand',
-        'model',
-        'gear',
-        'fuel',
-        'bodywork',
-        'city',
-        'state']
-    numerical_columns = [
-        'year_model',
-        'mileage',
-        'age_years',
-        'price_deviation',
-        'brand_avg_price',
-        'state_avg_price',
-        'city_avg_price',
-        'is_luxury_brand']
+    categorical_columns = CATEGORICAL_COLUMNS
+    numerical_columns = NUMERICAL_COLUMNS
 
     # Aplicar OneHotEncoder
     encoded_categorical = TRANSFORMER.transform(
@@ -71,6 +94,8 @@ def transform_data(
         index=input_data.index
     )
 
+    started = observe_stage('transform_data.one_hot', started)
+
     # Normalizar colunas numéricas
     normalized_numeric = NORMALIZER.transform(input_data[numerical_columns])
     normalized_numeric_df = pd.DataFrame(
@@ -79,14 +104,17 @@ def transform_data(
         index=input_data.index
     )
 
+    started = observe_stage('transform_data.scaling', started)
+
     # Concatenar as colunas normalizadas e codificadas
     final_input_df = pd.concat(
         [normalized_numeric_df, encoded_categorical_df], axis=1)
 
     # Garantir consistência com o treinamento
-    missing_columns = set(X_test.columns) - set(final_input_df.columns)
+    missing_columns = set(feature_names) - set(final_input_df.columns)
     for col in missing_columns:
         final_input_df[col] = 0
-    final_input_df = final_input_df[X_test.columns]  # Ordenar as colunas
+    final_input_df = final_input_df[feature_names]  # Ordenar as colunas
+    observe_stage('transform_data.column_alignment', started)
 
     return final_input_df
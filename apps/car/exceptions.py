@@ -11,3 +11,46 @@ class InvalidCategoryException(HTTPException):
         self.category = category
         detail = f"category inválido: {category}. Indique um dos seguintes categorys: {', '.join(self.VALID_CATEGORIES)}"
         super().__init__(status_code=400, detail=detail)
+
+
+class InvalidSearchTypeException(HTTPException):
+    def __init__(self, search_type, valid_types):
+        detail = f"type inválido: {search_type}. Indique um dos seguintes types: {', '.join(valid_types)}"
+        super().__init__(status_code=400, detail=detail)
+
+
+class InvalidQuantilesException(HTTPException):
+    def __init__(self, quantiles):
+        detail = f"quantiles inválido: {quantiles}. Indique valores entre 0 e 1 separados por vírgula, por exemplo 0.1,0.9"
+        super().__init__(status_code=400, detail=detail)
+
+
+class InvalidBatchPayloadException(HTTPException):
+    def __init__(self, detail):
+        super().__init__(status_code=400,
+                         detail=f"Payload de lote inválido: {detail}")
+
+
+class BatchTooLargeException(HTTPException):
+    def __init__(self, size, max_size):
+        detail = f"Lote com {size} itens excede o limite de {max_size} itens"
+        super().__init__(status_code=413, detail=detail)
+
+
+class ScanTooLargeException(HTTPException):
+    def __init__(self, size, max_size):
+        detail = f"Grade com {size} variantes excede o limite de {max_size} variantes"
+        super().__init__(status_code=413, detail=detail)
+
+
+class PredictionQueueFullException(HTTPException):
+    def __init__(self):
+        detail = "Servidor sobrecarregado: fila de previsões cheia. Tente novamente em instantes"
+        super().__init__(status_code=429, detail=detail,
+                         headers={"Retry-After": "1"})
+
+
+class PredictionTimeoutException(HTTPException):
+    def __init__(self, timeout):
+        detail = f"A previsão excedeu o tempo limite de {timeout:g} segundos"
+        super().__init__(status_code=504, detail=detail)
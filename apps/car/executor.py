@@ -0,0 +1,114 @@
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from threadpoolctl import ThreadpoolController
+
+from apps.car.exceptions import PredictionQueueFullException, PredictionTimeoutException
+from apps.metrics.stages import observe_stage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PredictionExecutor:
+    """
+    Pool de threads dedicado à inferência.
+
+    Tira do event loop do asyncio as transformações do pandas e o
+    `MODEL.predict` (que libera o GIL durante a travessia das árvores), para
+    que uma previsão lenta não bloqueie as demais rotas.
+
+    - `max_workers` threads executam as previsões;
+    - no máximo `max_queue` previsões aguardam na fila; acima disso a
+      requisição é recusada com 429 (backpressure);
+    - cada previsão tem até `timeout` segundos para terminar (504);
+    - `blas_threads` limita as threads de BLAS/OpenMP, evitando
+      oversubscription entre o pool e as bibliotecas nativas. Os limites
+      do threadpoolctl valem para o processo inteiro (e salvar/restaurar
+      por chamada não é thread-safe entre as threads do pool), então o
+      limite é aplicado uma vez por processo, com `limit_threadpools`.
+    """
+
+    def __init__(
+            self,
+            max_workers: int = 4,
+            max_queue: int = 64,
+            timeout: float = 10.0,
+            blas_threads: int = 1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.capacity = max_workers + max_queue
+        self.pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="predict")
+        self.blas_threads = blas_threads
+
+    def limit_threadpools(self):
+        """
+        Limits every BLAS/OpenMP runtime loaded in the process to
+        `blas_threads` threads. Called after the artifacts are unpickled,
+        so the runtimes loaded with a bundle are covered too.
+        """
+        ThreadpoolController().limit(limits=self.blas_threads)
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise PredictionQueueFullException()
+            self.pending += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.pending -= 1
+
+    def _call(self, submitted: float, func, *args):
+        # Tempo de espera na fila até uma thread do pool ficar livre
+        observe_stage('executor_queue', submitted)
+        return func(*args)
+
+    async def run(self, func, *args):
+        """
+        Runs `func(*args)` in the pool and awaits its result.
+
+        The slot is released only when the work actually finishes, so
+        predictions that outlived their timeout still count against the
+        queue until their thread is free again.
+        """
+        self._acquire()
+        try:
+            future = self._executor.submit(
+                self._call, time.perf_counter(), func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise PredictionTimeoutException(self.timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,253 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from apps.car.data_processing import LUXURY_BRANDS
+from apps.car.feature_store import FeatureStatistics
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+
+class FeatureLayout:
+    """
+    Layout compilado do vetor de features esperado pelo modelo.
+
+    Construído uma única vez a partir do `NORMALIZER`, do `TRANSFORMER` e da
+    ordem de colunas do treinamento. Escreve um carro diretamente em uma
+    linha float64, aplicando a normalização inline e marcando as posições
+    do one-hot por consulta de índice, sem DataFrames intermediários.
+
+    Produz os mesmos valores de `transform_data` para uma única linha.
+    """
+
+    def __init__(
+            self,
+            NORMALIZER: 'StandardScaler',
+            TRANSFORMER: 'OneHotEncoder',
+            columns):
+        columns = list(columns)
+        position = {name: index for index, name in enumerate(columns)}
+        self.columns = columns
+        self.n_features = len(columns)
+
+        # Colunas numéricas: posição final e coeficientes do scaler
+        self.numerical_columns = list(NORMALIZER.feature_names_in_)
+        self.numerical_positions = np.array(
+            [position[name] for name in self.numerical_columns])
+        self.mean = NORMALIZER.mean_ if NORMALIZER.with_mean else None
+        self.scale = NORMALIZER.scale_ if NORMALIZER.with_std else None
+
+        # Colunas categóricas: categoria -> posição final do one-hot.
+        # Categorias ausentes da ordem de treinamento são descartadas,
+        # como no reindex de `transform_data`.
+        self.categorical_columns = list(TRANSFORMER.feature_names_in_)
+        feature_names = iter(TRANSFORMER.get_feature_names_out())
+        self.category_positions = []
+        for categories in TRANSFORMER.categories_:
+            positions = {}
+            for category in categories:
+                name = next(feature_names)
+                if name in position:
+                    positions[category] = position[name]
+            self.category_positions.append(positions)
+
+    def numeric_values(self, car: dict, stats: FeatureStatistics) -> np.ndarray:
+        """
+        Calcula as features numéricas (ainda não normalizadas) de um carro.
+        """
+        year_model = car['year_model']
+        brand_avg_price = stats.brand_avg_price.get(car['brand'], 0)
+        features = {
+            'year_model': year_model,
+            'mileage': car['mileage'],
+            'age_years': pd.Timestamp.now().year - year_model,
+            'price_deviation': stats.model_year_avg_price.get(
+                (car['model'], year_model), 0) - brand_avg_price,
+            'brand_avg_price': brand_avg_price,
+            'state_avg_price': stats.state_avg_price.get(car['state'], 0),
+            'city_avg_price': stats.city_avg_price.get(car['city'], 0),
+            'is_luxury_brand': 1 if car['brand'] in LUXURY_BRANDS else 0,
+        }
+        return np.array(
+            [features[name] for name in self.numerical_columns],
+            dtype=np.float64)
+
+    def transform_row(
+            self,
+            car: dict,
+            stats: FeatureStatistics,
+            out: np.ndarray = None) -> np.ndarray:
+        """
+        Escreve as features de um carro em uma linha (1, n_features).
+
+        Parameters:
+        - car (dict): Campos do `Car`.
+        - stats (FeatureStatistics): Médias pré-calculadas do dataset.
+        - out (np.ndarray): Linha pré-alocada a ser reutilizada (opcional).
+
+        Returns:
+        - np.ndarray float64 no formato (1, n_features), na ordem do treino.
+        """
+        if out is None:
+            out = np.zeros((1, self.n_features), dtype=np.float64)
+        else:
+            out.fill(0.0)
+        row = out[0]
+
+        values = self.numeric_values(car, stats)
+        if self.mean is not None:
+            values -= self.mean
+        if self.scale is not None:
+            values /= self.scale
+        row[self.numerical_positions] = values
+
+        for column, positions in zip(
+                self.categorical_columns, self.category_positions):
+            index = positions.get(car[column])
+            if index is not None:
+                row[index] = 1.0
+
+        return out
+
+    def numeric_matrix(self, cars: list, stats: FeatureStatistics) -> np.ndarray:
+        """
+        Calcula as features numéricas (ainda não normalizadas) de vários
+        carros em uma matriz (n, n_numéricas), coluna a coluna.
+        """
+        year_model = np.array([car['year_model'] for car in cars], dtype=np.int64)
+        brands = [car['brand'] for car in cars]
+        brand_avg_price = np.array(
+            [stats.brand_avg_price.get(brand, 0) for brand in brands],
+            dtype=np.float64)
+        model_year_avg_price = stats.model_year_avg_price
+        features = {
+            'year_model': year_model,
+            'mileage': [car['mileage'] for car in cars],
+            'age_years': pd.Timestamp.now().year - year_model,
+            'price_deviation': np.array([
+                model_year_avg_price.get((car['model'], car['year_model']), 0)
+                for car in cars], dtype=np.float64) - brand_avg_price,
+            'brand_avg_price': brand_avg_price,
+            'state_avg_price': [
+                stats.state_avg_price.get(car['state'], 0) for car in cars],
+            'city_avg_price': [
+                stats.city_avg_price.get(car['city'], 0) for car in cars],
+            'is_luxury_brand': [
+                1 if brand in LUXURY_BRANDS else 0 for brand in brands],
+        }
+        values = np.empty((len(cars), len(self.numerical_columns)), dtype=np.float64)
+        for index, name in enumerate(self.numerical_columns):
+            values[:, index] = features[name]
+        return values
+
+    def transform_rows(
+            self,
+            cars: list,
+            stats: FeatureStatistics) -> np.ndarray:
+        """
+        Escreve as features de vários carros em uma matriz (n, n_features),
+        com os mesmos valores de `transform_row`.
+
+        Monta cada coluna de uma vez: as numéricas são normalizadas por
+        broadcast e as posições do one-hot de todas as colunas categóricas
+        são marcadas com uma única atribuição por índice.
+        """
+        out = np.zeros((len(cars), self.n_features), dtype=np.float64)
+        if len(cars) < 8:
+            # Lotes pequenos: o custo fixo das operações vetorizadas
+            # supera o do laço por linha
+            for index, car in enumerate(cars):
+                self.transform_row(car, stats, out=out[index:index + 1])
+            return out
+
+        values = self.numeric_matrix(cars, stats)
+        if self.mean is not None:
+            values -= self.mean
+        if self.scale is not None:
+            values /= self.scale
+        out[:, self.numerical_positions] = values
+
+        # Posição do one-hot de cada (carro, coluna); -1 para categorias
+        # desconhecidas, que ficam zeradas
+        positions = np.array([
+            [category_positions.get(car[column], -1) for car in cars]
+            for column, category_positions in zip(
+                self.categorical_columns, self.category_positions)],
+            dtype=np.intp)
+        rows = np.broadcast_to(np.arange(len(cars)), positions.shape)
+        known = positions >= 0
+        out[rows[known], positions[known]] = 1.0
+        return out
+
+    def transform_grid(
+            self,
+            car: dict,
+            years: list,
+            mileages: list,
+            locations: list,
+            stats: FeatureStatistics) -> np.ndarray:
+        """
+        Escreve as features da grade `years` × `mileages` × `locations`
+        ((city, state)) de um carro em uma matriz (n, n_features), na ordem
+        C da grade (o ano varia mais devagar, a localização mais rápido).
+
+        A parte invariante (one-hot de marca, modelo, câmbio, combustível e
+        carroceria, média da marca) é escrita uma vez e replicada; as
+        features de cada eixo (desvio modelo/ano, idade, médias de cidade
+        e estado, one-hot da localização) são calculadas uma vez por valor
+        do eixo e espalhadas por broadcast. Produz os mesmos valores de
+        `transform_rows` para os carros da grade.
+        """
+        n_years, n_mileages, n_locations = len(years), len(mileages), len(locations)
+        cities = [city for city, _ in locations]
+        states = [state for _, state in locations]
+
+        # Linha base sem a localização: o one-hot de cidade e estado é
+        # escrito por eixo abaixo
+        base = self.transform_row(
+            {**car, 'city': None, 'state': None}, stats)[0]
+        grid = np.empty(
+            (n_years, n_mileages, n_locations, self.n_features),
+            dtype=np.float64)
+        grid[...] = base
+
+        year_values = np.asarray(years, dtype=np.int64)
+        brand_avg_price = stats.brand_avg_price.get(car['brand'], 0)
+        features = {
+            'year_model': year_values[:, None, None],
+            'mileage': np.asarray(mileages, dtype=np.int64)[None, :, None],
+            'age_years': (pd.Timestamp.now().year - year_values)[:, None, None],
+            'price_deviation': np.array([
+                stats.model_year_avg_price.get((car['model'], year), 0)
+                - brand_avg_price for year in years])[:, None, None],
+            'state_avg_price': np.array([
+                stats.state_avg_price.get(state, 0)
+                for state in states])[None, None, :],
+            'city_avg_price': np.array([
+                stats.city_avg_price.get(city, 0)
+                for city in cities])[None, None, :],
+        }
+        for index, name in enumerate(self.numerical_columns):
+            values = features.get(name)
+            if values is None:  # invariante, já na linha base
+                continue
+            values = values.astype(np.float64)
+            if self.mean is not None:
+                values -= self.mean[index]
+            if self.scale is not None:
+                values /= self.scale[index]
+            grid[..., self.numerical_positions[index]] = values
+
+        for column, positions in zip(
+                self.categorical_columns, self.category_positions):
+            if column not in ('city', 'state'):
+                continue
+            values = cities if column == 'city' else states
+            for location, value in enumerate(values):
+                index = positions.get(value)
+                if index is not None:
+                    grid[:, :, location, index] = 1.0
+
+        return grid.reshape(-1, self.n_features)
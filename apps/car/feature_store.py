@@ -0,0 +1,115 @@
+import pandas as pd
+
+from apps.car.reference_data import RowIndex
+
+
+def _group_means(df: pd.DataFrame, keys, groups: dict = None) -> dict:
+    """
+    Calcula a média de preço de cada grupo de `keys`.
+
+    Cada média é obtida com `Series.mean` sobre as linhas do grupo, na mesma
+    ordem do dataset, para reproduzir exatamente o valor de
+    `df[df[key] == value]['price'].mean()`. As posições dos grupos podem
+    vir prontas de um `RowIndex`.
+    """
+    price = df['price']
+    if groups is None:
+        groups = df.groupby(keys, sort=False, observed=True).indices
+    return {
+        key: price.iloc[positions].mean()
+        for key, positions in groups.items()
+    }
+
+
+class FeatureStatistics:
+    """
+    Tabelas de médias de preço usadas como features em `transform_data`.
+
+    Construídas uma única vez a partir do dataset original, permitem consultar
+    as médias por marca, estado, cidade e (modelo, ano modelo) em O(1),
+    sem percorrer o DataFrame a cada requisição.
+    """
+
+    def __init__(
+            self,
+            brand_avg_price: dict,
+            state_avg_price: dict,
+            city_avg_price: dict,
+            model_year_avg_price: dict):
+        self.brand_avg_price = brand_avg_price
+        self.state_avg_price = state_avg_price
+        self.city_avg_price = city_avg_price
+        self.model_year_avg_price = model_year_avg_price
+
+    @classmethod
+    def from_dataframe(
+            cls,
+            df: pd.DataFrame,
+            index: RowIndex = None) -> "FeatureStatistics":
+        """
+        Builds the lookup tables from the training dataset, taking the
+        single-column groups from `index` when given.
+        """
+        def groups(column):
+            return index.groups(column) if index is not None else None
+
+        return cls(
+            brand_avg_price=_group_means(df, 'brand', groups('brand')),
+            state_avg_price=_group_means(df, 'state', groups('state')),
+            city_avg_price=_group_means(df, 'city', groups('city')),
+            model_year_avg_price=_group_means(df, ['model', 'year_model']),
+        )
+
+
+class IncrementalStatistics:
+    """
+    Somas e contagens de preço por grupo, acumuláveis lote a lote.
+
+    O pipeline de treinamento calcula uma por partição do crawl (dia do
+    `crawl_date`) e as soma: uma partição nova só precisa ter os seus
+    próprios grupos agregados. `to_statistics` gera as médias usadas como
+    features, iguais às do `FeatureStatistics.from_dataframe` sobre as
+    mesmas linhas (a menos do arredondamento da soma).
+    """
+    GROUPS = {
+        'brand_avg_price': 'brand',
+        'state_avg_price': 'state',
+        'city_avg_price': 'city',
+        'model_year_avg_price': ['model', 'year_model'],
+    }
+
+    def __init__(self, sums: dict = None):
+        # nome da tabela -> {chave do grupo: [soma, contagem]}
+        self.sums = sums or {name: {} for name in self.GROUPS}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "IncrementalStatistics":
+        sums = {}
+        for name, keys in cls.GROUPS.items():
+            grouped = df.groupby(keys, sort=False, observed=True)['price'].agg(
+                ['sum', 'count'])
+            sums[name] = {
+                key: [total, count]
+                for key, total, count in zip(
+                    grouped.index, grouped['sum'], grouped['count'])}
+        return cls(sums)
+
+    def update(self, other: "IncrementalStatistics") -> "IncrementalStatistics":
+        """
+        Adds the sums and counts of `other` to these ones.
+        """
+        for name, groups in other.sums.items():
+            totals = self.sums[name]
+            for key, (total, count) in groups.items():
+                current = totals.get(key)
+                if current is None:
+                    totals[key] = [total, count]
+                else:
+                    current[0] += total
+                    current[1] += count
+        return self
+
+    def to_statistics(self) -> FeatureStatistics:
+        return FeatureStatistics(**{
+            name: {key: total / count for key, (total, count) in groups.items()}
+            for name, groups in self.sums.items()})
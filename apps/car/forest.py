@@ -0,0 +1,156 @@
+import threading
+
+import numpy as np
+
+
+class FlatForest:
+    """
+    Random forest compilado em arrays NumPy contíguos.
+
+    Os nós de todas as árvores do `RandomForestRegressor` são concatenados
+    em arrays planos (feature, threshold, children, value) e avaliados com
+    uma travessia vetorizada sobre todas as (árvore, amostra) ao mesmo
+    tempo, sem a validação de entrada e o despacho do joblib que o sklearn
+    faz a cada chamada.
+
+    Reproduz bit a bit o `MODEL.predict` do sklearn (com `n_jobs=1`): as
+    entradas são convertidas para float32 antes da comparação com os
+    thresholds e as previsões das árvores são somadas na ordem dos
+    estimadores antes da divisão pelo número de árvores.
+
+    A vantagem está nos lotes pequenos, dominados pelo overhead por chamada
+    do sklearn. Lotes maiores que `max_batch_size` são delegados ao
+    `predict` compilado do próprio modelo, que é mais rápido nesse regime.
+
+    As entradas devem ser finitas (sem NaN), como as geradas pelo layout.
+    """
+
+    def __init__(self, model, max_batch_size: int = 128):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.n_features_in_ = model.n_features_in_
+        self.n_trees = len(model.estimators_)
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            if tree.n_outputs != 1:
+                raise ValueError("FlatForest suporta apenas uma saída")
+
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            # children[2 * nó + (x <= threshold)]: direita em 2n, esquerda
+            # em 2n + 1. Folhas apontam para si mesmas.
+            pairs = np.empty(2 * tree.node_count, dtype=np.intp)
+            pairs[0::2] = np.where(is_leaf, nodes, tree.children_right)
+            pairs[1::2] = np.where(is_leaf, nodes, tree.children_left)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(pairs + offset)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += tree.node_count
+
+        self.feature = np.ascontiguousarray(
+            np.concatenate(features), dtype=np.intp)
+        self.threshold = np.ascontiguousarray(
+            np.concatenate(thresholds), dtype=np.float64)
+        self.children = np.ascontiguousarray(
+            np.concatenate(children), dtype=np.intp)
+        self.value = np.ascontiguousarray(
+            np.concatenate(values), dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.is_leaf = self.children[1::2] == np.arange(offset)
+        # Matrizes (n_trees, n_samples) de cada thread, reaproveitadas
+        self._local = threading.local()
+
+    @classmethod
+    def from_sklearn(cls, model, max_batch_size: int = 128) -> "FlatForest":
+        """
+        Exports the fitted trees of a single-output forest regressor.
+        """
+        return cls(model, max_batch_size=max_batch_size)
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Returns the leaf index reached by each sample in each tree, as a
+        (n_trees, n_samples) matrix.
+
+        Every (tree, sample) lane advances one level per step; lanes that
+        reach a leaf are written out and dropped from the next steps.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        X_flat = X.ravel()
+
+        nodes = np.repeat(self.roots, n_samples)
+        rows = np.tile(np.arange(n_samples) * n_features, self.n_trees)
+        lanes = np.arange(nodes.size)
+        leaves = np.empty_like(nodes)
+
+        while lanes.size:
+            go_left = X_flat[rows + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_left]
+            done = self.is_leaf[nodes]
+            if done.any():
+                leaves[lanes[done]] = nodes[done]
+                active = ~done
+                nodes = nodes[active]
+                rows = rows[active]
+                lanes = lanes[active]
+
+        return leaves.reshape(self.n_trees, n_samples)
+
+    def predict_trees(self, X, out: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the prediction of every tree as a (n_trees, n_samples)
+        matrix, optionally written into a preallocated `out`.
+        """
+        return np.take(self.value, self.apply(X), out=out)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Averages the tree predictions, accumulating them in estimator
+        order like sklearn.
+        """
+        if len(X) > self.max_batch_size:
+            return self.model.predict(X)
+
+        y_hat = np.cumsum(self.predict_trees(X), axis=0)[-1]
+        y_hat /= self.n_trees
+        return y_hat
+
+    def tree_matrix(self, n_samples: int) -> np.ndarray:
+        """
+        Preallocated (n_trees, n_samples) float64 matrix of the calling
+        thread, reused by every call with the same batch size. Batches
+        above `max_batch_size` get a fresh matrix.
+        """
+        if n_samples > self.max_batch_size:
+            return np.empty((self.n_trees, n_samples))
+        matrices = getattr(self._local, 'matrices', None)
+        if matrices is None:
+            matrices = self._local.matrices = {}
+        matrix = matrices.get(n_samples)
+        if matrix is None:
+            matrix = matrices[n_samples] = np.empty((self.n_trees, n_samples))
+        return matrix
+
+    def predict_quantiles(self, X, quantiles) -> tuple:
+        """
+        Mean prediction and `quantiles` of the tree predictions from a
+        single traversal into the thread's preallocated tree matrix.
+
+        Returns (y_hat, q): `y_hat` is bit-identical to `predict` with the
+        vectorized traversal (to sklearn's) and `q` has shape
+        (len(quantiles), n_samples).
+        """
+        trees = self.predict_trees(X, out=self.tree_matrix(len(X)))
+        y_hat = np.cumsum(trees, axis=0)[-1]
+        y_hat /= self.n_trees
+        # A matriz é rascunho: o quantile pode ordená-la no lugar
+        return y_hat, np.quantile(trees, quantiles, axis=0,
+                                  overwrite_input=True)
@@ -0,0 +1,110 @@
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from apps.car.data_processing import transform_data
+from apps.car.feature_layout import FeatureLayout
+from apps.car.forest import FlatForest
+from apps.car.feature_store import FeatureStatistics
+from apps.metrics.stages import observe_stage
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+
+def predict_row(
+        MODEL,
+        LAYOUT: FeatureLayout,
+        stats: FeatureStatistics,
+        car: dict) -> float:
+    """
+    Prevê o preço de um único carro pelo layout compilado de features.
+    """
+    started = time.perf_counter()
+    features = LAYOUT.transform_row(car, stats)
+    started = observe_stage('feature_layout', started)
+    predicted_price = MODEL.predict(features)[0]
+    observe_stage('model_predict', started)
+    return predicted_price
+
+
+def predict_cars(
+        MODEL,
+        NORMALIZER: 'StandardScaler',
+        TRANSFORMER: 'OneHotEncoder',
+        feature_names: list,
+        stats: FeatureStatistics,
+        cars: list) -> np.ndarray:
+    """
+    Prevê o preço de uma lista de carros com uma única chamada a
+    `transform_data` e ao `MODEL.predict`.
+    """
+    input_data = pd.DataFrame(cars)
+    transformed_data = transform_data(
+        input_data, NORMALIZER, TRANSFORMER, feature_names, stats)
+    started = time.perf_counter()
+    predicted_prices = MODEL.predict(transformed_data.to_numpy())
+    observe_stage('model_predict', started)
+    return predicted_prices
+
+
+def predict_rows(
+        MODEL,
+        LAYOUT: FeatureLayout,
+        stats: FeatureStatistics,
+        cars: list) -> np.ndarray:
+    """
+    Prevê o preço de vários carros montando a matriz de features pelo layout
+    compilado e fazendo uma única chamada ao `MODEL.predict`.
+
+    Para lotes pequenos evita o custo fixo dos DataFrames de `transform_data`.
+    """
+    started = time.perf_counter()
+    features = LAYOUT.transform_rows(cars, stats)
+    started = observe_stage('feature_layout', started)
+    predicted_prices = MODEL.predict(features)
+    observe_stage('model_predict', started)
+    return predicted_prices
+
+
+def predict_row_interval(
+        FOREST: FlatForest,
+        LAYOUT: FeatureLayout,
+        stats: FeatureStatistics,
+        car: dict,
+        quantiles) -> tuple:
+    """
+    Prevê o preço de um carro junto com a mediana e os `quantiles` das
+    previsões das árvores, obtidos da mesma travessia do forest.
+
+    Retorna (preço, mediana, [valor de cada quantil]).
+    """
+    started = time.perf_counter()
+    features = LAYOUT.transform_row(car, stats)
+    started = observe_stage('feature_layout', started)
+    predicted_prices, spread = FOREST.predict_quantiles(
+        features, [0.5, *quantiles])
+    observe_stage('model_predict_interval', started)
+    return predicted_prices[0], spread[0, 0], spread[1:, 0].tolist()
+
+
+def predict_grid(
+        MODEL,
+        LAYOUT: FeatureLayout,
+        stats: FeatureStatistics,
+        car: dict,
+        years: list,
+        mileages: list,
+        locations: list) -> np.ndarray:
+    """
+    Prevê o preço de toda a grade `years` × `mileages` × `locations` de um
+    carro com uma única chamada ao `MODEL.predict`, na ordem C da grade.
+    """
+    started = time.perf_counter()
+    features = LAYOUT.transform_grid(car, years, mileages, locations, stats)
+    started = observe_stage('feature_grid', started)
+    predicted_prices = MODEL.predict(features)
+    observe_stage('model_predict', started)
+    return predicted_prices
@@ -0,0 +1,80 @@
+import io
+import csv
+import json
+
+import numpy as np
+
+from apps.car.utils import price_values
+
+SCAN_COLUMNS = ["year_model", "mileage", "city", "state", "predict"]
+
+# Linhas por pedaço da resposta em streaming
+CHUNK_ROWS = 2048
+
+
+def grid_size(years, mileages, locations) -> int:
+    return len(years) * len(mileages) * len(locations)
+
+
+def grid_columns(years, mileages, locations, predicted_prices,
+                 price_format: str = "brl") -> dict:
+    """
+    Colunas da grade expandida, na ordem C de `predict_grid` (o ano varia
+    mais devagar, a localização mais rápido), com as previsões no formato
+    de preço `price_format`.
+    """
+    n_mileages, n_locations = len(mileages), len(locations)
+    location_index = np.tile(
+        np.arange(n_locations), len(years) * n_mileages)
+    cities = np.array([city for city, _ in locations], dtype=object)
+    states = np.array([state for _, state in locations], dtype=object)
+    return {
+        "year_model": np.repeat(
+            np.asarray(years), n_mileages * n_locations).tolist(),
+        "mileage": np.tile(
+            np.repeat(np.asarray(mileages), n_locations), len(years)).tolist(),
+        "city": cities[location_index].tolist(),
+        "state": states[location_index].tolist(),
+        "predict": price_values(predicted_prices, price_format),
+    }
+
+
+def _json_array(values: list):
+    yield b"["
+    for start in range(0, len(values), CHUNK_ROWS):
+        chunk = json.dumps(
+            values[start:start + CHUNK_ROWS], ensure_ascii=False,
+            separators=(",", ":"))[1:-1]
+        yield (b"," if start else b"") + chunk.encode("utf-8")
+    yield b"]"
+
+
+def stream_json(columns: dict):
+    """
+    Corpo JSON colunar, {"size": n, "columns": {nome: [valores]}},
+    gerado em pedaços de `CHUNK_ROWS` valores.
+    """
+    size = len(columns[SCAN_COLUMNS[0]])
+    yield f'{{"size":{size},"columns":{{'.encode("utf-8")
+    for position, name in enumerate(SCAN_COLUMNS):
+        yield f'{"," if position else ""}"{name}":'.encode("utf-8")
+        yield from _json_array(columns[name])
+    yield b"}}"
+
+
+def stream_csv(columns: dict):
+    """
+    Corpo CSV com cabeçalho, gerado em pedaços de `CHUNK_ROWS` linhas.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(SCAN_COLUMNS)
+    size = len(columns[SCAN_COLUMNS[0]])
+    for start in range(0, size, CHUNK_ROWS):
+        writer.writerows(zip(*(columns[name][start:start + CHUNK_ROWS]
+                               for name in SCAN_COLUMNS)))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # grade vazia: só o cabeçalho
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,97 @@
+import argparse
+import json
+import logging
+
+import pandas as pd
+
+from apps.car.data_processing import CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS
+from apps.car.columnar import read_dataset
+from settings import MODEL_SCHEMA_PATH, X_TEST_PATH
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ModelSchema:
+    """
+    Esquema das features esperadas pelo modelo.
+
+    Guarda a ordem das colunas do treinamento, seus dtypes e a separação
+    entre colunas categóricas (antes do one-hot) e numéricas. É gravado como
+    um JSON pequeno ao lado dos artefatos `.pkl`, evitando carregar o
+    `X_test.csv` inteiro apenas para obter a ordem das colunas.
+    """
+
+    def __init__(
+            self,
+            feature_names: list,
+            dtypes: dict,
+            categorical_columns: list,
+            numerical_columns: list):
+        self.feature_names = list(feature_names)
+        self.dtypes = dict(dtypes)
+        self.categorical_columns = list(categorical_columns)
+        self.numerical_columns = list(numerical_columns)
+
+    @classmethod
+    def load(cls, path: str) -> "ModelSchema":
+        """
+        Loads the schema from a JSON artifact.
+        """
+        with open(path, 'r') as file:
+            data = json.load(file)
+        return cls(
+            feature_names=data['feature_names'],
+            dtypes=data['dtypes'],
+            categorical_columns=data['categorical_columns'],
+            numerical_columns=data['numerical_columns'],
+        )
+
+    @classmethod
+    def from_frame(cls, X: pd.DataFrame) -> "ModelSchema":
+        """
+        Derives the schema from a training feature matrix.
+        """
+        return cls(
+            feature_names=X.columns.tolist(),
+            dtypes={column: str(dtype) for column, dtype in X.dtypes.items()},
+            categorical_columns=CATEGORICAL_COLUMNS,
+            numerical_columns=[
+                column for column in X.columns if column in NUMERICAL_COLUMNS],
+        )
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ModelSchema":
+        """
+        Migration path: derives the schema from an existing X_test.csv.
+        """
+        return cls.from_frame(read_dataset(path))
+
+    def save(self, path: str):
+        with open(path, 'w') as file:
+            json.dump({
+                'feature_names': self.feature_names,
+                'dtypes': self.dtypes,
+                'categorical_columns': self.categorical_columns,
+                'numerical_columns': self.numerical_columns,
+            }, file, indent=2)
+            file.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Gera o artefato de esquema do modelo a partir do X_test.csv")
+    parser.add_argument('--from-csv', default=X_TEST_PATH,
+                        help="CSV com as features do treinamento")
+    parser.add_argument('--output', default=MODEL_SCHEMA_PATH,
+                        help="Caminho do JSON de esquema gerado")
+    args = parser.parse_args()
+
+    schema = ModelSchema.from_csv(args.from_csv)
+    schema.save(args.output)
+    logger.info("Esquema com %d features gravado em %s",
+                len(schema.feature_names), args.output)
+
+
+if __name__ == '__main__':
+    main()
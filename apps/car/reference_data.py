@@ -0,0 +1,85 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import OneHotEncoder
+
+
+def categorize(df: pd.DataFrame, TRANSFORMER: 'OneHotEncoder') -> pd.DataFrame:
+    """
+    Converte as colunas categóricas do encoder para o dtype `category`.
+
+    As categorias seguem a ordem do `OneHotEncoder` (o código de um valor é
+    a sua posição no one-hot da coluna). Valores do dataset desconhecidos
+    pelo encoder são acrescentados ao final, em ordem alfabética.
+    """
+    df = df.copy(deep=False)
+    for column, categories in zip(
+            TRANSFORMER.feature_names_in_, TRANSFORMER.categories_):
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            present = values.cat.categories
+        else:
+            present = values.dropna().unique()
+        known = list(categories)
+        extra = sorted(set(present) - set(known))
+        df[column] = values.astype(pd.CategoricalDtype(known + extra))
+    return df
+
+
+def _positions_by_code(codes: np.ndarray, positions: np.ndarray,
+                       categories) -> dict:
+    # Ordenação estável: as posições de cada valor ficam em ordem crescente
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+    return {
+        category: positions[order[start:end]]
+        for category, start, end in zip(categories, bounds[:-1], bounds[1:])
+        if end > start
+    }
+
+
+class RowIndex:
+    """
+    Índice valor -> posições das linhas das colunas categóricas de um
+    DataFrame.
+
+    As posições de cada valor são um array ordenado, obtido dos códigos do
+    `category` uma única vez; uma consulta por marca, modelo ou cidade passa
+    a ser um acesso a dicionário em vez de uma varredura da coluna.
+    """
+
+    EMPTY = np.empty(0, dtype=np.intp)
+
+    def __init__(self, df: pd.DataFrame, columns):
+        self.n_rows = len(df)
+        self._codes = {}
+        self._categories = {}
+        self._groups = {}
+        all_positions = np.arange(self.n_rows)
+        for column in columns:
+            codes = df[column].cat.codes.to_numpy()
+            categories = df[column].cat.categories
+            self._codes[column] = codes
+            self._categories[column] = categories
+            self._groups[column] = _positions_by_code(
+                codes, all_positions, categories)
+
+    def groups(self, column: str) -> dict:
+        """
+        Positions of the rows of every value of `column` present in the
+        dataset, in dataset order.
+        """
+        return self._groups[column]
+
+    def subgroups(self, positions: np.ndarray, column: str) -> dict:
+        """
+        Splits the rows at `positions` by their value of `column`.
+        """
+        return _positions_by_code(
+            self._codes[column][positions], positions,
+            self._categories[column])
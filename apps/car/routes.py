@@ -1,22 +1,43 @@
+import time
 import logging
 import traceback
-
-import pandas as pd
-from fastapi import APIRouter, HTTPException, Request, Query, Path
-
-from apps.car.schemas import Car
-from apps.car.utils import format_price
-from apps.car.data_processing import transform_data
-from apps.car.exceptions import InvalidCategoryException
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Request, Response, Query, Path
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from apps.car.schemas import Car, CarFields, MarketScan
+from apps.car.utils import (
+    price_value, price_values, parse_batch_payload, parse_quantiles, validation_error_details)
+from apps.car.inference import predict_row, predict_cars, predict_row_interval, predict_grid
+from apps.car.catalogue import catalogue_response
+from apps.car.market_scan import grid_columns, grid_size, stream_csv, stream_json
+from apps.car.search import SEARCH_TYPES, normalize
+from apps.car.exceptions import (
+    InvalidCategoryException, InvalidSearchTypeException, BatchTooLargeException, ScanTooLargeException)
+from apps.metrics.stages import observe_stage, observe_request_parsing
+from settings import BATCH_PREDICT_MAX_ITEMS, MARKET_SCAN_MAX_VARIANTS, PREDICT_INTERVAL_QUANTILES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+PRICE_FORMAT_DESCRIPTION = (
+    'Formato dos preços: brl (texto, ex.: "80.571,10") ou raw (número em '
+    'reais, ex.: 80571.1)')
+
 
 @router.post("/predict", response_model=dict)
-async def predict_car_price(request: Request, car: Car):
+async def predict_car_price(
+        request: Request, response: Response, car: Car,
+        interval: bool = Query(
+            False, description="Inclui a mediana e os quantis das previsões das árvores"),
+        quantiles: str = Query(
+            None, description="Quantis do intervalo separados por vírgula (padrão: 0.1,0.9)"),
+        price_format: Literal["brl", "raw"] = Query(
+            "brl", alias="format", description=PRICE_FORMAT_DESCRIPTION)):
     """
     Objetivo:
     - Permitir que o usuário obtenha a previsão de preço de um veículo específico,
@@ -31,42 +52,315 @@ async def predict_car_price(request: Request, car: Car):
     - request: Objeto de requisição do FastAPI.
     - car: Objeto do tipo Car contendo os dados do carro.
 
+    Opcionais:
+    - interval: Com true, inclui em "interval" a mediana e os quantis das
+      previsões das árvores do random forest, calculados na mesma passada
+      da previsão. A faixa mede a dispersão entre as árvores; não é um
+      intervalo de confiança calibrado.
+    - quantiles: Quantis do intervalo, entre 0 e 1, separados por vírgula.
+    - format: brl (padrão) devolve os preços como texto no estilo
+      brasileiro; raw devolve números em reais, sem formatação.
+
     Retorna:
     - JSON, Um dicionário com a previsão do preço do carro formatado.
     - Em caso de erro, retorna uma mensagem de erro com status code 500.
     """
+    started = observe_request_parsing(request.scope)
+    if interval:
+        quantiles = (parse_quantiles(quantiles) if quantiles is not None
+                     else PREDICT_INTERVAL_QUANTILES)
+        return await predict_car_price_interval(
+            request, response, car, quantiles, price_format, started)
     try:
-        # Converter o input para DataFrame
-        input_data = pd.DataFrame([car.dict()])
+        # Uma única leitura do estado: a requisição inteira usa a mesma
+        # versão dos artefatos, mesmo que uma recarga ocorra no meio dela
+        state = request.app.state
+        MODEL = state.MODEL
+        LAYOUT = state.FEATURE_LAYOUT
+        stats = state.FEATURE_STATS
+        CACHE = state.PREDICTION_CACHE
+        response.headers["X-Model-Version"] = state.MODEL_VERSION
+
+        car_data = car.model_dump()
+        cache_key = CACHE.make_key(car_data, state.MODEL_VERSION)
+        predicted_price = CACHE.get(cache_key)
+        started = observe_stage('cache_lookup', started)
+
+        if predicted_price is None:
+            BATCHER = state.MICRO_BATCHER
+            if BATCHER is not None:
+                # Agrupar com as previsões concorrentes em um único predict
+                predicted_price = await BATCHER.predict(car_data)
+            else:
+                # Montar o vetor de features e prever fora do event loop
+                predicted_price = await state.PREDICTION_EXECUTOR.run(
+                    predict_row, MODEL, LAYOUT, stats, car_data)
+            CACHE.set(cache_key, predicted_price)
+            started = observe_stage('prediction', started)
+
+        formatted_prediction = price_value(predicted_price, price_format)
+        observe_stage('response_format', started)
+        return {"predict": formatted_prediction}
 
-        MODEL = request.app.state.MODEL
-        NORMALIZER = request.app.state.NORMALIZER
-        TRANSFORMER = request.app.state.TRANSFORMER
-        X_test = request.app.state.X_test
-        df = request.app.state.ORIGINAL_DF
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500,
+                            detail=f"Erro ao fazer a previsão: {str(e)}")
 
-        # Transformar os dados
-        transformed_data = transform_data(
-            input_data, NORMALIZER, TRANSFORMER, X_test, df)
 
-        # Fazer a previsão
-        predicted_price = MODEL.predict(transformed_data)[0]
+async def predict_car_price_interval(
+        request: Request, response: Response, car: Car, quantiles: tuple,
+        price_format: str, started: float) -> dict:
+    """
+    /car/predict com interval=true: preço, mediana e quantis das árvores,
+    em cache junto com os quantis pedidos.
+    """
+    try:
+        state = request.app.state
+        CACHE = state.PREDICTION_CACHE
+        response.headers["X-Model-Version"] = state.MODEL_VERSION
+
+        car_data = car.model_dump()
+        cache_key = CACHE.make_key(
+            {**car_data, "quantiles": quantiles}, state.MODEL_VERSION)
+        prediction = CACHE.get(cache_key)
+        started = observe_stage('cache_lookup', started)
+
+        if prediction is None:
+            prediction = await state.PREDICTION_EXECUTOR.run(
+                predict_row_interval, state.FOREST, state.FEATURE_LAYOUT,
+                state.FEATURE_STATS, car_data, quantiles)
+            CACHE.set(cache_key, prediction)
+            started = observe_stage('prediction', started)
+
+        predicted_price, median, values = prediction
+        predicted_price, median, *values = price_values(
+            [predicted_price, median, *values], price_format)
+        result = {
+            "predict": predicted_price,
+            "interval": {
+                "median": median,
+                "quantiles": dict(zip(
+                    (f"{quantile:g}" for quantile in quantiles), values)),
+            },
+        }
+        observe_stage('response_format', started)
+        return result
 
-        formatted_prediction = format_price(
-            predicted_price)  # Use the utility function
-        return {"predict": formatted_prediction}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500,
+                            detail=f"Erro ao fazer a previsão: {str(e)}")
+
+
+@router.post("/predict/batch", response_model=dict)
+async def batch_predict_car_price(
+        request: Request, response: Response,
+        validate_only: bool = Query(
+            False, description="Apenas valida os itens, sem prever"),
+        price_format: Literal["brl", "raw"] = Query(
+            "brl", alias="format", description=PRICE_FORMAT_DESCRIPTION)):
+    """
+    Objetivo:
+    - Prever o preço de vários veículos em uma única requisição.
+
+    Descrição:
+    - O corpo pode ser uma lista JSON de objetos Car ou NDJSON
+      (Content-Type: application/x-ndjson), um objeto Car por linha.
+    - Todos os itens válidos são transformados e previstos de uma só vez.
+    - Itens inválidos recebem um erro próprio, sem invalidar o lote. Valores
+      fora do vocabulário (marca, modelo da marca, carroceria do modelo,
+      câmbio, combustível, cidade do estado) são recusados direto no
+      payload, antes da validação completa do pydantic.
+    - Com validate_only=true, apenas valida o lote, sem prever.
+    - Com format=raw, as previsões são números em reais, sem formatação.
 
+    Retorna:
+    - JSON com os totais do lote e, para cada item (na ordem de envio),
+      a previsão formatada ou a lista de erros de validação.
+    """
+    observe_request_parsing(request.scope)
+    started = time.perf_counter()
+    items = parse_batch_payload(
+        await request.body(), request.headers.get("content-type", ""))
+    started = observe_stage('batch_parsing', started)
+
+    if len(items) > BATCH_PREDICT_MAX_ITEMS:
+        raise BatchTooLargeException(len(items), BATCH_PREDICT_MAX_ITEMS)
+
+    results = []
+    valid_indexes = []
+    valid_cars = []
+    vocabulary = request.app.state.VOCABULARY
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({
+                "index": index,
+                "error": [{"loc": [], "msg": "Item deve ser um objeto JSON"}]})
+            continue
+        # Rejeição rápida: lookups O(1) no vocabulário, sem montar o Car;
+        # os itens aprovados só têm os tipos e campos obrigatórios validados
+        errors = vocabulary.errors(item)
+        if errors:
+            results.append({"index": index, "error": errors})
+            continue
+        try:
+            car = CarFields(**item)
+        except ValidationError as e:
+            results.append(
+                {"index": index, "error": validation_error_details(e)})
+            continue
+        results.append({"index": index})
+        valid_indexes.append(index)
+        valid_cars.append(car.model_dump())
+    started = observe_stage('validation', started)
+
+    if validate_only:
+        return {
+            "total": len(items),
+            "succeeded": len(valid_indexes),
+            "failed": len(items) - len(valid_indexes),
+            "results": results
+        }
+
+    try:
+        state = request.app.state
+        CACHE = state.PREDICTION_CACHE
+        model_version = state.MODEL_VERSION
+        response.headers["X-Model-Version"] = model_version
+
+        # Servir do cache o que já foi previsto e prever apenas o restante
+        cached_indexes = []
+        cached_prices = []
+        missing_indexes = []
+        missing_cars = []
+        missing_keys = []
+        for index, car_data in zip(valid_indexes, valid_cars):
+            cache_key = CACHE.make_key(car_data, model_version)
+            predicted_price = CACHE.get(cache_key)
+            if predicted_price is None:
+                missing_indexes.append(index)
+                missing_cars.append(car_data)
+                missing_keys.append(cache_key)
+            else:
+                cached_indexes.append(index)
+                cached_prices.append(predicted_price)
+
+        if missing_cars:
+            MODEL = state.MODEL
+            NORMALIZER = state.NORMALIZER
+            TRANSFORMER = state.TRANSFORMER
+            feature_names = state.MODEL_SCHEMA.feature_names
+            stats = state.FEATURE_STATS
+
+            # Transformar e prever todo o lote de uma vez, fora do event loop
+            started = time.perf_counter()
+            predicted_prices = await state.PREDICTION_EXECUTOR.run(
+                predict_cars, MODEL, NORMALIZER, TRANSFORMER, feature_names,
+                stats, missing_cars)
+            observe_stage('prediction', started)
+
+            for cache_key, predicted_price in zip(missing_keys, predicted_prices):
+                CACHE.set(cache_key, predicted_price)
+            cached_indexes.extend(missing_indexes)
+            cached_prices.extend(predicted_prices)
+
+        # Formatar todas as previsões do lote de uma vez
+        for index, price in zip(
+                cached_indexes, price_values(cached_prices, price_format)):
+            results[index]["predict"] = price
+
+        return {
+            "total": len(items),
+            "succeeded": len(valid_indexes),
+            "failed": len(items) - len(valid_indexes),
+            "results": results
+        }
+
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500,
                             detail=f"Erro ao fazer a previsão: {str(e)}")
 
 
+@router.post("/scan")
+async def market_scan(
+        request: Request, scan: MarketScan,
+        output: Literal["json", "csv"] = Query(
+            "json", description="Formato da resposta: json (colunar) ou csv"),
+        price_format: Literal["brl", "raw"] = Query(
+            "brl", alias="format", description=PRICE_FORMAT_DESCRIPTION)):
+    """
+    Objetivo:
+    - Precificar uma grade de variantes de um mesmo carro (curvas de
+      depreciação), em vez de uma chamada a /car/predict por variante.
+
+    Descrição:
+    - O corpo traz o carro base em "car" e, opcionalmente, os valores de
+      "year_model" e "mileage" (lista ou {"start", "stop", "step"}, com
+      "stop" incluído) e "locations" (lista de {"city", "state"}). Campos
+      omitidos ficam fixos no valor do carro base.
+    - A grade anos × quilometragens × localizações é expandida no servidor
+      e prevista em uma única chamada ao modelo; as features comuns a toda
+      a grade são calculadas uma só vez.
+    - A grade tem no máximo MARKET_SCAN_MAX_VARIANTS variantes (413).
+
+    Retorna:
+    - Com output=json, JSON colunar: {"size": n, "columns": {"year_model",
+      "mileage", "city", "state", "predict"}}, cada coluna uma lista de n
+      valores, na ordem da grade (o ano varia mais devagar). Com
+      output=csv, as mesmas colunas em CSV. Com format=raw, "predict"
+      traz números em reais em vez de texto.
+    """
+    started = observe_request_parsing(request.scope)
+    years, mileages, locations = scan.axes()
+    size = grid_size(years, mileages, locations)
+    if size > MARKET_SCAN_MAX_VARIANTS:
+        raise ScanTooLargeException(size, MARKET_SCAN_MAX_VARIANTS)
+    years, mileages = list(years), list(mileages)
+
+    try:
+        state = request.app.state
+        model_version = state.MODEL_VERSION
+
+        predicted_prices = await state.PREDICTION_EXECUTOR.run(
+            predict_grid, state.MODEL, state.FEATURE_LAYOUT,
+            state.FEATURE_STATS, scan.car.model_dump(), years, mileages, locations)
+        started = observe_stage('prediction', started)
+
+        columns = grid_columns(
+            years, mileages, locations, predicted_prices, price_format)
+        observe_stage('response_format', started)
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500,
+                            detail=f"Erro ao fazer a previsão: {str(e)}")
+
+    headers = {"X-Model-Version": model_version}
+    if output == "csv":
+        return StreamingResponse(
+            stream_csv(columns), media_type="text/csv; charset=utf-8",
+            headers=headers)
+    return StreamingResponse(
+        stream_json(columns), media_type="application/json",
+        headers=headers)
+
+
 @router.post("/brand_predict/{brand}", response_model=dict)
 async def brand_predict(
     request: Request,
+    response: Response,
     brand: str = Path(..., description="Brand"),
     page: int = Query(1, ge=1, description="Page number (default: 1)"),
-    page_size: int = Query(10, ge=1, description="Number of items per page (default: 10)")
+    page_size: int = Query(10, ge=1, description="Number of items per page (default: 10)"),
+    price_format: Literal["brl", "raw"] = Query(
+        "brl", alias="format", description=PRICE_FORMAT_DESCRIPTION)
 ):
     """
     Predicts the price of all models of a specific brand for the next model year.
@@ -75,13 +369,16 @@ async def brand_predict(
     - brand (str): Brand name (required in the URL).
     - page (int): Page number for pagination (default: 1).
     - page_size (int): Number of items per page for pagination (default: 10).
+    - format (str): brl (default) for Brazilian-style price strings, raw
+      for plain numbers in reais.
 
     Returns:
     - JSON containing price predictions for the specified page.
     """
     try:
         brand = brand.upper()
-        brand_models_bodywork = request.app.state.BRAND_MODELS_BODYWORK
+        state = request.app.state
+        brand_models_bodywork = state.BRAND_MODELS_BODYWORK
 
         if brand not in brand_models_bodywork:
             raise HTTPException(status_code=400, detail="Invalid brand")
@@ -100,55 +397,29 @@ async def brand_predict(
         end = start + page_size
         paginated_models = models[start:end]
 
-        # Global model objects
-        MODEL = request.app.state.MODEL
-        NORMALIZER = request.app.state.NORMALIZER
-        TRANSFORMER = request.app.state.TRANSFORMER
-        X_test = request.app.state.X_test
-        df = request.app.state.ORIGINAL_DF  # Training dataset
-
-        predictions = []
-
-        for model in paginated_models:
-            # Filter records for the brand and model
-            valid_combinations = df[(df["brand"] == brand)
-                                    & (df["model"] == model)]
-
-            if valid_combinations.empty:
-                continue  # Skip if no records exist
-
-            # Choose the most frequent combination
-            most_frequent_combination = valid_combinations.mode().iloc[0]
-
-            input_data = pd.DataFrame({
-                'brand': [brand],
-                'model': [model],
-                'year_model': [most_frequent_combination['year_model']],
-                'mileage': [most_frequent_combination["mileage"]],
-                'gear': [most_frequent_combination["gear"]],
-                'fuel': [most_frequent_combination["fuel"]],
-                'bodywork': [most_frequent_combination["bodywork"]],
-                'city': [most_frequent_combination["city"]],
-                'state': [most_frequent_combination["state"]]
-            })
-
-            # Transform the data
-            transformed_data = transform_data(
-                input_data, NORMALIZER, TRANSFORMER, X_test, df)
-            predicted_price = MODEL.predict(transformed_data)[0]
-            formatted_price = format_price(predicted_price)
-
-            predictions.append({
-                "model": model,
-                "year_model": int(most_frequent_combination["year_model"]),
-                "mileage": most_frequent_combination["mileage"],
-                "gear": most_frequent_combination["gear"],
-                "fuel": most_frequent_combination["fuel"],
-                "bodywork": most_frequent_combination["bodywork"],
-                "city": most_frequent_combination["city"],
-                "state": most_frequent_combination["state"],
-                "predicted_value": formatted_price
-            })
+        # Model objects of the artifacts version serving this request
+        MODEL = state.MODEL
+        NORMALIZER = state.NORMALIZER
+        TRANSFORMER = state.TRANSFORMER
+        feature_names = state.MODEL_SCHEMA.feature_names
+        stats = state.FEATURE_STATS
+        response.headers["X-Model-Version"] = state.MODEL_VERSION
+
+        # Predictions of the whole brand, computed once (off the event
+        # loop) and cached
+        BRAND_PREDICTIONS = state.BRAND_PREDICTIONS
+        brand_predictions = BRAND_PREDICTIONS.cached(brand, price_format)
+        if brand_predictions is None:
+            brand_predictions = await state.PREDICTION_EXECUTOR.run(
+                BRAND_PREDICTIONS.get, brand, MODEL, NORMALIZER, TRANSFORMER,
+                feature_names, stats, price_format)
+
+        # Skip models without records in the dataset
+        predictions = [
+            brand_predictions[model]
+            for model in paginated_models
+            if model in brand_predictions
+        ]
 
         return {
             "brand": brand,
@@ -168,6 +439,35 @@ async def brand_predict(
             detail=f"Erro ao fazer a previsão: {str(e)}\n{''.join(tb_str)}")
 
 
+@router.get("/cache-stats", response_model=dict)
+async def prediction_cache_stats(request: Request):
+    """
+    Returns the prediction cache counters (hits, misses, evictions,
+    expirations), its current size and the artifacts version it serves.
+    """
+    return request.app.state.PREDICTION_CACHE.stats()
+
+
+@router.get("/executor-stats", response_model=dict)
+async def prediction_executor_stats(request: Request):
+    """
+    Returns the prediction executor occupancy and its rejection (429) and
+    timeout (504) counters.
+    """
+    return request.app.state.PREDICTION_EXECUTOR.stats()
+
+
+@router.get("/batcher-stats", response_model=dict)
+async def micro_batcher_stats(request: Request):
+    """
+    Returns the micro-batcher batch size and queueing delay distributions.
+    """
+    BATCHER = request.app.state.MICRO_BATCHER
+    if BATCHER is None:
+        return {"enabled": False}
+    return {"enabled": True, **BATCHER.stats()}
+
+
 @router.get("/list/{category}", response_model=dict)
 async def list_category(
     request: Request, category: str, page: int = Query(
@@ -187,36 +487,21 @@ async def list_category(
     Retorna:
     - JSON com a listagem da categoria, número da página, tamanho da página,
       quantidade total de páginas e quantidade total de resultados.
+      Páginas pré-serializadas, com ETag (304 com If-None-Match) e
+      Cache-Control.
     """
     if category not in InvalidCategoryException.VALID_CATEGORIES:
         raise InvalidCategoryException(category)
     try:
-        data_valid = request.app.state.DATA_VALID
+        catalogue = request.app.state.CATALOGUE
 
-        if category not in data_valid.columns:
+        if category not in catalogue.categories:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid category: {category}")
 
-        valid_values = data_valid[category].dropna().unique().tolist()
-
-        total_results = len(valid_values)
-        total_pages = (total_results + page_size - 1) // page_size
-
-        if page > total_pages:
-            page = total_pages
-
-        start = (page - 1) * page_size
-        end = start + page_size
-        values_list = valid_values[start:end]
-
-        return {
-            "page": page,
-            "page_size": page_size,
-            "total_pages": total_pages,
-            "total_results": total_results,
-            category: values_list
-        }
+        return catalogue_response(
+            request, catalogue.category_page(category, page, page_size))
 
     except Exception as e:
         raise HTTPException(status_code=500,
@@ -237,36 +522,31 @@ async def list_brands_models_bodyworks(
     - model (str): Model name (optional).
 
     Returns:
-    - JSON with the list of brands, models, or bodyworks.
+    - JSON with the list of brands, models, or bodyworks, pre-serialized
+      with ETag (304 on If-None-Match) and Cache-Control.
     """
     try:
-        # Access the BRAND_MODELS_BODYWORK data
-        brand_models_bodywork = request.app.state.BRAND_MODELS_BODYWORK
+        catalogue = request.app.state.CATALOGUE
 
         if not brand:
             # List all brands
-            return {"brands": list(brand_models_bodywork.keys())}
+            return catalogue_response(request, catalogue.brands)
 
         brand = brand.strip().upper()
-        if brand not in brand_models_bodywork:
+        if brand not in catalogue.models:
             raise HTTPException(status_code=400, detail="Invalid brand")
 
         if not model:
             # List all models of the brand
-            return {
-                "brand": brand, "models": list(
-                    brand_models_bodywork[brand].keys())}
+            return catalogue_response(request, catalogue.models[brand])
 
         model = model.strip().upper()
-        if model not in brand_models_bodywork[brand]:
+        if (brand, model) not in catalogue.bodyworks:
             raise HTTPException(status_code=400,
                                 detail="Invalid model for the specified brand")
 
         # List all bodyworks of the model
-        return {
-            "brand": brand,
-            "model": model,
-            "bodyworks": brand_models_bodywork[brand][model]}
+        return catalogue_response(request, catalogue.bodyworks[brand, model])
 
     except HTTPException as e:
         raise e
@@ -289,27 +569,25 @@ async def list_states_or_cities(
     - state (str): Nome do estado (opcional).
 
     Retorna:
-    - JSON com a lista de estados ou cidades.
+    - JSON com a lista de estados ou cidades, pré-serializado, com ETag
+      (304 com If-None-Match) e Cache-Control.
     """
     try:
-        # Carregar o DataFrame de estados e cidades
-        df_states = request.app.state.STATE_CITIES
+        catalogue = request.app.state.CATALOGUE
 
         if state:
             # Normalizar a entrada do estado
             state = state.strip().upper()
 
-            # Verificar se o estado existe no DataFrame
-            if state not in df_states.columns:
+            # Verificar se o estado existe
+            if state not in catalogue.cities:
                 raise HTTPException(status_code=400, detail="Estado inválido")
 
             # Listar as cidades do estado
-            cities = df_states[state].dropna().tolist()
-            return {"state": state, "cities": cities}
+            return catalogue_response(request, catalogue.cities[state])
 
         # Listar todos os estados
-        states = df_states.columns.tolist()
-        return {"states": states}
+        return catalogue_response(request, catalogue.states)
 
     except HTTPException as e:
         raise e
@@ -317,3 +595,52 @@ async def list_states_or_cities(
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao listar: {str(e)}")
+
+
+@router.get("/search", response_model=dict)
+async def search_catalogue(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100,
+                   description="Início do nome ou de uma de suas palavras"),
+    type: str = Query(
+        None, description="brand, model, bodywork ou city, separados por vírgula (opcional)"),
+    brand: str = Query(None, description="Restringe os modelos a uma marca (opcional)"),
+    state: str = Query(None, description="Restringe as cidades a um estado (opcional)"),
+    limit: int = Query(10, ge=1, le=100)
+):
+    """
+    Autocomplete de marcas, modelos, carrocerias e cidades.
+
+    Parâmetros:
+    - q (str): Termo buscado, sem diferenciar acentos e maiúsculas
+      ("sao l" encontra "SAO LUIS", "luis" também).
+    - type (str): Tipos de resultado (opcional, padrão: todos).
+    - brand (str): Marca dos modelos (opcional).
+    - state (str): Estado das cidades (opcional).
+    - limit (int): Quantidade máxima de resultados (default: 10).
+
+    Retorna:
+    - JSON com os resultados: primeiro os nomes que começam pelo termo,
+      depois os que têm uma palavra começando por ele.
+    """
+    index = request.app.state.SEARCH_INDEX
+
+    types = None
+    if type:
+        types = [normalize(search_type).lower() for search_type in type.split(",")]
+        for search_type in types:
+            if search_type not in SEARCH_TYPES:
+                raise InvalidSearchTypeException(search_type, SEARCH_TYPES)
+
+    if brand:
+        brand = index.brands.get(normalize(brand))
+        if brand is None:
+            raise HTTPException(status_code=400, detail="Invalid brand")
+    if state:
+        state = index.states.get(normalize(state))
+        if state is None:
+            raise HTTPException(status_code=400, detail="Estado inválido")
+
+    return {
+        "query": q,
+        "results": index.search(q, types, brand=brand, state=state, limit=limit)}
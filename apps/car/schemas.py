@@ -1,9 +1,29 @@
-from pydantic import BaseModel, validator
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, ValidationInfo, field_validator, model_validator
 
 from settings import config
 
 
-class Car(BaseModel):
+def _check(message):
+    if message is not None:
+        raise ValueError(message)
+
+
+def _vocabulary(info: ValidationInfo):
+    # O vocabulário de um estado ainda não ativado (o aquecimento de uma
+    # recarga) vem no contexto da validação; sem ele, vale o da carga
+    # ativa, trocado junto com o estado em ArtifactReloader.activate
+    if info.context is not None and 'vocabulary' in info.context:
+        return info.context['vocabulary']
+    return config.vocabulary
+
+
+class CarFields(BaseModel):
+    """
+    Car without the vocabulary checks, for payloads already checked with
+    `Vocabulary.errors` (the batch fast path).
+    """
     brand: str
     model: str
     year_model: int
@@ -14,9 +34,145 @@ class Car(BaseModel):
     city: str
     state: str
 
-    @validator('brand')
-    def validate_brand(cls, value):
-        if value not in config.valid_brands:
-            raise ValueError(
-                f'Invalid brand: {value}. Enter a brand present in the data/brand_models_bodywork.json file')
+
+class Car(CarFields):
+    # Os campos categóricos são checados contra o vocabulário da carga
+    # ativa (config.vocabulary), ou o passado no contexto da validação, em
+    # O(1). Em `info.data` só estão os campos anteriores já validados, o
+    # que permite checar a hierarquia: modelo da marca e cidade do estado.
+
+    @field_validator('brand')
+    @classmethod
+    def validate_brand(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is None:
+            if value not in config.valid_brands:
+                raise ValueError(
+                    f'Invalid brand: {value}. Enter a brand present in the data/brand_models_bodywork.json file')
+            return value
+        _check(vocabulary.brand_error(value))
+        return value
+
+    @field_validator('model')
+    @classmethod
+    def validate_model(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.model_error(value, info.data.get('brand')))
+        return value
+
+    @field_validator('gear')
+    @classmethod
+    def validate_gear(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.gear_error(value))
+        return value
+
+    @field_validator('fuel')
+    @classmethod
+    def validate_fuel(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.fuel_error(value))
+        return value
+
+    @field_validator('bodywork')
+    @classmethod
+    def validate_bodywork(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.bodywork_error(value))
+        return value
+
+    @field_validator('city')
+    @classmethod
+    def validate_city(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.city_error(value))
+        return value
+
+    @field_validator('state')
+    @classmethod
+    def validate_state(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.state_error(value, info.data.get('city')))
         return value
+
+
+class ValueRange(BaseModel):
+    """
+    Inclusive range of integers: start, start + step, ..., up to stop.
+    """
+    start: int
+    stop: int
+    step: int = 1
+
+    @model_validator(mode='after')
+    def validate_range(self) -> 'ValueRange':
+        if self.step <= 0:
+            raise ValueError('step must be greater than zero')
+        if self.stop < self.start:
+            raise ValueError('stop must not be less than start')
+        return self
+
+    def values(self) -> range:
+        return range(self.start, self.stop + 1, self.step)
+
+
+class Location(BaseModel):
+    city: str
+    state: str
+
+    @field_validator('city')
+    @classmethod
+    def validate_city(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.city_error(value))
+        return value
+
+    @field_validator('state')
+    @classmethod
+    def validate_state(cls, value: str, info: ValidationInfo) -> str:
+        vocabulary = _vocabulary(info)
+        if vocabulary is not None:
+            _check(vocabulary.state_error(value, info.data.get('city')))
+        return value
+
+
+class MarketScan(BaseModel):
+    # Campos omitidos ficam fixos no valor do carro base
+    car: Car
+    year_model: Optional[Union[List[int], ValueRange]] = None
+    mileage: Optional[Union[List[int], ValueRange]] = None
+    locations: Optional[List[Location]] = None
+
+    @field_validator('year_model', 'mileage', 'locations')
+    @classmethod
+    def validate_not_empty(cls, value):
+        if isinstance(value, list) and not value:
+            raise ValueError('Enter at least one value')
+        return value
+
+    def axes(self) -> tuple:
+        """
+        (years, mileages, locations) of the grid; `years` and `mileages`
+        may be lazy `range`s, so their size is known before expanding them.
+        """
+        def axis(values, default):
+            if values is None:
+                return [default]
+            if isinstance(values, ValueRange):
+                return values.values()
+            return values
+
+        locations = ([(location.city, location.state)
+                      for location in self.locations]
+                     if self.locations is not None
+                     else [(self.car.city, self.car.state)])
+        return (axis(self.year_model, self.car.year_model),
+                axis(self.mileage, self.car.mileage),
+                locations)
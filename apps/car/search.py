@@ -0,0 +1,148 @@
+import heapq
+import bisect
+import itertools
+import unicodedata
+
+import pandas as pd
+
+SEARCH_TYPES = ["brand", "model", "bodywork", "city"]
+
+
+def normalize(text: str) -> str:
+    """
+    Search key of a name: no accents, upper case and single spaces
+    ("São  Luís" -> "SAO LUIS").
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.upper().split())
+
+
+class PrefixIndex:
+    """
+    Índice de prefixos em arrays ordenados: cada entrada é indexada pelo
+    nome completo normalizado e, separadamente, por cada palavra seguinte
+    do nome (o sufixo a partir dela), para que "LUIS" encontre "SAO LUIS".
+    A busca é um `bisect` seguido de uma varredura dos resultados.
+    """
+
+    def __init__(self, entries):
+        names, words = [], []
+        for order, (name, entry) in enumerate(entries):
+            key = normalize(name)
+            names.append((key, order, entry))
+            position = key.find(' ')
+            while position != -1:
+                words.append((key[position + 1:], order, entry))
+                position = key.find(' ', position + 1)
+        names.sort(key=lambda item: item[:2])
+        words.sort(key=lambda item: item[:2])
+        self._names = [key for key, _, _ in names], [entry for _, _, entry in names]
+        self._words = [key for key, _, _ in words], [entry for _, _, entry in words]
+
+    def __len__(self) -> int:
+        return len(self._names[0])
+
+    @staticmethod
+    def _scan(keys: list, entries: list, prefix: str):
+        start = bisect.bisect_left(keys, prefix)
+        for position in range(start, len(keys)):
+            key = keys[position]
+            if not key.startswith(prefix):
+                return
+            yield key, entries[position]
+
+    def names(self, prefix: str):
+        """
+        (key, entry) pairs whose whole name starts with `prefix`, in key
+        order; `prefix` must already be normalized.
+        """
+        return self._scan(*self._names, prefix)
+
+    def words(self, prefix: str):
+        """
+        (key, entry) pairs with a later word starting with `prefix`.
+        """
+        return self._scan(*self._words, prefix)
+
+
+class SearchIndex:
+    """
+    Índices de autocomplete montados no carregamento: marcas, modelos
+    (todos e por marca), carrocerias e cidades (todas e por estado).
+
+    Os resultados trazem primeiro os nomes que começam pelo termo e depois
+    os que têm uma palavra começando por ele, cada grupo em ordem
+    alfabética.
+    """
+
+    def __init__(self, brand_models_bodywork: dict, state_cities: pd.DataFrame):
+        self.brands = {normalize(brand): brand for brand in brand_models_bodywork}
+        self.states = {normalize(state): state for state in state_cities.columns}
+
+        self.models_by_brand = {
+            brand: PrefixIndex(
+                (model, {"type": "model", "brand": brand, "model": model})
+                for model in models)
+            for brand, models in brand_models_bodywork.items()}
+        self.cities_by_state = {
+            state: PrefixIndex(
+                (city, {"type": "city", "state": state, "city": city})
+                for city in dict.fromkeys(state_cities[state].dropna()))
+            for state in state_cities.columns}
+        bodyworks = dict.fromkeys(
+            bodywork for models in brand_models_bodywork.values()
+            for bodyworks in models.values() for bodywork in bodyworks)
+
+        self.indexes = {
+            "brand": PrefixIndex(
+                (brand, {"type": "brand", "brand": brand})
+                for brand in brand_models_bodywork),
+            "model": PrefixIndex(
+                (model, {"type": "model", "brand": brand, "model": model})
+                for brand, models in brand_models_bodywork.items()
+                for model in models),
+            "bodywork": PrefixIndex(
+                (bodywork, {"type": "bodywork", "bodywork": bodywork})
+                for bodywork in bodyworks),
+            "city": PrefixIndex(
+                (city, {"type": "city", "state": state, "city": city})
+                for state in state_cities.columns
+                for city in dict.fromkeys(state_cities[state].dropna())),
+        }
+
+    def search(self, query: str, types=None, brand: str = None,
+               state: str = None, limit: int = 10) -> list:
+        """
+        Up to `limit` entries matching `query`, accent-insensitively.
+        `types` restricts the entry types (default: all); `brand` and
+        `state` (already resolved with `self.brands`/`self.states`) scope
+        models and cities.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        indexes = []
+        for search_type in types or SEARCH_TYPES:
+            if search_type == "model" and brand is not None:
+                indexes.append(self.models_by_brand[brand])
+            elif search_type == "city" and state is not None:
+                indexes.append(self.cities_by_state[state])
+            else:
+                indexes.append(self.indexes[search_type])
+
+        def key(match):
+            return match[0]
+
+        matches = itertools.chain(
+            heapq.merge(*(index.names(prefix) for index in indexes), key=key),
+            heapq.merge(*(index.words(prefix) for index in indexes), key=key))
+        results = []
+        seen = set()
+        for _, entry in matches:
+            if id(entry) not in seen:
+                seen.add(id(entry))
+                results.append(entry)
+                if len(results) == limit:
+                    break
+        return results
@@ -0,0 +1,364 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from apps.car.data_processing import (
+    add_derived_features, transform_data, CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS)
+from apps.car.feature_store import IncrementalStatistics
+from apps.car.model_schema import ModelSchema
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Incrementar quando a limpeza ou as features mudarem: invalida o cache
+PIPELINE_VERSION = 2
+
+CLEAN_COLUMNS = ['price', 'brand', 'model', 'year_model', 'mileage', 'gear',
+                 'fuel', 'bodywork', 'city', 'state']
+RAW_COLUMNS = ['id', 'crawl_date'] + CLEAN_COLUMNS
+DERIVED_COLUMNS = ['age_years', 'price_deviation', 'brand_avg_price',
+                   'state_avg_price', 'city_avg_price', 'is_luxury_brand']
+
+
+def read_crawl(paths: list) -> pd.DataFrame:
+    """
+    Reads the crawl dumps (machinetable.csv format), keeping only the
+    columns used by the pipeline.
+    """
+    return pd.concat(
+        [pd.read_csv(path, usecols=RAW_COLUMNS,
+                     dtype={column: 'string' for column in CATEGORICAL_COLUMNS})
+         for path in paths],
+        ignore_index=True)
+
+
+def latest_listings(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mantém uma linha por anúncio (`id`) em todo o crawl: a do
+    `crawl_date` mais recente (a última do dump em caso de empate; linhas
+    sem data perdem para as datadas). Um anúncio recapturado em outros
+    dias entra uma única vez no treino, na partição do dia mais recente.
+    As linhas mantidas seguem na ordem do dump.
+    """
+    crawled = pd.to_datetime(
+        raw['crawl_date'], utc=True, format='ISO8601', errors='coerce')
+    order = crawled.sort_values(kind='stable', na_position='first').index
+    latest = raw.loc[order, 'id'].drop_duplicates(keep='last').index
+    return raw[raw.index.isin(latest)]
+
+
+def crawl_partitions(raw: pd.DataFrame) -> dict:
+    """
+    Splits the crawl rows by crawl day (`crawl_date`), in date order.
+    """
+    day = raw['crawl_date'].astype('string').str[:10].fillna('sem-data')
+    return {key: partition for key, partition in raw.groupby(day, sort=True)}
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values and column names, not the index),
+    combined with PIPELINE_VERSION: the key of the stage cache.
+    """
+    digest = hashlib.sha256(f"v{PIPELINE_VERSION}".encode())
+    digest.update('\0'.join(df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def clean_crawl(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Limpeza de uma partição do crawl, já sem anúncios repetidos
+    (`latest_listings`): descarta linhas sem os campos do modelo (a
+    quilometragem é a única ausente no dump atual, como no notebook),
+    normaliza os textos e descarta preços e quilometragens inválidos.
+    """
+    df = raw.dropna(subset=CLEAN_COLUMNS)[CLEAN_COLUMNS].copy()
+
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].str.strip().str.upper().astype(object)
+    df['price'] = pd.to_numeric(df['price'], errors='coerce')
+    df['mileage'] = pd.to_numeric(df['mileage'], errors='coerce')
+    df['year_model'] = pd.to_numeric(df['year_model'], errors='coerce')
+
+    current_year = pd.Timestamp.now().year
+    valid = ((df['price'] > 0) & (df['mileage'] >= 0)
+             & df['year_model'].between(1900, current_year + 1))
+    for column in CATEGORICAL_COLUMNS:
+        valid &= df[column] != ''
+    df = df[valid]
+    df['year_model'] = df['year_model'].astype(int)
+    return df.reset_index(drop=True)
+
+
+def _process_partition(raw: pd.DataFrame):
+    clean = clean_crawl(raw)
+    return clean, IncrementalStatistics.from_dataframe(clean)
+
+
+class StageCache:
+    """
+    Cache em disco das etapas do pipeline, uma entrada (joblib) por etapa
+    e hash da entrada. Gravações atômicas: um treino interrompido não deixa
+    entradas pela metade.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{key}.joblib")
+
+    def get(self, stage: str, key: str):
+        if self.cache_dir is None:
+            return None
+        path = self._path(stage, key)
+        if not os.path.exists(path):
+            return None
+        return joblib.load(path)
+
+    def put(self, stage: str, key: str, value):
+        if self.cache_dir is None:
+            return
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(value, path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+
+def prepare_dataset(raw: pd.DataFrame, cache: StageCache, n_jobs: int = -1):
+    """
+    Remove os anúncios repetidos em todo o crawl, mantendo o mais recente,
+    limpa o crawl e agrega as estatísticas de grupo por partição
+    (`crawl_date`). Partições já vistas (mesmo conteúdo) vêm do cache;
+    apenas as novas são processadas, em paralelo. Uma partição cujos
+    anúncios foram recapturados depois muda de conteúdo e é reprocessada.
+
+    Retorna o dataset limpo (na ordem das partições), as estatísticas das
+    features e um resumo das partições.
+    """
+    partitions = crawl_partitions(latest_listings(raw))
+    keys = {day: frame_hash(partition) for day, partition in partitions.items()}
+    results = {day: cache.get('partitions', key) for day, key in keys.items()}
+    missing = [day for day, result in results.items() if result is None]
+
+    if missing:
+        logger.info("Processando %d de %d partições do crawl: %s",
+                    len(missing), len(partitions), ', '.join(missing))
+        processed = joblib.Parallel(n_jobs=n_jobs if len(missing) > 1 else 1)(
+            joblib.delayed(_process_partition)(partitions[day]) for day in missing)
+        for day, result in zip(missing, processed):
+            cache.put('partitions', keys[day], result)
+            results[day] = result
+
+    stats = IncrementalStatistics()
+    for _, partition_stats in results.values():
+        stats.update(partition_stats)
+    clean = pd.concat([clean for clean, _ in results.values()],
+                      ignore_index=True)
+    summary = {
+        day: {'raw_rows': len(partitions[day]), 'rows': len(results[day][0]),
+              'cached': day not in missing}
+        for day in partitions}
+    return clean, stats.to_statistics(), summary
+
+
+def build_features(clean: pd.DataFrame, stats) -> pd.DataFrame:
+    """
+    Dataset de referência exportado (clean_original_df.csv): as linhas
+    limpas com as features numéricas calculadas por `add_derived_features`,
+    o mesmo código usado nas previsões.
+    """
+    df = add_derived_features(clean.copy(), stats)
+    return df[CLEAN_COLUMNS + DERIVED_COLUMNS]
+
+
+def fit_artifacts(
+        df: pd.DataFrame,
+        stats,
+        n_estimators: int = 100,
+        n_jobs: int = -1,
+        random_state: int = 0,
+        test_size: float = 0.2,
+        cache: StageCache = None) -> dict:
+    """
+    Ajusta o OneHotEncoder, o StandardScaler e o random forest (em
+    `n_jobs` núcleos) e avalia o modelo em `test_size` das linhas.
+
+    A matriz de features é gerada por `transform_data`, como na API. O
+    modelo ajustado fica no cache, chaveado pelas features e
+    hiperparâmetros: retreinar sobre os mesmos dados não reajusta a
+    floresta.
+    """
+    TRANSFORMER = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+    TRANSFORMER.fit(df[CATEGORICAL_COLUMNS])
+    NORMALIZER = StandardScaler()
+    NORMALIZER.fit(df[NUMERICAL_COLUMNS])
+    feature_names = NUMERICAL_COLUMNS + list(
+        TRANSFORMER.get_feature_names_out(CATEGORICAL_COLUMNS))
+
+    X = transform_data(
+        df[CLEAN_COLUMNS].drop(columns='price'), NORMALIZER, TRANSFORMER,
+        feature_names, stats)
+    y = df['price']
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state)
+
+    params = {'n_estimators': n_estimators, 'random_state': random_state,
+              'test_size': test_size}
+    cache = cache or StageCache()
+    key = hashlib.sha256(
+        (frame_hash(X_train) + frame_hash(y_train.to_frame())
+         + json.dumps(params, sort_keys=True)).encode()).hexdigest()
+    MODEL = cache.get('model', key)
+    if MODEL is None:
+        started = time.perf_counter()
+        MODEL = RandomForestRegressor(
+            n_estimators=n_estimators, n_jobs=n_jobs, random_state=random_state)
+        MODEL.fit(X_train.to_numpy(), y_train.to_numpy())
+        logger.info("Random forest ajustado em %.1f s",
+                    time.perf_counter() - started)
+        cache.put('model', key, MODEL)
+    else:
+        logger.info("Random forest reaproveitado do cache")
+
+    predicted = MODEL.predict(X_test.to_numpy())
+    metrics = {
+        'r2': r2_score(y_test, predicted),
+        'mae': mean_absolute_error(y_test, predicted),
+        'rmse': float(np.sqrt(mean_squared_error(y_test, predicted))),
+        'train_rows': len(X_train),
+        'test_rows': len(X_test),
+    }
+    return {
+        'model': MODEL,
+        'normalizer': NORMALIZER,
+        'transformer': TRANSFORMER,
+        'model_schema': ModelSchema.from_frame(X),
+        'X_test': X_test,
+        'metrics': metrics,
+    }
+
+
+def export_bundle(output_dir: str, fitted: dict, reference: pd.DataFrame,
+                  report: dict):
+    """
+    Grava o bundle no layout de `settings.artifact_paths`, com o dataset de
+    referência e o X_test.csv. Cada arquivo é escrito em um temporário e
+    renomeado; para trocar o bundle servido de uma vez, grave em um
+    diretório novo e aponte ARTIFACTS_DIR (ou um symlink) para ele.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def path(name):
+        return os.path.join(output_dir, name)
+
+    def replace(name, write):
+        write(path(name) + '.tmp')
+        os.replace(path(name) + '.tmp', path(name))
+
+    replace('randfor_model.pkl',
+            lambda tmp: joblib.dump(fitted['model'], tmp))
+    replace('scaler.pkl', lambda tmp: joblib.dump(fitted['normalizer'], tmp))
+    replace('onehotencoder.pkl',
+            lambda tmp: joblib.dump(fitted['transformer'], tmp))
+    replace('model_schema.json', fitted['model_schema'].save)
+    replace('clean_original_df.csv',
+            lambda tmp: reference.to_csv(tmp, index=False))
+    replace('X_test.csv', lambda tmp: fitted['X_test'].to_csv(tmp, index=False))
+
+    def write_report(tmp):
+        with open(tmp, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+    replace('training_report.json', write_report)
+
+
+def train(
+        inputs: list,
+        output_dir: str,
+        cache_dir: str = None,
+        n_estimators: int = 100,
+        n_jobs: int = -1,
+        random_state: int = 0,
+        test_size: float = 0.2) -> dict:
+    """
+    Pipeline completo: crawl bruto -> limpeza -> features -> ajuste ->
+    bundle de artefatos em `output_dir`. Retorna o relatório do treino.
+    """
+    timings = {}
+    started = time.perf_counter()
+    cache = StageCache(cache_dir)
+
+    raw = read_crawl(inputs)
+    timings['read'] = time.perf_counter() - started
+
+    stage = time.perf_counter()
+    clean, stats, partitions = prepare_dataset(raw, cache, n_jobs)
+    timings['clean'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    reference = build_features(clean, stats)
+    timings['features'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    fitted = fit_artifacts(
+        reference, stats, n_estimators=n_estimators, n_jobs=n_jobs,
+        random_state=random_state, test_size=test_size, cache=cache)
+    timings['fit'] = time.perf_counter() - stage
+
+    report = {
+        'pipeline_version': PIPELINE_VERSION,
+        'inputs': list(inputs),
+        'rows': len(reference),
+        'partitions': partitions,
+        'params': {'n_estimators': n_estimators, 'random_state': random_state,
+                   'test_size': test_size},
+        'metrics': fitted['metrics'],
+    }
+    stage = time.perf_counter()
+    export_bundle(output_dir, fitted, reference, report)
+    timings['export'] = time.perf_counter() - stage
+    timings['total'] = time.perf_counter() - started
+    report['seconds'] = timings
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Treina o modelo a partir do crawl bruto e exporta o bundle de artefatos')
+    parser.add_argument('inputs', nargs='+',
+                        help='CSVs no formato do data/machinetable.csv')
+    parser.add_argument('--output', required=True,
+                        help='diretório do bundle (use um diretório novo por treino)')
+    parser.add_argument('--cache-dir', default=os.path.join('.cache', 'training'),
+                        help='cache das etapas; "" desativa')
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--n-jobs', type=int, default=-1,
+                        help='núcleos usados (padrão: todos)')
+    parser.add_argument('--random-state', type=int, default=0)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = train(
+        args.inputs, args.output, cache_dir=args.cache_dir or None,
+        n_estimators=args.n_estimators, n_jobs=args.n_jobs,
+        random_state=args.random_state, test_size=args.test_size)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,175 @@
+import json
+import hashlib
+
+import numpy as np
+
+from apps.car.exceptions import InvalidBatchPayloadException, InvalidQuantilesException
+
+
+NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonlines",
+}
+
+
+# Formatos de preço das respostas: "brl" (texto, ex.: "80.571,10") e
+# "raw" (número em reais, ex.: 80571.1)
+PRICE_FORMATS = ("brl", "raw")
+
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+
 def format_price(predicted_price):
     """
-    Formata o valor previsto no estilo monetário brasileiro.
-    Converte para string e remove decimais.
+    Formata o valor previsto (em centavos) no estilo monetário brasileiro,
+    em qualquer magnitude: 8057110 -> "80.571,10", 12345 -> "123,45".
+    Os centavos fracionários são descartados.
+    """
+    cents = int(predicted_price)
+    reais, centavos = divmod(abs(cents), 100)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{reais:_},{centavos:02d}".replace("_", ".")
+
+
+def _format_group(reais: np.ndarray, centavos: np.ndarray, n_digits: int,
+                  negative: bool) -> np.ndarray:
+    # Todos os valores do grupo têm o mesmo comprimento: cada posição do
+    # texto é uma linha da matriz (largura, n) de code points
+    width = negative + n_digits + (n_digits - 1) // 3 + 3
+    chars = np.empty((width, len(reais)), dtype=np.uint32)
+    chars[-1] = ord("0") + centavos % 10
+    chars[-2] = ord("0") + centavos // 10
+    chars[-3] = ord(",")
+    for digit in range(n_digits):
+        position = width - 4 - digit - digit // 3
+        if digit and digit % 3 == 0:
+            chars[position + 1] = ord(".")
+        chars[position] = ord("0") + reais % 10
+        reais = reais // 10
+    if negative:
+        chars[0] = ord("-")
+    return np.ascontiguousarray(chars.T).view(np.dtype(("U", width))).ravel()
+
+
+def format_prices(predicted_prices) -> np.ndarray:
+    """
+    Versão vetorizada de `format_price` para um array de previsões
+    (finitas), com o mesmo texto para cada valor.
+
+    Os valores são agrupados pelo número de dígitos dos reais (e pelo
+    sinal); os caracteres de cada grupo são escritos de uma vez, posição a
+    posição, em uma matriz de code points lida como um array de strings
+    NumPy.
+    """
+    cents = np.trunc(np.asarray(predicted_prices, dtype=np.float64)).astype(np.int64)
+    if cents.size == 0:
+        return np.array([], dtype=str)
+    negative = cents < 0
+    reais, centavos = np.divmod(np.abs(cents), 100)
+    n_digits = np.maximum(
+        np.searchsorted(_POWERS_OF_TEN, reais, side="right"), 1)
+
+    widths = negative + n_digits + (n_digits - 1) // 3 + 3
+    formatted = np.empty(len(cents), dtype=np.dtype(("U", int(widths.max()))))
+    groups = 2 * n_digits + negative
+    for group in np.unique(groups):
+        rows = np.flatnonzero(groups == group)
+        formatted[rows] = _format_group(
+            reais[rows], centavos[rows], *divmod(int(group), 2))
+    return formatted
+
+
+def raw_prices(predicted_prices) -> np.ndarray:
+    """
+    Previsões em reais, com os mesmos centavos do texto de `format_prices`.
+    """
+    return np.trunc(np.asarray(predicted_prices, dtype=np.float64)) / 100
+
+
+def price_values(predicted_prices, price_format: str = "brl") -> list:
+    """
+    Previsões no formato de preço da resposta: textos no estilo brasileiro
+    ("brl") ou números em reais ("raw").
+    """
+    if price_format == "raw":
+        return raw_prices(predicted_prices).tolist()
+    return format_prices(predicted_prices).tolist()
+
+
+def price_value(predicted_price, price_format: str = "brl"):
+    """
+    Uma previsão no formato de preço da resposta.
+    """
+    if price_format == "raw":
+        return int(predicted_price) / 100
+    return format_price(predicted_price)
+
+
+def parse_batch_payload(body: bytes, content_type: str) -> list:
+    """
+    Decodifica o corpo de uma requisição de lote.
+
+    Aceita uma lista JSON de objetos ou NDJSON (um objeto JSON por linha,
+    quando o Content-Type é application/x-ndjson ou application/jsonlines).
+    Linhas NDJSON inválidas viram `None`, para que sejam reportadas como
+    erro do item correspondente sem invalidar o lote inteiro.
+    """
+    content_type = content_type.split(';')[0].strip().lower()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+        return items
+
+    try:
+        items = json.loads(body)
+    except ValueError as e:
+        raise InvalidBatchPayloadException(f"JSON inválido ({e})")
+
+    if not isinstance(items, list):
+        raise InvalidBatchPayloadException("esperada uma lista de carros")
+    return items
+
+
+def parse_quantiles(value: str) -> tuple:
+    """
+    Converte "0.1,0.9" na tupla de quantis (0.1, 0.9), sem repetidos e em
+    ordem crescente. Cada quantil deve estar entre 0 e 1.
+    """
+    try:
+        quantiles = tuple(sorted({float(quantile) for quantile in value.split(',')}))
+    except ValueError:
+        raise InvalidQuantilesException(value)
+    if not all(0 <= quantile <= 1 for quantile in quantiles):
+        raise InvalidQuantilesException(value)
+    return quantiles
+
+
+def validation_error_details(exc) -> list:
+    """
+    Resume um `pydantic.ValidationError` em uma lista serializável em JSON.
     """
-    formatted_prediction = str(int(predicted_price))
+    return [
+        {"loc": list(error["loc"]), "msg": error["msg"]}
+        for error in exc.errors()
+    ]
 
-    if len(formatted_prediction) == 7:  # Caso o número tenha 7 dígitos (2 antes do ponto)
-        formatted_prediction = formatted_prediction[:2] + "." + \
-            formatted_prediction[2:5] + "," + formatted_prediction[5:]
-    elif len(formatted_prediction) == 8:  # Caso o número tenha 8 dígitos (3 antes do ponto)
-        formatted_prediction = formatted_prediction[:3] + "." + \
-            formatted_prediction[3:6] + "," + formatted_prediction[6:]
-    return formatted_prediction
+
+def artifacts_version(paths: list) -> str:
+    """
+    Calcula a versão de um conjunto de artefatos a partir do conteúdo dos
+    arquivos (sha256 truncado em 12 caracteres).
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
@@ -0,0 +1,170 @@
+import pandas as pd
+
+
+def _pairs(dataset: pd.DataFrame, parent: str, child: str) -> dict:
+    """
+    {parent: {child, ...}} with the (parent, child) pairs of `dataset`.
+    """
+    pairs = {}
+    if dataset is None:
+        return pairs
+    for parent_value, child_value in dataset[[parent, child]].dropna() \
+            .drop_duplicates().itertuples(index=False):
+        pairs.setdefault(parent_value, set()).add(child_value)
+    return pairs
+
+
+class Vocabulary:
+    """
+    Valores aceitos em cada campo categórico do `Car`, em frozensets e
+    dicts montados uma vez por carga dos dados.
+
+    O vocabulário cobre tanto o catálogo anunciado pelas rotas de listagem
+    (brand_model_bodywork.json, data_valid.csv, state_cities.csv) quanto o
+    que o modelo viu no treino (as categorias do OneHotEncoder e os pares
+    marca/modelo e estado/cidade do dataset): nenhum carro do dataset é
+    recusado.
+
+    Cada `*_error` devolve a mensagem de erro do valor, ou None quando ele
+    é válido. Os checks hierárquicos (modelo da marca, cidade do estado)
+    são feitos só quando o campo pai é válido; caso contrário o valor é
+    checado contra o vocabulário inteiro. A carroceria é checada contra
+    todas as carrocerias conhecidas: o catálogo e o dataset não listam
+    todas as carrocerias de cada modelo, e o encoder as codifica
+    independentemente do modelo.
+    """
+
+    def __init__(self, brand_models: dict, gears, fuels, bodyworks,
+                 state_cities: dict):
+        self.brands = frozenset(brand_models)
+        self.models = {
+            brand: frozenset(models)
+            for brand, models in brand_models.items()}
+        self.all_models = frozenset().union(*self.models.values())
+        self.bodyworks = frozenset(bodyworks)
+        self.gears = frozenset(gears)
+        self.fuels = frozenset(fuels)
+        self._gear_options = ", ".join(sorted(self.gears))
+        self._fuel_options = ", ".join(sorted(self.fuels))
+        self._bodywork_options = ", ".join(sorted(self.bodyworks))
+        self.cities = {
+            state: frozenset(cities) for state, cities in state_cities.items()}
+        self.states = frozenset(self.cities)
+        self.all_cities = frozenset().union(*self.cities.values())
+
+    @classmethod
+    def from_data(cls, brand_models_bodywork: dict, data_valid: pd.DataFrame,
+                  state_cities: pd.DataFrame, dataset: pd.DataFrame = None,
+                  TRANSFORMER=None) -> 'Vocabulary':
+        """
+        Vocabulary of the catalogue files united with the values of the
+        training `dataset` and the categories of the `TRANSFORMER`.
+        """
+        brand_models = _pairs(dataset, 'brand', 'model')
+        for brand, models in brand_models_bodywork.items():
+            brand_models.setdefault(brand, set()).update(models)
+
+        cities = _pairs(dataset, 'state', 'city')
+        for state in state_cities.columns:
+            cities.setdefault(state, set()).update(state_cities[state].dropna())
+
+        bodyworks = {
+            bodywork
+            for models in brand_models_bodywork.values()
+            for model_bodyworks in models.values()
+            for bodywork in model_bodyworks}
+        gears = set(data_valid['gear'].dropna())
+        fuels = set(data_valid['fuel'].dropna())
+        known = {'bodywork': bodyworks, 'gear': gears, 'fuel': fuels}
+        if dataset is not None:
+            for column, values in known.items():
+                values.update(dataset[column].dropna().unique())
+        if TRANSFORMER is not None:
+            for column, categories in zip(
+                    TRANSFORMER.feature_names_in_, TRANSFORMER.categories_):
+                if column in known:
+                    known[column].update(categories)
+
+        return cls(brand_models, gears, fuels, bodyworks, cities)
+
+    def brand_error(self, brand):
+        if brand not in self.brands:
+            return (f'Invalid brand: {brand}. Enter a brand present in the '
+                    f'data/brand_models_bodywork.json file')
+
+    def model_error(self, model, brand=None):
+        if brand is None:
+            if model not in self.all_models:
+                return f'Invalid model: {model}'
+        elif model not in self.models[brand]:
+            return f'Invalid model for brand {brand}: {model}'
+
+    def bodywork_error(self, bodywork):
+        if bodywork not in self.bodyworks:
+            return (f'Invalid bodywork: {bodywork}. '
+                    f'Enter one of: {self._bodywork_options}')
+
+    def gear_error(self, gear):
+        if gear not in self.gears:
+            return f'Invalid gear: {gear}. Enter one of: {self._gear_options}'
+
+    def fuel_error(self, fuel):
+        if fuel not in self.fuels:
+            return f'Invalid fuel: {fuel}. Enter one of: {self._fuel_options}'
+
+    def city_error(self, city):
+        if city not in self.all_cities:
+            return f'Invalid city: {city}'
+
+    def state_error(self, state, city=None):
+        if state not in self.states:
+            return f'Invalid state: {state}'
+        if city is not None and city not in self.cities[state]:
+            return f'Invalid city for state {state}: {city}'
+
+    def errors(self, car: dict) -> list:
+        """
+        Validation errors of the categorical fields of a raw car payload,
+        in the format of `validation_error_details` and with the same
+        messages and order the `Car` validators produce. Values that are
+        missing or not strings are left for the full pydantic validation.
+        """
+        get = car.get
+        brand, model, gear, fuel, bodywork, city, state = (
+            get('brand'), get('model'), get('gear'), get('fuel'),
+            get('bodywork'), get('city'), get('state'))
+
+        # Caminho comum: tudo válido, só lookups em sets
+        try:
+            if (brand in self.brands and model in self.models[brand]
+                    and gear in self.gears and fuel in self.fuels
+                    and bodywork in self.bodyworks
+                    and state in self.states and city in self.cities[state]):
+                return []
+        except TypeError:  # valor não hashable (lista, objeto)
+            pass
+
+        valid = {}
+        errors = []
+
+        def check(field, value, message):
+            if message is None:
+                valid[field] = value
+            else:
+                errors.append({"loc": [field], "msg": f"Value error, {message}"})
+
+        if isinstance(brand, str):
+            check('brand', brand, self.brand_error(brand))
+        if isinstance(model, str):
+            check('model', model, self.model_error(model, valid.get('brand')))
+        if isinstance(gear, str):
+            check('gear', gear, self.gear_error(gear))
+        if isinstance(fuel, str):
+            check('fuel', fuel, self.fuel_error(fuel))
+        if isinstance(bodywork, str):
+            check('bodywork', bodywork, self.bodywork_error(bodywork))
+        if isinstance(city, str):
+            check('city', city, self.city_error(city))
+        if isinstance(state, str):
+            check('state', state, self.state_error(state, valid.get('city')))
+        return errors
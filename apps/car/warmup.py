@@ -0,0 +1,97 @@
+import time
+import json
+
+import numpy as np
+
+from apps.car.schemas import Car
+from apps.car.inference import predict_row, predict_cars, predict_rows, predict_row_interval
+from apps.car.utils import format_price, format_prices
+from apps.metrics.stages import stages_not_recorded
+from settings import PREDICT_INTERVAL_QUANTILES
+
+
+def representative_cars(fixture_path: str, brand_models_bodywork: dict) -> list:
+    """
+    Cars replayed by the warmup: the fixture car followed by one car per
+    brand (its first model and bodywork), the remaining fields taken from
+    the fixture.
+    """
+    with open(fixture_path, 'r') as file:
+        fixture = json.load(file)
+
+    cars = [fixture]
+    for brand, models in brand_models_bodywork.items():
+        for model, bodyworks in models.items():
+            if bodyworks:
+                cars.append({**fixture, 'brand': brand, 'model': model,
+                             'bodywork': bodyworks[0]})
+                break
+    return cars
+
+
+def replay(state, cars: list, budget_seconds: float) -> dict:
+    """
+    Passa `cars` pelo pipeline de previsão de `state`, na ordem das rotas:
+    validação do `Car`, chave do cache, previsão de um carro (com e sem
+    intervalo) e formatação e, ao final, a previsão em lote (e a do
+    micro-batcher, se ativo) dos carros já reproduzidos.
+
+    Os carros seguintes são pulados quando o orçamento se esgota; o
+    primeiro carro e o lote sempre rodam, para que um bundle quebrado seja
+    recusado. Carros que não validam contra o vocabulário carregado são
+    ignorados. Levanta ValueError se nenhum carro validar ou se alguma
+    previsão não for finita. As etapas não são registradas nas métricas.
+    """
+    # Fora dos histogramas de produção de car_prediction_stage_seconds
+    with stages_not_recorded():
+        started = time.perf_counter()
+        deadline = started + budget_seconds
+
+        rows = []
+        predictions = []
+        replayed = invalid = 0
+        for car in cars:
+            if rows and time.perf_counter() >= deadline:
+                break
+            replayed += 1
+            try:
+                # Contra o vocabulário do estado aquecido, ainda não ativado
+                car_data = Car.model_validate(
+                    car, context={'vocabulary': state.VOCABULARY}).model_dump()
+            except ValueError:  # pydantic.ValidationError
+                invalid += 1
+                continue
+            state.PREDICTION_CACHE.make_key(car_data, state.MODEL_VERSION)
+            predicted_price = predict_row(
+                state.MODEL, state.FEATURE_LAYOUT, state.FEATURE_STATS,
+                car_data)
+            format_price(predicted_price)
+            interval_price, median, values = predict_row_interval(
+                state.FOREST, state.FEATURE_LAYOUT, state.FEATURE_STATS,
+                car_data, PREDICT_INTERVAL_QUANTILES)
+            rows.append(car_data)
+            predictions.extend(
+                [predicted_price, interval_price, median, *values])
+
+        if not rows:
+            raise ValueError("nenhum carro de aquecimento válido")
+
+        predictions.extend(predict_cars(
+            state.MODEL, state.NORMALIZER, state.TRANSFORMER,
+            state.MODEL_SCHEMA.feature_names, state.FEATURE_STATS, rows))
+        if state.MICRO_BATCHER is not None:
+            predictions.extend(predict_rows(
+                state.MODEL, state.FEATURE_LAYOUT, state.FEATURE_STATS, rows))
+
+        if not np.isfinite(predictions).all():
+            raise ValueError("previsões de aquecimento não finitas")
+        format_prices(predictions)
+
+    return {
+        "cars": replayed,
+        "total_cars": len(cars),
+        "invalid": invalid,
+        "budget_seconds": budget_seconds,
+        "budget_exhausted": replayed < len(cars),
+        "seconds": time.perf_counter() - started,
+    }
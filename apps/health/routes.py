@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+
+
+router = APIRouter()
+
+
+@router.get("/live", response_model=dict)
+async def liveness():
+    """
+    Liveness probe: o processo está de pé e o event loop responde. Não
+    depende dos artefatos; fora do Bearer token da API.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready", response_model=dict)
+async def readiness(request: Request):
+    """
+    Readiness probe: 200 depois que os artefatos foram carregados e o
+    pipeline de previsão aquecido, 503 antes disso. Traz a versão ativa
+    dos artefatos e a duração de cada fase do startup. Fora do Bearer
+    token da API.
+    """
+    state = request.app.state
+    startup = getattr(state, 'STARTUP', None)
+    if startup is None or not startup.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting"})
+    return {
+        "status": "ready",
+        "model_version": state.MODEL_VERSION,
+        **startup.stats(),
+    }
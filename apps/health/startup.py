@@ -0,0 +1,67 @@
+import time
+
+
+class PhaseTimer:
+    """
+    Duração de fases consecutivas: cada `lap(phase)` registra o tempo
+    desde o `lap` anterior (ou desde a criação do timer).
+    """
+
+    def __init__(self, started: float = None):
+        self.phases = {}
+        self._last = time.perf_counter() if started is None else started
+
+    def lap(self, phase: str) -> float:
+        """
+        Closes `phase` and returns its duration in seconds.
+        """
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+        self._last = now
+        return elapsed
+
+
+class StartupReport:
+    """
+    Fases do startup do worker (imports, carga dos artefatos, aquecimento)
+    e a prontidão exposta em /health/ready.
+
+    Criado na importação do main.py e compartilhado pelos estados
+    carregados, como o cache de previsões: sobrevive às recargas dos
+    artefatos, que não tiram o worker de prontidão.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.warmup = None
+        self.ready = False
+        self.ready_at = None
+
+    def record(self, phases: dict, prefix: str = ''):
+        for phase, seconds in phases.items():
+            self.phases[prefix + phase] = seconds
+
+    def mark_ready(self, warmup: dict):
+        self.warmup = warmup
+        self.ready = True
+        self.ready_at = time.time()
+
+    def total_seconds(self) -> float:
+        return sum(self.phases.values())
+
+    def summary(self) -> str:
+        """
+        One log line with the duration of every phase.
+        """
+        return ", ".join(f"{phase} {seconds:.2f}s"
+                         for phase, seconds in self.phases.items())
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "ready_at": self.ready_at,
+            "startup_seconds": self.total_seconds(),
+            "phases": self.phases,
+            "warmup": self.warmup,
+        }
@@ -0,0 +1,87 @@
+from apps.metrics.registry import Counter, Gauge
+
+
+def _gauge(name, documentation, value, labelnames=(), labelvalues=()) -> Gauge:
+    gauge = Gauge(name, documentation, labelnames)
+    gauge.set(value, *labelvalues)
+    return gauge
+
+
+def _counter(name, documentation, value) -> Counter:
+    counter = Counter(name, documentation)
+    counter.inc(amount=value)
+    return counter
+
+
+def _startup_phases(phases: dict) -> Gauge:
+    gauge = Gauge('startup_phase_duration_seconds',
+                  'Duração de cada fase do startup do worker', ('phase',))
+    for phase, seconds in phases.items():
+        gauge.set(seconds, phase)
+    return gauge
+
+
+def application_metrics(app) -> list:
+    """
+    Métricas lidas do estado ativo a cada coleta: versão e tempo de carga
+    dos artefatos, fases do startup, recargas, cache de previsões, executor
+    e micro-batcher.
+    """
+    state = app.state
+    version = getattr(state, 'MODEL_VERSION', None)
+    if version is None:  # antes do startup
+        return []
+
+    metrics = [
+        _gauge('model_info', 'Versão ativa dos artefatos', 1,
+               ('version', 'artifacts_dir'),
+               (version, state.ARTIFACTS_DIR)),
+        _gauge('model_load_duration_seconds',
+               'Duração da carga do bundle de artefatos ativo',
+               state.LOAD_SECONDS),
+    ]
+
+    startup = getattr(state, 'STARTUP', None)
+    if startup is not None:
+        metrics.append(_startup_phases(startup.phases))
+
+    reloader = getattr(state, 'RELOADER', None)
+    if reloader is not None:
+        metrics += [
+            _counter('artifact_reloads_total', 'Recargas de artefatos',
+                     reloader.reloads),
+            _counter('artifact_reload_failures_total',
+                     'Recargas de artefatos que falharam', reloader.failures),
+        ]
+
+    cache = state.PREDICTION_CACHE.stats()
+    metrics += [
+        _gauge('prediction_cache_size', 'Entradas no cache de previsões',
+               cache['size']),
+        _counter('prediction_cache_hits_total', 'Acertos do cache de previsões',
+                 cache['hits']),
+        _counter('prediction_cache_misses_total', 'Faltas do cache de previsões',
+                 cache['misses']),
+        _counter('prediction_cache_evictions_total',
+                 'Entradas removidas por LRU', cache['evictions']),
+    ]
+
+    executor = state.PREDICTION_EXECUTOR.stats()
+    metrics += [
+        _gauge('prediction_executor_pending',
+               'Previsões em execução ou na fila', executor['pending']),
+        _counter('prediction_executor_rejected_total',
+                 'Previsões recusadas com 429', executor['rejected']),
+        _counter('prediction_executor_timeouts_total',
+                 'Previsões que excederam o tempo limite', executor['timeouts']),
+    ]
+
+    batcher = state.MICRO_BATCHER
+    if batcher is not None:
+        metrics += [
+            _counter('micro_batcher_batches_total', 'Lotes despachados',
+                     batcher.batches),
+            _counter('micro_batcher_items_total', 'Previsões agrupadas',
+                     batcher.items),
+        ]
+    return metrics
@@ -0,0 +1,63 @@
+import time
+
+from apps.metrics.registry import REGISTRY
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    'http_requests_total', 'Requisições atendidas',
+    labelnames=('method', 'route', 'status'))
+REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Duração das requisições',
+    labelnames=('method', 'route'))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    'http_requests_in_flight', 'Requisições em andamento')
+
+
+def _route(scope) -> str:
+    # Template da rota (ex.: /car/brand_predict/{brand}), para não criar
+    # uma série por valor de parâmetro
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP: contagem por rota e
+    status, histograma de duração por rota e requisições em andamento.
+
+    Guarda o início da requisição em `scope['metrics_started']`, usado
+    pelas rotas para medir a etapa de parsing e validação do corpo, e
+    aciona o `SamplingProfiler` opcional.
+    """
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        scope['metrics_started'] = started
+        session = self.profiler.start(scope['path']) if self.profiler else None
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = _route(scope)
+            method = scope['method']
+            REQUEST_SECONDS.observe(time.perf_counter() - started, method, route)
+            REQUESTS_TOTAL.inc(method, route, str(status))
+            if session is not None:
+                session.route = route
+                self.profiler.stop(session)
@@ -0,0 +1,135 @@
+import os
+import re
+import sys
+import time
+import random
+import logging
+import threading
+import collections
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Folhas de threads ociosas (pool sem trabalho, event loop esperando I/O)
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('selectors.py', 'select'),
+    ('thread.py', '_worker'),
+}
+
+
+def _stack(frame):
+    # Formato "folded" (raiz;...;folha), lido pelo flamegraph.pl e speedscope
+    leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+    if leaf in IDLE_FRAMES:
+        return None
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(frames))
+
+
+class ProfileSession:
+    __slots__ = ('route', 'started', 'samples')
+
+    def __init__(self, route: str):
+        self.route = route
+        self.started = time.perf_counter()
+        self.samples = collections.Counter()
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem, opcional, para requisições lentas.
+
+    Enquanto houver requisições amostradas em andamento, uma thread de fundo
+    captura a pilha de todas as threads (event loop e pool de inferência) a
+    cada `interval_ms`. As amostras só são guardadas quando a requisição
+    passa de `threshold_ms`: a pilha agregada é gravada em formato folded
+    em `output_dir` e as pilhas mais frequentes vão para o log.
+
+    `sample_rate` é a fração das requisições acompanhadas; as demais não
+    têm custo algum.
+    """
+
+    def __init__(
+            self,
+            threshold_ms: float,
+            sample_rate: float = 1.0,
+            interval_ms: float = 5.0,
+            output_dir: str = 'profiles',
+            max_reports: int = 100):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.output_dir = output_dir
+        self.max_reports = max_reports
+        self.reports = 0
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, route: str):
+        """
+        Starts following a request; returns None when it is not sampled.
+        """
+        if self.reports >= self.max_reports or random.random() >= self.sample_rate:
+            return None
+        session = ProfileSession(route)
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._sample_loop, name="sampling-profiler",
+                    daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return session
+
+    def stop(self, session: ProfileSession):
+        """
+        Stops following the request, reporting it when it was slow.
+        """
+        with self._lock:
+            self._sessions.discard(session)
+        elapsed = time.perf_counter() - session.started
+        if elapsed >= self.threshold and session.samples:
+            self._report(session, elapsed)
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._wakeup.clear()
+                    continue
+            stacks = [stack
+                      for thread_id, frame in sys._current_frames().items()
+                      if thread_id != own_id
+                      for stack in (_stack(frame),) if stack is not None]
+            for session in sessions:
+                session.samples.update(stacks)
+            time.sleep(self.interval)
+
+    def _report(self, session: ProfileSession, elapsed: float):
+        self.reports += 1
+        os.makedirs(self.output_dir, exist_ok=True)
+        filename = os.path.join(
+            self.output_dir,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{self.reports}-"
+            f"{re.sub(r'[^A-Za-z0-9]+', '_', session.route).strip('_')}.folded")
+        with open(filename, 'w') as file:
+            for stack, count in session.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+        top = "; ".join(
+            f"{stack.rsplit(';', 1)[-1]} x{count}"
+            for stack, count in session.samples.most_common(3))
+        logger.warning("Requisição lenta em %s: %.0f ms, perfil em %s (%s)",
+                       session.route, elapsed * 1000, filename, top)
@@ -0,0 +1,155 @@
+import bisect
+import threading
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _labels(labelnames, labelvalues, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"'
+             for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> list:
+        return [f'# HELP {self.name} {self.documentation}',
+                f'# TYPE {self.name} {self.type}']
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+            for labels, value in values]
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, value: float, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def dec(self, *labelvalues, amount: float = 1):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    """
+    Histograma cumulativo no formato do Prometheus: contagem por bucket
+    (limite superior `le`), soma e total de observações por combinação de
+    labels.
+    """
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(),
+                 buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                series = self._values[labelvalues] = [
+                    [0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            values = [(labels, (list(counts), total, count))
+                      for labels, (counts, total, count) in self._values.items()]
+        lines = self.header()
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(
+                    self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f'{self.name}_bucket'
+                             f'{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {total!r}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class Registry:
+    """
+    Conjunto de métricas exportadas em `/metrics`, no formato de texto do
+    Prometheus.
+
+    Além das métricas atualizadas no hot path, aceita coletores: funções
+    chamadas a cada coleta que devolvem métricas calculadas na hora (a
+    partir dos contadores do cache, do executor etc.).
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector):
+        """
+        Registers a function returning a list of metrics (usually gauges
+        and counters filled at collection time).
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
@@ -0,0 +1,28 @@
+import os
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import PlainTextResponse, JSONResponse
+
+from apps.auth.middlewares import allowed_token_hashes, token_authorized, _bearer_token
+from apps.metrics.registry import REGISTRY
+
+router = APIRouter()
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Comparado pelo SHA-256, como os tokens da API
+METRICS_TOKEN_HASHES = allowed_token_hashes(METRICS_TOKEN, None)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Prometheus text exposition of the application metrics. Outside the
+    Bearer token of the API; protected by METRICS_TOKEN when it is set.
+    """
+    if METRICS_TOKEN_HASHES and not token_authorized(
+            _bearer_token(request.scope), METRICS_TOKEN_HASHES):
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": "Token de métricas inválido"})
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4")
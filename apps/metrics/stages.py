@@ -0,0 +1,52 @@
+import time
+import contextlib
+import contextvars
+
+from apps.metrics.registry import REGISTRY
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'car_prediction_stage_seconds',
+    'Duração de cada etapa do pipeline de previsão',
+    labelnames=('stage',))
+
+# Desligado no aquecimento: as previsões sintéticas do startup e das
+# recargas não entram nos histogramas de produção
+_RECORDING = contextvars.ContextVar('stage_recording', default=True)
+
+
+@contextlib.contextmanager
+def stages_not_recorded():
+    """
+    Runs the block without recording its stages, in the current thread
+    (or task) only: requests served concurrently keep being recorded.
+    """
+    token = _RECORDING.set(False)
+    try:
+        yield
+    finally:
+        _RECORDING.reset(token)
+
+
+def observe_stage(stage: str, started: float) -> float:
+    """
+    Records the time since `started` (a `time.perf_counter()` value) for
+    `stage` and returns the current `perf_counter()`, so consecutive
+    stages can be chained.
+    """
+    now = time.perf_counter()
+    if _RECORDING.get():
+        STAGE_SECONDS.observe(now - started, stage)
+    return now
+
+
+def observe_request_parsing(scope) -> float:
+    """
+    Records the time from the start of the request (set by the
+    MetricsMiddleware) until the route handler runs: middlewares, routing,
+    body read and pydantic validation. Returns the current `perf_counter()`.
+    """
+    now = time.perf_counter()
+    started = scope.get('metrics_started')
+    if started is not None:
+        STAGE_SECONDS.observe(now - started, 'request_parsing')
+    return now
@@ -0,0 +1,104 @@
+"""
+Cliente ASGI em processo, sem rede e sem dependências extras.
+
+Chama a aplicação diretamente com o protocolo ASGI (lifespan e http), para
+medir o custo da pilha FastAPI/Starlette (middlewares, validação, rotas)
+sem o ruído de sockets e de um servidor externo.
+"""
+import json
+import asyncio
+
+
+class ASGIClient:
+
+    def __init__(self, app, headers: dict = None):
+        self.app = app
+        self.headers = headers or {}
+        self._lifespan = None
+        self._shutdown = None
+
+    async def startup(self):
+        """
+        Runs the application startup handlers (lifespan.startup).
+        """
+        started = asyncio.get_running_loop().create_future()
+        self._shutdown = asyncio.Event()
+        messages = [{"type": "lifespan.startup"}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await self._shutdown.wait()
+            return {"type": "lifespan.shutdown"}
+
+        async def send(message):
+            if message["type"] == "lifespan.startup.complete":
+                started.set_result(None)
+            elif message["type"] == "lifespan.startup.failed":
+                started.set_exception(RuntimeError(message.get("message")))
+
+        self._lifespan = asyncio.ensure_future(
+            self.app({"type": "lifespan", "asgi": {"version": "3.0"}},
+                     receive, send))
+        await started
+
+    async def shutdown(self):
+        if self._lifespan is not None:
+            self._shutdown.set()
+            await self._lifespan
+            self._lifespan = None
+
+    async def request(self, method: str, path: str, body=None,
+                      headers: dict = None):
+        """
+        Sends one HTTP request. `body` may be bytes or a JSON-serializable
+        object. Returns (status, headers, body bytes).
+        """
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        path, _, query_string = path.partition("?")
+        request_headers = {**self.headers, **(headers or {})}
+        if body is not None:
+            request_headers.setdefault("content-type", "application/json")
+            request_headers["content-length"] = str(len(body))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "root_path": "",
+            "headers": [(name.lower().encode(), value.encode())
+                        for name, value in request_headers.items()],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body or b"",
+                        "more_body": False}
+            await asyncio.Event().wait()  # sem desconexão do cliente
+
+        status = None
+        response_headers = []
+        chunks = []
+
+        async def send(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, dict((name.decode(), value.decode())
+                            for name, value in response_headers), b"".join(chunks)
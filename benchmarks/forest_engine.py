@@ -0,0 +1,75 @@
+"""
+Verifica e mede o backend FlatForest contra o RandomForestRegressor.
+
+1. Confere que FlatForest.predict é idêntico bit a bit ao MODEL.predict em
+   todas as linhas de data/X_test.csv;
+2. Mede a latência p50/p99 por chamada nos tamanhos de lote 1, 32 e 1024
+   para o sklearn, para a travessia vetorizada pura e para o backend
+   `flat` como configurado (que delega lotes grandes ao sklearn).
+
+Requer o randfor_model.pkl em artifacts/.
+
+Uso:
+    python -m benchmarks.forest_engine --repeat 200
+"""
+import time
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from apps.car.forest import FlatForest
+from settings import MODEL_PATH, X_TEST_PATH, FLAT_FOREST_MAX_BATCH
+
+
+def _latencies(predict, X: np.ndarray, repeat: int) -> np.ndarray:
+    predict(X)  # aquecimento
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        started = time.perf_counter()
+        predict(X)
+        timings[i] = time.perf_counter() - started
+    return timings * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 32, 1024])
+    args = parser.parse_args()
+
+    MODEL = joblib.load(MODEL_PATH)
+    MODEL.n_jobs = 1
+    X_test = pd.read_csv(X_TEST_PATH).to_numpy()
+
+    started = time.perf_counter()
+    engine = FlatForest.from_sklearn(MODEL, max_batch_size=FLAT_FOREST_MAX_BATCH)
+    compile_ms = (time.perf_counter() - started) * 1000
+    pure = FlatForest.from_sklearn(MODEL, max_batch_size=np.inf)
+
+    expected = MODEL.predict(X_test)
+    identical = (np.array_equal(pure.predict(X_test), expected)
+                 and np.array_equal(engine.predict(X_test), expected))
+    print(f"trees={engine.n_trees} nodes={len(engine.value)} "
+          f"compile={compile_ms:.0f} ms bit-identical on X_test "
+          f"({len(X_test)} rows): {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+    rng = np.random.default_rng(0)
+    print(f"{'backend':<14} {'batch':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for batch_size in args.batch_sizes:
+        X = X_test[rng.integers(0, len(X_test), batch_size)]
+        backends = [("sklearn", MODEL.predict), ("flat-pure", pure.predict),
+                    (f"flat(<={FLAT_FOREST_MAX_BATCH})", engine.predict)]
+        for name, predict in backends:
+            timings = _latencies(predict, X, args.repeat)
+            print(f"{name:<14} {batch_size:>6} "
+                  f"{np.percentile(timings, 50):>9.3f} "
+                  f"{np.percentile(timings, 99):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
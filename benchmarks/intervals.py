@@ -0,0 +1,135 @@
+"""
+Mede o custo extra dos intervalos de /car/predict?interval=true.
+
+1. Confere, em carros sintetizados do catálogo, que o preço do modo
+   intervalo é idêntico ao do caminho simples e que a mediana e os
+   quantis batem com os de um laço sobre `MODEL.estimators_`;
+2. Mede a latência p50/p99 de um carro (layout de features + modelo) no
+   caminho simples com o sklearn e com o FlatForest, no modo intervalo
+   (uma travessia para a matriz (n_trees x 1) pré-alocada) e no laço
+   ingênuo por estimador;
+3. Mede /car/predict ponta a ponta, sem cache, com e sem interval=true,
+   pelo cliente ASGI em processo.
+
+Requer o randfor_model.pkl em artifacts/.
+
+Uso:
+    python -m benchmarks.intervals --repeat 300
+"""
+import os
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+TOKEN = "benchmark-token"
+os.environ.setdefault("AUTH_TOKEN", TOKEN)
+
+from apps.car.inference import predict_row, predict_row_interval  # noqa: E402
+from benchmarks.asgi import ASGIClient  # noqa: E402
+from benchmarks.suite import synthesize_cars  # noqa: E402
+from settings import PREDICT_INTERVAL_QUANTILES  # noqa: E402
+
+
+def _latencies(call, cars: list, repeat: int) -> np.ndarray:
+    call(cars[0])  # aquecimento
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        car = cars[i % len(cars)]
+        started = time.perf_counter()
+        call(car)
+        timings[i] = time.perf_counter() - started
+    return timings * 1000
+
+
+def naive_interval(state, car: dict, quantiles) -> tuple:
+    """
+    The approach the interval mode avoids: one `predict` per estimator.
+    """
+    features = state.FEATURE_LAYOUT.transform_row(car, state.FEATURE_STATS)
+    trees = np.array([estimator.predict(features)[0]
+                      for estimator in state.FOREST.model.estimators_])
+    spread = np.quantile(trees, [0.5, *quantiles])
+    return trees.mean(), spread[0], spread[1:].tolist()
+
+
+def check(state, cars: list, quantiles):
+    for car in cars:
+        price = predict_row(
+            state.FOREST.model, state.FEATURE_LAYOUT, state.FEATURE_STATS, car)
+        interval = predict_row_interval(
+            state.FOREST, state.FEATURE_LAYOUT, state.FEATURE_STATS, car,
+            quantiles)
+        _, median, values = naive_interval(state, car, quantiles)
+        if (interval[0] != price or not np.isclose(interval[1], median)
+                or not np.allclose(interval[2], values)):
+            raise SystemExit(f"intervalo divergente para {car}")
+
+
+async def route_latencies(application, cars: list, repeat: int) -> dict:
+    client = ASGIClient(application,
+                        headers={"authorization": f"Bearer {TOKEN}"})
+    await client.startup()
+    results = {}
+    for name, query in [("/car/predict", ""),
+                        ("/car/predict?interval=true", "?interval=true")]:
+        timings = np.empty(repeat)
+        for i in range(repeat):
+            # Quilometragem única: nenhuma requisição sai do cache
+            car = {**cars[i % len(cars)], "mileage": 10000 + i}
+            started = time.perf_counter()
+            status_code, _, body = await client.request(
+                "POST", "/car/predict" + query, car)
+            timings[i] = time.perf_counter() - started
+            if status_code != 200:
+                raise RuntimeError(f"{name}: {status_code} {body[:200]!r}")
+        results[name] = timings * 1000
+    await client.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--cars", type=int, default=50)
+    args = parser.parse_args()
+
+    import main as application
+
+    state = application.load_state()
+    # Caminho simples com o modelo do sklearn, como no backend padrão
+    MODEL = state.FOREST.model
+    MODEL.n_jobs = 1
+    cars = synthesize_cars(args.cars)
+    quantiles = PREDICT_INTERVAL_QUANTILES
+
+    check(state, cars, quantiles)
+    print(f"trees={state.FOREST.n_trees} quantiles={quantiles}: preço "
+          f"idêntico ao caminho simples e quantis iguais ao laço por "
+          f"estimador em {len(cars)} carros")
+
+    variants = [
+        ("simples (sklearn)", lambda car: predict_row(
+            MODEL, state.FEATURE_LAYOUT, state.FEATURE_STATS, car)),
+        ("simples (flat)", lambda car: predict_row(
+            state.FOREST, state.FEATURE_LAYOUT, state.FEATURE_STATS, car)),
+        ("intervalo", lambda car: predict_row_interval(
+            state.FOREST, state.FEATURE_LAYOUT, state.FEATURE_STATS, car,
+            quantiles)),
+        ("laço por árvore", lambda car: naive_interval(state, car, quantiles)),
+    ]
+    print(f"{'caminho':<30} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, call in variants:
+        timings = _latencies(call, cars, args.repeat)
+        print(f"{name:<30} {np.percentile(timings, 50):>9.3f} "
+              f"{np.percentile(timings, 99):>9.3f}")
+
+    routes = asyncio.run(route_latencies(application.app, cars, args.repeat))
+    for name, timings in routes.items():
+        print(f"{name:<30} {np.percentile(timings, 50):>9.3f} "
+              f"{np.percentile(timings, 99):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
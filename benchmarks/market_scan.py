@@ -0,0 +1,150 @@
+"""
+Compara uma varredura de mercado por /car/scan com o laço de chamadas a
+/car/predict que ela substitui.
+
+Para a grade `--years` × `--mileages` × `--cities` de um carro:
+
+1. Confere que as features de `FeatureLayout.transform_grid` são idênticas
+   às de `transform_rows` com os carros expandidos;
+2. Mede a montagem das features da grade (transform_data, transform_rows e
+   transform_grid) e a previsão completa (predict_cars e predict_grid);
+3. Mede ponta a ponta, pelo cliente ASGI em processo, uma requisição a
+   /car/scan (JSON e CSV) contra uma chamada a /car/predict por variante
+   (sem cache).
+
+Requer o randfor_model.pkl em artifacts/.
+
+Uso:
+    python -m benchmarks.market_scan --years 10 --mileages 16 --cities 5
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+TOKEN = "benchmark-token"
+os.environ.setdefault("AUTH_TOKEN", TOKEN)
+
+from apps.car.data_processing import transform_data  # noqa: E402
+from apps.car.inference import predict_cars, predict_grid  # noqa: E402
+from benchmarks.asgi import ASGIClient  # noqa: E402
+from settings import WARMUP_FIXTURE_PATH  # noqa: E402
+
+
+def _best_ms(call, rounds: int) -> float:
+    call()  # aquecimento
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+async def _routes(application, scan: dict, cars: list, rounds: int) -> dict:
+    client = ASGIClient(application,
+                        headers={"authorization": f"Bearer {TOKEN}"})
+    await client.startup()
+
+    async def scan_request(output):
+        status_code, _, body = await client.request(
+            "POST", f"/car/scan?output={output}", scan)
+        if status_code != 200:
+            raise RuntimeError(f"/car/scan: {status_code} {body[:200]!r}")
+
+    offsets = itertools.count(1)
+
+    async def predict_loop():
+        # Quilometragem deslocada a cada rodada: nenhuma chamada sai do cache
+        offset = next(offsets)
+        for variant in cars:
+            status_code, _, body = await client.request(
+                "POST", "/car/predict",
+                {**variant, "mileage": variant["mileage"] + offset})
+            if status_code != 200:
+                raise RuntimeError(f"/car/predict: {status_code} {body[:200]!r}")
+
+    results = {}
+    for name, call in [("/car/scan (json)", lambda: scan_request("json")),
+                       ("/car/scan (csv)", lambda: scan_request("csv")),
+                       ("/car/predict x variantes", predict_loop)]:
+        await call()
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await call()
+            timings.append(time.perf_counter() - started)
+        results[name] = min(timings) * 1000
+    await client.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--mileages", type=int, default=16)
+    parser.add_argument("--cities", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    import main as application
+
+    state = application.load_state()
+    with open(WARMUP_FIXTURE_PATH) as file:
+        car = json.load(file)
+    current_year = pd.Timestamp.now().year
+    years = list(range(current_year - args.years + 1, current_year + 1))
+    mileages = list(range(0, 10000 * args.mileages, 10000))
+    locations = [(city, state_name)
+                 for state_name in state.STATE_CITIES.columns
+                 for city in state.STATE_CITIES[state_name].dropna()][:args.cities]
+    cars = [{**car, "year_model": year, "mileage": mileage, "city": city,
+             "state": state_name}
+            for year in years for mileage in mileages
+            for city, state_name in locations]
+
+    LAYOUT, stats = state.FEATURE_LAYOUT, state.FEATURE_STATS
+    grid = LAYOUT.transform_grid(car, years, mileages, locations, stats)
+    if not np.array_equal(grid, LAYOUT.transform_rows(cars, stats)):
+        raise SystemExit("transform_grid diverge de transform_rows")
+    print(f"grade {len(years)} x {len(mileages)} x {len(locations)} = "
+          f"{len(cars)} variantes; features idênticas a transform_rows")
+
+    feature_names = state.MODEL_SCHEMA.feature_names
+    timings = {
+        "features: transform_data": lambda: transform_data(
+            pd.DataFrame(cars), state.NORMALIZER, state.TRANSFORMER,
+            feature_names, stats),
+        "features: transform_rows": lambda: LAYOUT.transform_rows(cars, stats),
+        "features: transform_grid": lambda: LAYOUT.transform_grid(
+            car, years, mileages, locations, stats),
+        "previsão: predict_cars": lambda: predict_cars(
+            state.MODEL, state.NORMALIZER, state.TRANSFORMER, feature_names,
+            stats, cars),
+        "previsão: predict_grid": lambda: predict_grid(
+            state.MODEL, LAYOUT, stats, car, years, mileages, locations),
+    }
+    print(f"{'etapa':<34} {'ms':>9}")
+    for name, call in timings.items():
+        print(f"{name:<34} {_best_ms(call, args.rounds):>9.2f}")
+
+    scan = {
+        "car": car,
+        "year_model": years,
+        "mileage": mileages,
+        "locations": [{"city": city, "state": state_name}
+                      for city, state_name in locations],
+    }
+    routes = asyncio.run(
+        _routes(application.app, scan, cars, max(1, args.rounds // 2)))
+    for name, elapsed in routes.items():
+        print(f"{name:<34} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compara a vazão de /car/predict com e sem o micro-batching.
+
+Simula N clientes concorrentes, cada um fazendo previsões individuais em
+sequência, diretamente sobre o pipeline de inferência (sem o cache, que
+esconderia o custo do modelo):
+
+- direct: uma chamada `predict_row` no PredictionExecutor por requisição;
+- batched: as requisições passam pelo MicroBatcher.
+
+Requer o randfor_model.pkl em artifacts/.
+
+Uso:
+    python -m benchmarks.micro_batching --concurrency 50 100 250 500
+"""
+import time
+import asyncio
+import argparse
+import functools
+
+import numpy as np
+
+from apps.car.batcher import MicroBatcher
+from apps.car.executor import PredictionExecutor
+from apps.car.inference import predict_row, predict_rows
+
+
+def _sample_cars(df, size: int) -> list:
+    columns = ['brand', 'model', 'year_model', 'mileage', 'gear', 'fuel',
+               'bodywork', 'city', 'state']
+    return df[columns].sample(size, replace=True, random_state=0).to_dict('records')
+
+
+async def _client(predict, cars: list, latencies: list):
+    for car in cars:
+        started = time.perf_counter()
+        await predict(car)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(mode: str, state, concurrency: int, requests: int,
+              window_ms: float, max_batch_size: int, workers: int) -> dict:
+    executor = PredictionExecutor(
+        max_workers=workers, max_queue=concurrency * requests, timeout=60)
+
+    if mode == "batched":
+        batcher = MicroBatcher(
+            functools.partial(predict_rows, state.MODEL, state.FEATURE_LAYOUT,
+                              state.FEATURE_STATS),
+            executor, window_ms=window_ms, max_batch_size=max_batch_size)
+        predict = batcher.predict
+    else:
+        batcher = None
+
+        async def predict(car):
+            return await executor.run(
+                predict_row, state.MODEL, state.FEATURE_LAYOUT,
+                state.FEATURE_STATS, car)
+
+    cars = _sample_cars(state.ORIGINAL_DF, concurrency * requests)
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _client(predict, cars[i * requests:(i + 1) * requests], latencies)
+        for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+
+    result = {
+        "mode": mode,
+        "concurrency": concurrency,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+    if batcher is not None:
+        result["avg_batch_size"] = batcher.stats()["avg_batch_size"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+",
+                        default=[50, 100, 250, 500])
+    parser.add_argument("--requests", type=int, default=4,
+                        help="requisições sequenciais por cliente")
+    parser.add_argument("--window-ms", type=float, default=3.0)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from main import load_state
+    state = load_state()
+
+    print(f"{'mode':<8} {'clients':>7} {'req/s':>9} {'p50 ms':>9} "
+          f"{'p99 ms':>9} {'avg batch':>10}")
+    for concurrency in args.concurrency:
+        for mode in ("direct", "batched"):
+            result = asyncio.run(run(
+                mode, state, concurrency, args.requests, args.window_ms,
+                args.max_batch_size, args.workers))
+            print(f"{result['mode']:<8} {result['concurrency']:>7} "
+                  f"{result['throughput']:>9.1f} {result['p50_ms']:>9.1f} "
+                  f"{result['p99_ms']:>9.1f} "
+                  f"{result.get('avg_batch_size', 1):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Mede a formatação de preços em 100 mil previsões.
+
+1. Confere que `format_prices` produz o mesmo texto que `format_price`
+   valor a valor, em magnitudes de centavos a trilhões, e o mesmo texto
+   que a implementação anterior nos valores de 7 e 8 dígitos, os únicos
+   que ela formatava;
+2. Mede, por caminho: a implementação anterior em laço, `format_price` em
+   laço, `format_prices` e `raw_prices` (format=raw), cada um até a lista
+   Python pronta para a resposta, e a serialização JSON da lista;
+3. Mede o lado do cliente: o `json.loads` da resposta e, no formato brl,
+   a conversão dos textos de volta para número.
+
+Uso:
+    python -m benchmarks.price_format --values 100000
+"""
+import json
+import time
+import argparse
+
+import numpy as np
+
+from apps.car.utils import format_price, format_prices, raw_prices
+
+
+def previous_format_price(predicted_price):
+    """
+    The implementation replaced by `format_price`, kept as the baseline.
+    """
+    formatted_prediction = str(int(predicted_price))
+
+    if len(formatted_prediction) == 7:
+        formatted_prediction = formatted_prediction[:2] + "." + \
+            formatted_prediction[2:5] + "," + formatted_prediction[5:]
+    elif len(formatted_prediction) == 8:
+        formatted_prediction = formatted_prediction[:3] + "." + \
+            formatted_prediction[3:6] + "," + formatted_prediction[6:]
+    return formatted_prediction
+
+
+def parse_brl(text: str) -> float:
+    return float(text.replace(".", "").replace(",", "."))
+
+
+def _best_ms(call, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--values", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Faixa típica das previsões (em centavos), de R$ 10 mil a R$ 999 mil
+    prices = rng.uniform(1e6, 1e8, args.values)
+    magnitudes = 10 ** rng.uniform(0, 15, args.values)
+
+    if format_prices(magnitudes).tolist() != [format_price(value) for value in magnitudes]:
+        raise SystemExit("format_prices diverge de format_price")
+    if any(previous_format_price(value) != format_price(value) for value in prices):
+        raise SystemExit("format_price diverge da implementação anterior")
+    print(f"{args.values} valores: format_prices idêntico a format_price em "
+          f"todas as magnitudes e à implementação anterior com 7 e 8 dígitos")
+
+    paths = {
+        "anterior (laço)": lambda: [previous_format_price(value) for value in prices],
+        "format_price (laço)": lambda: [format_price(value) for value in prices],
+        "format_prices": lambda: format_prices(prices).tolist(),
+        "raw_prices (format=raw)": lambda: raw_prices(prices).tolist(),
+    }
+    print(f"{'caminho':<26} {'formatar ms':>12} {'json ms':>9} "
+          f"{'bytes':>9} {'cliente ms':>11}")
+    for name, call in paths.items():
+        formatted = call()
+        body = json.dumps(formatted, separators=(",", ":"))
+        if name.startswith("raw"):
+            def client():
+                return json.loads(body)
+        else:
+            def client():
+                return [parse_brl(text) for text in json.loads(body)]
+        print(f"{name:<26} {_best_ms(call, args.rounds):>12.2f} "
+              f"{_best_ms(lambda: json.dumps(formatted, separators=(',', ':')), args.rounds):>9.2f} "
+              f"{len(body):>9} {_best_ms(client, args.rounds):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compara memória e filtros do ORIGINAL_DF com strings e com `category`.
+
+1. Memória (deep) do dataset lido como objetos Python e como `category`
+   alinhado ao OneHotEncoder;
+2. Latência mediana de filtros por marca, modelo, cidade e marca+cidade:
+   máscara booleana sobre a coluna de objetos, máscara sobre a coluna
+   `category` e consulta ao RowIndex (posições e DataFrame filtrado).
+
+Uso:
+    python -m benchmarks.reference_data --repeat 200
+"""
+import time
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from apps.car.columnar import read_dataset
+from apps.car.reference_data import RowIndex, categorize
+from settings import ORIGINAL_DF_PATH, TRANSFORMER_PATH
+
+FILTERS = [
+    {'brand': 'VOLKSWAGEN'},
+    {'model': 'ONIX'},
+    {'city': 'SAO PAULO'},
+    {'brand': 'BMW', 'city': 'SAO PAULO'},
+]
+
+
+def _median_us(func, repeat: int) -> float:
+    func()  # aquecimento
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - started
+    return float(np.median(timings) * 1e6)
+
+
+def _mask_filter(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    mask = np.ones(len(df), dtype=bool)
+    for column, value in filters.items():
+        mask &= (df[column] == value).to_numpy()
+    return df[mask]
+
+
+def _index_rows(index: RowIndex, filters: dict) -> np.ndarray:
+    # Como em brand_predictions: o grupo da primeira coluna, subdividido
+    # pelas demais
+    positions = None
+    for column, value in filters.items():
+        groups = (index.groups(column) if positions is None
+                  else index.subgroups(positions, column))
+        positions = groups.get(value, RowIndex.EMPTY)
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    TRANSFORMER = joblib.load(TRANSFORMER_PATH)
+    columns = list(TRANSFORMER.feature_names_in_)
+
+    objects = read_dataset(ORIGINAL_DF_PATH)
+    categories = categorize(
+        read_dataset(ORIGINAL_DF_PATH, categorical=True), TRANSFORMER)
+    started = time.perf_counter()
+    index = RowIndex(categories, columns)
+    index_ms = (time.perf_counter() - started) * 1000
+
+    object_mb = objects.memory_usage(deep=True).sum() / 2 ** 20
+    category_mb = categories.memory_usage(deep=True).sum() / 2 ** 20
+    print(f"rows={len(objects)} memory: object {object_mb:.2f} MiB, "
+          f"category {category_mb:.2f} MiB "
+          f"({object_mb / category_mb:.1f}x); RowIndex built in {index_ms:.1f} ms")
+
+    print(f"\n{'filter':<30} {'rows':>5} {'object us':>10} {'category us':>12} "
+          f"{'index rows us':>14} {'index df us':>12}")
+    for filters in FILTERS:
+        expected = _mask_filter(objects, filters)
+        assert np.array_equal(_index_rows(index, filters), np.flatnonzero(
+            objects.index.isin(expected.index)))
+
+        label = ", ".join(f"{column}={value}" for column, value in filters.items())
+        print(f"{label:<30} {len(expected):>5} "
+              f"{_median_us(lambda: _mask_filter(objects, filters), args.repeat):>10.1f} "
+              f"{_median_us(lambda: _mask_filter(categories, filters), args.repeat):>12.1f} "
+              f"{_median_us(lambda: _index_rows(index, filters), args.repeat):>14.1f} "
+              f"{_median_us(lambda: categories.iloc[_index_rows(index, filters)], args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compara o tempo de carga dos datasets de referência em CSV e colunar.
+
+1. Mede a leitura de cada dataset com `pd.read_csv` e com a cópia colunar
+   (`apps.car.columnar`), no mesmo processo;
+2. Mede um startup frio completo (`import main` + `load_state`) em um
+   processo novo para cada caminho, via COLUMNAR_DATASETS.
+
+As cópias colunares são geradas antes da medição quando estão ausentes ou
+desatualizadas. O startup completo requer o randfor_model.pkl em artifacts/.
+
+Uso:
+    python -m benchmarks.startup_load --repeat 20 --cold 5
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from apps.car.columnar import build_columnar, is_fresh, load_columnar, columnar_path
+from settings import ORIGINAL_DF_PATH, X_TEST_PATH, DATA_VALID_PATH, STATE_CITIES_PATH
+
+DATASETS = [ORIGINAL_DF_PATH, X_TEST_PATH, DATA_VALID_PATH, STATE_CITIES_PATH]
+
+COLD_START = (
+    "import time; started = time.perf_counter(); import main; "
+    "main.load_state(); print(time.perf_counter() - started)")
+
+
+def _median_ms(load, repeat: int) -> float:
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        started = time.perf_counter()
+        load()
+        timings[i] = time.perf_counter() - started
+    return float(np.median(timings) * 1000)
+
+
+def cold_start_timings(columnar: bool, repeat: int) -> list:
+    """
+    Seconds of `import main` + `load_state` in `repeat` fresh processes.
+    """
+    env = {**os.environ, "COLUMNAR_DATASETS": "true" if columnar else "false"}
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START], env=env, check=True,
+            capture_output=True, text=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cold", type=int, default=5,
+                        help="startups frios por caminho (0 desativa)")
+    args = parser.parse_args()
+
+    for path in DATASETS:
+        if not is_fresh(path):
+            build_columnar(path)
+
+    print(f"{'dataset':<24} {'csv ms':>9} {'columnar ms':>12} {'speedup':>8}")
+    total_csv = total_columnar = 0.0
+    for path in DATASETS:
+        input_dir = columnar_path(path)
+        csv_ms = _median_ms(lambda: pd.read_csv(path), args.repeat)
+        columnar_ms = _median_ms(lambda: load_columnar(input_dir), args.repeat)
+        total_csv += csv_ms
+        total_columnar += columnar_ms
+        print(f"{os.path.basename(path):<24} {csv_ms:>9.2f} "
+              f"{columnar_ms:>12.2f} {csv_ms / columnar_ms:>7.1f}x")
+    print(f"{'total':<24} {total_csv:>9.2f} {total_columnar:>12.2f} "
+          f"{total_csv / total_columnar:>7.1f}x")
+
+    if args.cold:
+        csv_ms = np.median(cold_start_timings(False, args.cold)) * 1000
+        columnar_ms = np.median(cold_start_timings(True, args.cold)) * 1000
+        print(f"\ncold start (import main + load_state), median of {args.cold}:")
+        print(f"  csv      {csv_ms:>9.1f} ms")
+        print(f"  columnar {columnar_ms:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Suíte de benchmarks de inferência com baseline em JSON e comparação.
+
+Mede, com carros sintetizados a partir do brand_model_bodywork.json, do
+state_cities.csv e do data_valid.csv (semente fixa):
+
+- transform_data e FeatureLayout.transform_rows em lotes de 1, 100 e 10k;
+- MODEL.predict nos mesmos tamanhos;
+- /car/predict (com e sem cache), /car/predict/batch e
+  /car/brand_predict/{brand} (frio e do cache) ponta a ponta, por um
+  cliente ASGI em processo (benchmarks/asgi.py);
+- o startup frio (import main + load_state) em processos novos.
+
+Roda offline; requer o randfor_model.pkl em artifacts/. Com --compare,
+marca como regressão todo p50 acima do baseline por mais de --threshold e
+termina com código 1.
+
+Uso:
+    python -m benchmarks.suite --output benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.2
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+BATCH_SIZES = [1, 100, 10000]
+TOKEN = "benchmark-token"
+
+
+def synthesize_cars(size: int, seed: int = 0) -> list:
+    """
+    Random valid cars: (brand, model, bodywork) from the catalogue, (city,
+    state) from state_cities.csv and gear/fuel from data_valid.csv.
+    """
+    from apps.car.columnar import read_dataset
+    from settings import BRAND_MODELS_BODYWORK_PATH, STATE_CITIES_PATH, DATA_VALID_PATH
+
+    with open(BRAND_MODELS_BODYWORK_PATH) as file:
+        catalogue = json.load(file)
+    vehicles = [(brand, model, bodywork)
+                for brand, models in catalogue.items()
+                for model, bodyworks in models.items()
+                for bodywork in bodyworks]
+    state_cities = read_dataset(STATE_CITIES_PATH)
+    locations = [(city, state) for state in state_cities.columns
+                 for city in state_cities[state].dropna()]
+    data_valid = read_dataset(DATA_VALID_PATH)
+    gears = data_valid['gear'].dropna().tolist()
+    fuels = data_valid['fuel'].dropna().tolist()
+
+    rng = np.random.default_rng(seed)
+    current_year = pd.Timestamp.now().year
+    cars = []
+    for _ in range(size):
+        brand, model, bodywork = vehicles[rng.integers(len(vehicles))]
+        city, state = locations[rng.integers(len(locations))]
+        cars.append({
+            'brand': brand,
+            'model': model,
+            'year_model': int(rng.integers(current_year - 15, current_year + 1)),
+            'mileage': int(rng.integers(0, 200000)),
+            'gear': gears[rng.integers(len(gears))],
+            'fuel': fuels[rng.integers(len(fuels))],
+            'bodywork': bodywork,
+            'city': city,
+            'state': state,
+        })
+    return cars
+
+
+def _summary(timings: list) -> dict:
+    timings = np.asarray(timings) * 1000
+    return {
+        "repeat": len(timings),
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "mean_ms": float(timings.mean()),
+        "min_ms": float(timings.min()),
+    }
+
+
+def measure(func, repeat: int, budget: float, setup=None) -> dict:
+    """
+    Runs `func` up to `repeat` times (at least 3), stopping early when the
+    time budget (seconds) is spent. `setup` runs before each call, untimed,
+    and its result is passed to `func`.
+    """
+    func(setup() if setup else None)  # aquecimento
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < repeat and (
+            len(timings) < 3 or time.perf_counter() < deadline):
+        argument = setup() if setup else None
+        started = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - started)
+    return _summary(timings)
+
+
+async def measure_async(func, repeat: int, budget: float, setup=None) -> dict:
+    await func(setup() if setup else None)  # aquecimento
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < repeat and (
+            len(timings) < 3 or time.perf_counter() < deadline):
+        argument = setup() if setup else None
+        started = time.perf_counter()
+        await func(argument)
+        timings.append(time.perf_counter() - started)
+    return _summary(timings)
+
+
+def run_pipeline(state, cars: list, repeat: int, budget: float) -> dict:
+    from apps.car.data_processing import transform_data
+
+    results = {}
+    feature_names = state.MODEL_SCHEMA.feature_names
+    for size in BATCH_SIZES:
+        batch = cars[:size]
+        frame = pd.DataFrame(batch)
+        results[f"transform_data[{size}]"] = measure(
+            lambda data: transform_data(
+                data, state.NORMALIZER, state.TRANSFORMER, feature_names,
+                state.FEATURE_STATS),
+            repeat, budget, setup=frame.copy)
+        results[f"transform_rows[{size}]"] = measure(
+            lambda _: state.FEATURE_LAYOUT.transform_rows(
+                batch, state.FEATURE_STATS),
+            repeat, budget)
+        features = state.FEATURE_LAYOUT.transform_rows(
+            batch, state.FEATURE_STATS)
+        results[f"model_predict[{size}]"] = measure(
+            lambda _: state.MODEL.predict(features), repeat, budget)
+    return results
+
+
+async def run_http(app, cars: list, repeat: int, budget: float) -> dict:
+    from benchmarks.asgi import ASGIClient
+
+    client = ASGIClient(app, headers={"authorization": f"Bearer {TOKEN}"})
+    await client.startup()
+    state = app.state
+    results = {}
+    unique_cars = iter(cars)
+
+    async def post(path, body=None):
+        status, _, content = await client.request("POST", path, body)
+        if status != 200:
+            raise RuntimeError(f"{path}: {status} {content[:200]!r}")
+
+    try:
+        results["http_predict_uncached"] = await measure_async(
+            lambda car: post("/car/predict", car), repeat, budget,
+            setup=lambda: next(unique_cars))
+        results["http_predict_cached"] = await measure_async(
+            lambda _: post("/car/predict", cars[0]), repeat, budget)
+        results["http_predict_batch[100]"] = await measure_async(
+            lambda batch: post("/car/predict/batch", batch), repeat, budget,
+            setup=lambda: [next(unique_cars) for _ in range(100)])
+
+        brand = "VOLKSWAGEN"
+        path = f"/car/brand_predict/{brand}?page_size=1000"
+        results["http_brand_predict_cold"] = await measure_async(
+            lambda _: post(path), repeat, budget,
+            setup=state.BRAND_PREDICTIONS.clear)
+        results["http_brand_predict_cached"] = await measure_async(
+            lambda _: post(path), repeat, budget)
+    finally:
+        await client.shutdown()
+    return results
+
+
+def run_startup(repeat: int) -> dict:
+    from benchmarks.startup_load import cold_start_timings
+    return {"startup_cold": _summary(cold_start_timings(True, repeat))}
+
+
+def environment() -> dict:
+    import sklearn
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+            text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Prints current vs baseline p50 and returns the names of the benchmarks
+    slower than the baseline by more than `threshold` (fraction).
+    """
+    regressions = []
+    print(f"\n{'benchmark':<30} {'baseline p50':>13} {'current p50':>12} "
+          f"{'ratio':>7}")
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<30} {'-':>13} {current['p50_ms']:>12.3f} {'new':>7}")
+            continue
+        ratio = current["p50_ms"] / previous["p50_ms"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {previous['p50_ms']:>13.3f} "
+              f"{current['p50_ms']:>12.3f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200,
+                        help="máximo de repetições por benchmark")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="segundos por benchmark (mínimo de 3 repetições)")
+    parser.add_argument("--startup-repeat", type=int, default=3,
+                        help="startups frios medidos (0 desativa)")
+    parser.add_argument("--only", nargs="+",
+                        choices=["pipeline", "http", "startup"],
+                        default=["pipeline", "http", "startup"])
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    parser.add_argument("--compare", help="baseline JSON a comparar")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="piora relativa do p50 tolerada (padrão: 0.2)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AUTH_TOKEN", TOKEN)
+    from main import app, load_state
+
+    cars = synthesize_cars(max(BATCH_SIZES) + 200 * args.repeat)
+    results = {}
+    if "pipeline" in args.only:
+        results.update(run_pipeline(load_state(), cars, args.repeat, args.budget))
+    if "http" in args.only:
+        results.update(asyncio.run(run_http(
+            app, cars, args.repeat, args.budget)))
+    if "startup" in args.only and args.startup_repeat:
+        results.update(run_startup(args.startup_repeat))
+
+    print(f"{'benchmark':<30} {'n':>5} {'p50 ms':>10} {'p95 ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<30} {result['repeat']:>5} {result['p50_ms']:>10.3f} "
+              f"{result['p95_ms']:>10.3f}")
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline["environment"].get("platform") != report["environment"]["platform"]:
+            print("aviso: baseline gerado em outra plataforma",
+                  baseline["environment"].get("platform"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de "
+                  f"{args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
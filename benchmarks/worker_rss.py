@@ -0,0 +1,145 @@
+"""
+Mede a memória por worker com e sem pré-carregamento dos artefatos.
+
+Sobe o gunicorn com N workers uvicorn em dois modos:
+
+- per-process: cada worker carrega os artefatos no seu startup (antes);
+- preload: gunicorn.conf.py, artefatos carregados no mestre antes do fork (depois).
+
+Para cada worker lê /proc/<pid>/smaps_rollup e reporta RSS, PSS (memória
+proporcional, que divide as páginas compartilhadas entre os processos) e
+USS (memória privada). Requer Linux e o randfor_model.pkl em artifacts/.
+
+Uso:
+    python -m benchmarks.worker_rss --workers 4
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+import urllib.request
+
+TOKEN = "benchmark-token"
+
+
+def _children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as file:
+        return [int(child) for child in file.read().split()]
+
+
+def _memory(pid: int) -> dict:
+    """
+    Returns RSS, PSS and USS (in MiB) of a process.
+    """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def _request(port: int, path: str, body: dict = None, method: str = None):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=json.dumps(body).encode() if body is not None else None,
+        method=method,
+        headers={"Authorization": f"Bearer {TOKEN}",
+                 "Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status
+
+
+def _wait_ready(process, port: int, workers: int, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn terminou antes de ficar pronto")
+        try:
+            _request(port, "/car/list-brands")
+            if len(_children(process.pid)) == workers:
+                break
+        except OSError:
+            pass
+        time.sleep(0.5)
+    else:
+        raise RuntimeError("gunicorn não ficou pronto a tempo")
+
+    # Aguarda o RSS de todos os workers estabilizar (startup concluído)
+    previous = None
+    while time.monotonic() < deadline:
+        current = [round(_memory(pid)["rss"]) for pid in _children(process.pid)]
+        if current == previous:
+            return
+        previous = current
+        time.sleep(1)
+
+
+def measure(mode: str, workers: int, port: int, requests: int) -> dict:
+    env = dict(os.environ, AUTH_TOKEN=TOKEN, WEB_CONCURRENCY=str(workers),
+               BIND=f"127.0.0.1:{port}")
+    if mode == "preload":
+        command = ["gunicorn", "main:app", "-c", "gunicorn.conf.py"]
+    else:
+        env["PRELOAD_ARTIFACTS"] = "false"
+        command = ["gunicorn", "main:app", "-k", "uvicorn.workers.UvicornWorker",
+                   "-w", str(workers), "-b", f"127.0.0.1:{port}"]
+
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(process, port, workers)
+
+        with open(os.path.join("fixture", "test_predict.json")) as file:
+            car = json.load(file)
+        for _ in range(requests):
+            _request(port, "/car/predict", car)
+            _request(port, "/car/brand_predict/FIAT", method="POST")
+
+        master = _memory(process.pid)
+        per_worker = [_memory(pid) for pid in _children(process.pid)]
+        return {
+            "mode": mode,
+            "workers": workers,
+            "master": master,
+            "worker_rss_avg": sum(w["rss"] for w in per_worker) / workers,
+            "worker_pss_avg": sum(w["pss"] for w in per_worker) / workers,
+            "worker_uss_avg": sum(w["uss"] for w in per_worker) / workers,
+            "total_pss": master["pss"] + sum(w["pss"] for w in per_worker),
+        }
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=50,
+                        help="requisições de aquecimento antes de medir")
+    args = parser.parse_args()
+
+    results = [measure(mode, args.workers, args.port, args.requests)
+               for mode in ("per-process", "preload")]
+
+    print(f"{'mode':<12} {'workers':>7} {'RSS/worker':>11} {'PSS/worker':>11} "
+          f"{'USS/worker':>11} {'total PSS':>10}  (MiB)")
+    for result in results:
+        print(f"{result['mode']:<12} {result['workers']:>7} "
+              f"{result['worker_rss_avg']:>11.1f} {result['worker_pss_avg']:>11.1f} "
+              f"{result['worker_uss_avg']:>11.1f} {result['total_pss']:>10.1f}")
+    json.dump(results, sys.stderr, indent=2)
+    sys.stderr.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
 #!/bin/bash
 
 echo "Start application"
-exec uvicorn main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+# Cópia colunar dos datasets de referência (refeita só quando o CSV mudar)
+python -m apps.car.columnar data/clean_original_df.csv data/X_test.csv data/data_valid.csv data/state_cities.csv
+if [ "${WEB_CONCURRENCY:-1}" -gt 1 ]; then
+    # Vários workers com artefatos pré-carregados e compartilhados (gunicorn.conf.py)
+    exec gunicorn main:app -c gunicorn.conf.py
+fi
+exec uvicorn main:app --host 0.0.0.0 --port 8000
@@ -0,0 +1,21 @@
+import os
+import gc
+import multiprocessing
+
+# Carrega os artefatos no processo mestre (main.py com PRELOAD_ARTIFACTS),
+# antes do fork: os workers compartilham copy-on-write o random forest,
+# o ORIGINAL_DF e as tabelas derivadas em vez de manter uma cópia cada.
+os.environ.setdefault("PRELOAD_ARTIFACTS", "true")
+preload_app = True
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+
+def pre_fork(server, worker):
+    # Objetos criados após o preload também não devem ser varridos pelo GC
+    gc.freeze()
@@ -1,24 +1,97 @@
+import time
+
+# Início da fase `imports` do startup, em tempo de relógio como as demais
+# fases; fica antes dos outros imports (o noqa impede o autopep8 de subi-los)
+IMPORTS_STARTED = time.perf_counter()  # noqa: E402
+
+import os
+import gc
 import json
+import functools
+import logging
+from typing import TYPE_CHECKING
+
 import joblib
 import pandas as pd
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
 
 from apps.car import routes as car_router
+from apps.car.feature_store import FeatureStatistics
+from apps.car.feature_layout import FeatureLayout
+from apps.car.model_schema import ModelSchema
+from apps.car.cache import PredictionCache
+from apps.car.brand_predictions import BrandPredictions
+from apps.car.catalogue import Catalogue
+from apps.car.search import SearchIndex
+from apps.car.vocabulary import Vocabulary
+from apps.car.executor import PredictionExecutor
+from apps.car.batcher import MicroBatcher
+from apps.car.inference import predict_rows
+from apps.car.forest import FlatForest
+from apps.car.columnar import read_dataset
+from apps.car.reference_data import RowIndex, categorize
+from apps.car.utils import artifacts_version
+from apps.car.warmup import representative_cars, replay
 from apps.docs import routes as docs_router
+from apps.admin import routes as admin_router
+from apps.admin.reloader import ArtifactReloader
 from apps.auth.middlewares import AuthMiddleware
+from apps.health import routes as health_router
+from apps.health.startup import PhaseTimer, StartupReport
+from apps.metrics import routes as metrics_router
+from apps.metrics.collectors import application_metrics
+from apps.metrics.middlewares import MetricsMiddleware
+from apps.metrics.profiler import SamplingProfiler
+from apps.metrics.registry import REGISTRY
 from apps.docs.custom_openai import custom_openapi
-from settings import config, MODEL_PATH, NORMALIZER_PATH, TRANSFORMER_PATH, X_TEST_PATH, ORIGINAL_DF_PATH, BRAND_MODELS_BODYWORK_PATH
+from settings import (
+    artifact_paths, ARTIFACTS_DIR, ARTIFACTS_WATCH_INTERVAL, X_TEST_PATH, BRAND_MODELS_BODYWORK_PATH,
+    DATA_VALID_PATH, STATE_CITIES_PATH, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, BRAND_PREDICT_WARMUP,
+    PRELOAD_ARTIFACTS, PREDICT_EXECUTOR_WORKERS, PREDICT_QUEUE_SIZE, PREDICT_TIMEOUT, PREDICT_BLAS_THREADS,
+    PREDICT_MODEL_N_JOBS, MICRO_BATCH_ENABLED, MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_SIZE,
+    INFERENCE_BACKEND, FLAT_FOREST_MAX_BATCH, PROFILE_SLOW_REQUEST_MS, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS,
+    PROFILE_OUTPUT_DIR, WARMUP_BUDGET_SECONDS, WARMUP_FIXTURE_PATH)
+
+if TYPE_CHECKING:
+    # Só para as anotações do AppState: o sklearn é importado ao carregar
+    # os pickles, em load_state
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fases do startup deste processo, expostas em /health/ready. A primeira é
+# a duração dos imports do main.py
+startup_report = StartupReport()
+startup_report.record({'imports': time.perf_counter() - IMPORTS_STARTED})
 
 
 class AppState:
-    NORMALIZER: StandardScaler
-    TRANSFORMER: OneHotEncoder
-    MODEL: RandomForestRegressor
-    X_test: pd.DataFrame
+    NORMALIZER: 'StandardScaler'
+    TRANSFORMER: 'OneHotEncoder'
+    MODEL: 'RandomForestRegressor'
+    FOREST: FlatForest
+    MODEL_SCHEMA: ModelSchema
     ORIGINAL_DF: pd.DataFrame
+    ORIGINAL_INDEX: RowIndex
+    CATALOGUE: Catalogue
+    SEARCH_INDEX: SearchIndex
+    VOCABULARY: Vocabulary
+    FEATURE_STATS: FeatureStatistics
+    FEATURE_LAYOUT: FeatureLayout
+    MODEL_VERSION: str
+    LOAD_SECONDS: float
+    LOAD_PHASES: dict
+    WARMUP: dict
+    STARTUP: StartupReport
+    ARTIFACTS_DIR: str
+    PREDICTION_CACHE: PredictionCache
+    BRAND_PREDICTIONS: BrandPredictions
+    PREDICTION_EXECUTOR: PredictionExecutor
+    MICRO_BATCHER: MicroBatcher
+    RELOADER: ArtifactReloader
 
 
 def create_application() -> FastAPI:
@@ -39,34 +112,194 @@ def create_application() -> FastAPI:
         ],
         allow_headers=["*"]
     )
+    # Mais externo: mede também a autenticação e o CORS
+    application.add_middleware(
+        MetricsMiddleware,
+        profiler=SamplingProfiler(
+            PROFILE_SLOW_REQUEST_MS,
+            sample_rate=PROFILE_SAMPLE_RATE,
+            interval_ms=PROFILE_INTERVAL_MS,
+            output_dir=PROFILE_OUTPUT_DIR) if PROFILE_SLOW_REQUEST_MS else None)
 
     application.include_router(docs_router.router, tags=['car'])
+    application.include_router(health_router.router, prefix="/health",
+                               tags=['health'])
+    application.include_router(metrics_router.router)
     application.include_router(car_router.router, prefix="/car",
                                tags=['car'])
+    application.include_router(admin_router.router, prefix="/admin",
+                               tags=['admin'])
 
     return application
 
 
+def load_model_schema(path: str) -> ModelSchema:
+    """
+    Loads the model schema artifact, deriving it once from X_test.csv when
+    the artifact has not been generated yet.
+    """
+    if os.path.exists(path):
+        return ModelSchema.load(path)
+
+    logger.warning(
+        "%s não encontrado, derivando o esquema de %s", path, X_TEST_PATH)
+    schema = ModelSchema.from_csv(X_TEST_PATH)
+    schema.save(path)
+    return schema
+
+
 app = create_application()
 
+# O cache sobrevive às recargas dos artefatos e é invalidado pela versão
+prediction_cache = PredictionCache(
+    maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+
+# Pool dedicado à inferência, fora do event loop
+prediction_executor = PredictionExecutor(
+    max_workers=PREDICT_EXECUTOR_WORKERS,
+    max_queue=PREDICT_QUEUE_SIZE,
+    timeout=PREDICT_TIMEOUT,
+    blas_threads=PREDICT_BLAS_THREADS)
+
 app.openapi = lambda: custom_openapi(app)
 
+REGISTRY.register_collector(functools.partial(application_metrics, app))
 
-@app.on_event('startup')
-async def startup_event():
-    app.state = AppState()
 
-    app.state.NORMALIZER = joblib.load(NORMALIZER_PATH)
-    app.state.TRANSFORMER = joblib.load(TRANSFORMER_PATH)
-    app.state.MODEL = joblib.load(MODEL_PATH)
-    app.state.X_test = pd.read_csv(X_TEST_PATH)
-    app.state.ORIGINAL_DF = pd.read_csv(ORIGINAL_DF_PATH)
-    app.state.DATA_VALID = pd.read_csv('data/data_valid.csv')
-    app.state.STATE_CITIES = pd.read_csv('data/state_cities.csv')
+def load_state(artifacts_dir: str = ARTIFACTS_DIR) -> AppState:
+    """
+    Loads every artifact and reference dataset used by the routes, taking
+    the artifact bundle from `artifacts_dir`.
+    """
+    started = time.perf_counter()
+    phases = PhaseTimer(started)
+    paths = artifact_paths(artifacts_dir)
+    state = AppState()
+    state.ARTIFACTS_DIR = artifacts_dir
+
+    state.NORMALIZER = joblib.load(paths['normalizer'])
+    state.TRANSFORMER = joblib.load(paths['transformer'])
+    state.MODEL = joblib.load(paths['model'])
+    # Paralelismo do joblib dentro de cada previsão (o pool já paraleliza)
+    state.MODEL.n_jobs = PREDICT_MODEL_N_JOBS
+    # Árvores em arrays planos: previsão de todas as árvores em uma única
+    # travessia, usada pelos intervalos de /car/predict?interval=true
+    state.FOREST = FlatForest.from_sklearn(
+        state.MODEL, max_batch_size=FLAT_FOREST_MAX_BATCH)
+    if INFERENCE_BACKEND == 'flat':
+        # Mesmas previsões, sem o overhead por chamada do sklearn
+        state.MODEL = state.FOREST
+    state.MODEL_SCHEMA = load_model_schema(paths['model_schema'])
+    # Limita também os runtimes OpenMP/BLAS carregados junto com os pickles
+    prediction_executor.limit_threadpools()
+    phases.lap('artifacts')
+    # Colunas categóricas como `category`, alinhadas ao OneHotEncoder, e o
+    # índice valor -> linhas usado para agrupar o dataset
+    state.ORIGINAL_DF = categorize(
+        read_dataset(paths['original_df'], categorical=True),
+        state.TRANSFORMER)
+    state.ORIGINAL_INDEX = RowIndex(
+        state.ORIGINAL_DF,
+        [column for column in state.TRANSFORMER.feature_names_in_
+         if column in state.ORIGINAL_DF.columns])
+    state.FEATURE_STATS = FeatureStatistics.from_dataframe(
+        state.ORIGINAL_DF, state.ORIGINAL_INDEX)
+    state.FEATURE_LAYOUT = FeatureLayout(
+        state.NORMALIZER, state.TRANSFORMER,
+        state.MODEL_SCHEMA.feature_names)
+    state.MODEL_VERSION = artifacts_version([
+        paths['model'], paths['normalizer'], paths['transformer'],
+        paths['model_schema'], paths['original_df']])
+    state.PREDICTION_CACHE = prediction_cache
+    state.STARTUP = startup_report
+    state.PREDICTION_EXECUTOR = prediction_executor
+    state.MICRO_BATCHER = MicroBatcher(
+        functools.partial(
+            predict_rows, state.MODEL, state.FEATURE_LAYOUT,
+            state.FEATURE_STATS),
+        prediction_executor,
+        window_ms=MICRO_BATCH_WINDOW_MS,
+        max_batch_size=MICRO_BATCH_MAX_SIZE) if MICRO_BATCH_ENABLED else None
+    state.DATA_VALID = read_dataset(DATA_VALID_PATH)
+    state.STATE_CITIES = read_dataset(STATE_CITIES_PATH)
+    phases.lap('reference_data')
 
     # Load the JSON file for BRAND_MODELS_BODYWORK
     with open(BRAND_MODELS_BODYWORK_PATH, 'r') as file:
-        app.state.BRAND_MODELS_BODYWORK = json.load(file)
+        state.BRAND_MODELS_BODYWORK = json.load(file)
+
+    # Valores aceitos em cada campo categórico do Car: o catálogo e tudo o
+    # que o modelo viu no treino
+    state.VOCABULARY = Vocabulary.from_data(
+        state.BRAND_MODELS_BODYWORK, state.DATA_VALID, state.STATE_CITIES,
+        state.ORIGINAL_DF, state.TRANSFORMER)
+
+    # Respostas das rotas de catálogo, serializadas uma vez por carga
+    state.CATALOGUE = Catalogue(
+        state.DATA_VALID, state.STATE_CITIES, state.BRAND_MODELS_BODYWORK)
+    state.SEARCH_INDEX = SearchIndex(
+        state.BRAND_MODELS_BODYWORK, state.STATE_CITIES)
+    phases.lap('catalogue')
+
+    # Representative configurations per (brand, model) for brand_predict
+    state.BRAND_PREDICTIONS = BrandPredictions(
+        state.ORIGINAL_DF, state.BRAND_MODELS_BODYWORK, state.ORIGINAL_INDEX)
+    if BRAND_PREDICT_WARMUP:
+        state.BRAND_PREDICTIONS.warmup(
+            state.MODEL, state.NORMALIZER, state.TRANSFORMER,
+            state.MODEL_SCHEMA.feature_names, state.FEATURE_STATS)
+    phases.lap('brand_predictions')
+
+    state.LOAD_PHASES = phases.phases
+    state.LOAD_SECONDS = time.perf_counter() - started
+    return state
+
+
+def warmup_state(state: AppState, budget_seconds: float = WARMUP_BUDGET_SECONDS):
+    """
+    Replays the fixture car and one car per brand through the prediction
+    pipeline of a freshly loaded state, within `budget_seconds`, so the
+    first real requests do not pay for lazy imports and cold code paths.
+    Rejects the state when its predictions fail or are not finite.
+    """
+    cars = representative_cars(WARMUP_FIXTURE_PATH, state.BRAND_MODELS_BODYWORK)
+    state.WARMUP = replay(state, cars, budget_seconds)
+    logger.info("Aquecimento: %d de %d carros em %.2fs",
+                state.WARMUP['cars'], state.WARMUP['total_cars'],
+                state.WARMUP['seconds'])
+
+
+artifact_reloader = ArtifactReloader(
+    app, load_state, warmup_state, ARTIFACTS_DIR)
+
+
+# Com PRELOAD_ARTIFACTS (gunicorn --preload) os artefatos são carregados no
+# processo mestre, antes do fork, e compartilhados copy-on-write pelos workers
+preloaded_state = load_state() if PRELOAD_ARTIFACTS else None
+if preloaded_state is not None:
+    # Evita que o GC dos workers toque (e copie) as páginas pré-carregadas
+    gc.freeze()
+
+
+@app.on_event('startup')
+async def startup_event():
+    state = preloaded_state or load_state()
+    startup_report.record(state.LOAD_PHASES, prefix='load.')
+    # Aquecido antes de ativar: /health/ready só responde 200 depois disso
+    phases = PhaseTimer()
+    warmup_state(state)
+    phases.lap('warmup')
+    artifact_reloader.activate(state)
+    phases.lap('activate')
+    startup_report.record(phases.phases)
+    startup_report.mark_ready(state.WARMUP)
+    logger.info("Startup concluído em %.2fs: %s",
+                startup_report.total_seconds(), startup_report.summary())
+    if ARTIFACTS_WATCH_INTERVAL:
+        artifact_reloader.start_watching(ARTIFACTS_WATCH_INTERVAL)
+
 
-    # Load valid brands from the JSON structure
-    config.load_valid_brands(BRAND_MODELS_BODYWORK_PATH)
+@app.on_event('shutdown')
+async def shutdown_event():
+    artifact_reloader.stop_watching()
+    prediction_executor.shutdown()
@@ -2,17 +2,88 @@ import os
 import json
 
 
-TRANSFORMER_PATH = os.path.join('artifacts', 'onehotencoder.pkl')
-NORMALIZER_PATH = os.path.join('artifacts', 'scaler.pkl')
-MODEL_PATH = os.path.join('artifacts', 'randfor_model.pkl')
+ARTIFACTS_DIR = os.getenv('ARTIFACTS_DIR', 'artifacts')
+
+TRANSFORMER_PATH = os.path.join(ARTIFACTS_DIR, 'onehotencoder.pkl')
+NORMALIZER_PATH = os.path.join(ARTIFACTS_DIR, 'scaler.pkl')
+MODEL_PATH = os.path.join(ARTIFACTS_DIR, 'randfor_model.pkl')
+MODEL_SCHEMA_PATH = os.path.join(ARTIFACTS_DIR, 'model_schema.json')
 X_TEST_PATH = os.path.join('data', 'X_test.csv')
 ORIGINAL_DF_PATH = os.path.join('data', 'clean_original_df.csv')
+DATA_VALID_PATH = os.path.join('data', 'data_valid.csv')
+STATE_CITIES_PATH = os.path.join('data', 'state_cities.csv')
+
+# Lê os datasets de referência da cópia colunar (apps/car/columnar.py)
+COLUMNAR_DATASETS = os.getenv('COLUMNAR_DATASETS', 'true').lower() in ('1', 'true', 'yes')
 BRAND_MODELS_BODYWORK_PATH = os.path.join('data', 'brand_model_bodywork.json')
 
+BATCH_PREDICT_MAX_ITEMS = int(os.getenv('BATCH_PREDICT_MAX_ITEMS', 10000))
+# Variantes (anos × quilometragens × localizações) por requisição em /car/scan
+MARKET_SCAN_MAX_VARIANTS = int(os.getenv('MARKET_SCAN_MAX_VARIANTS', 20000))
+
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 0)) or None
+
+PRELOAD_ARTIFACTS = os.getenv('PRELOAD_ARTIFACTS', 'false').lower() in ('1', 'true', 'yes')
+
+BRAND_PREDICT_WARMUP = os.getenv('BRAND_PREDICT_WARMUP', 'false').lower() in ('1', 'true', 'yes')
+
+# Aquecimento no startup e nas recargas: o carro da fixture e um por marca,
+# até esgotar o orçamento em segundos (apps/car/warmup.py)
+WARMUP_BUDGET_SECONDS = float(os.getenv('WARMUP_BUDGET_SECONDS', 5))
+WARMUP_FIXTURE_PATH = os.path.join('fixture', 'test_predict.json')
+
+PREDICT_EXECUTOR_WORKERS = int(os.getenv('PREDICT_EXECUTOR_WORKERS', 4))
+PREDICT_QUEUE_SIZE = int(os.getenv('PREDICT_QUEUE_SIZE', 64))
+PREDICT_TIMEOUT = float(os.getenv('PREDICT_TIMEOUT', 10))
+PREDICT_BLAS_THREADS = int(os.getenv('PREDICT_BLAS_THREADS', 1))
+PREDICT_MODEL_N_JOBS = int(os.getenv('PREDICT_MODEL_N_JOBS', 1))
+
+# 'sklearn' (padrão) ou 'flat' (FlatForest, apps/car/forest.py)
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'sklearn').lower()
+FLAT_FOREST_MAX_BATCH = int(os.getenv('FLAT_FOREST_MAX_BATCH', 128))
+
+# Quantis padrão das previsões das árvores em /car/predict?interval=true
+PREDICT_INTERVAL_QUANTILES = tuple(
+    float(quantile) for quantile in os.getenv('PREDICT_INTERVAL_QUANTILES', '0.1,0.9').split(','))
+
+MICRO_BATCH_ENABLED = os.getenv('MICRO_BATCH_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+MICRO_BATCH_WINDOW_MS = float(os.getenv('MICRO_BATCH_WINDOW_MS', 3))
+MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', 64))
+
+# Profiler por amostragem de requisições lentas (0 desativa)
+PROFILE_SLOW_REQUEST_MS = float(os.getenv('PROFILE_SLOW_REQUEST_MS', 0))
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 1))
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))
+PROFILE_OUTPUT_DIR = os.getenv('PROFILE_OUTPUT_DIR', 'profiles')
+
+# max-age do Cache-Control das rotas de catálogo (list, list-brands, list-states)
+CATALOGUE_CACHE_MAX_AGE = int(os.getenv('CATALOGUE_CACHE_MAX_AGE', 300))
+
+# Intervalo (segundos) da verificação de mudanças em ARTIFACTS_DIR (0 desativa)
+ARTIFACTS_WATCH_INTERVAL = float(os.getenv('ARTIFACTS_WATCH_INTERVAL', 0))
+
+
+def artifact_paths(artifacts_dir: str = ARTIFACTS_DIR) -> dict:
+    """
+    Paths of the artifact bundle in `artifacts_dir`. The reference dataset
+    is read from the bundle when it ships its own clean_original_df.csv.
+    """
+    original_df_path = os.path.join(artifacts_dir, 'clean_original_df.csv')
+    return {
+        'model': os.path.join(artifacts_dir, 'randfor_model.pkl'),
+        'normalizer': os.path.join(artifacts_dir, 'scaler.pkl'),
+        'transformer': os.path.join(artifacts_dir, 'onehotencoder.pkl'),
+        'model_schema': os.path.join(artifacts_dir, 'model_schema.json'),
+        'original_df': original_df_path if os.path.exists(original_df_path) else ORIGINAL_DF_PATH,
+    }
+
 
 class Config:
-    valid_brands = []
+    valid_brands = frozenset()
     brand_models_bodywork = {}
+    # apps.car.vocabulary.Vocabulary da carga ativa, usado pelo Car
+    vocabulary = None
 
     @classmethod
     def load_valid_brands(cls, json_path: str):
@@ -20,8 +91,23 @@ class Config:
         Loads the valid brands and models from the JSON file.
         """
         with open(json_path, 'r') as file:
-            cls.brand_models_bodywork = json.load(file)
-        cls.valid_brands = list(cls.brand_models_bodywork.keys())
+            cls.set_valid_brands(json.load(file))
+
+    @classmethod
+    def set_valid_brands(cls, brand_models_bodywork: dict):
+        """
+        Sets the valid brands and models from an already parsed JSON.
+        """
+        cls.brand_models_bodywork = brand_models_bodywork
+        cls.valid_brands = frozenset(cls.brand_models_bodywork)
+
+    @classmethod
+    def set_vocabulary(cls, vocabulary):
+        """
+        Sets the vocabulary every categorical field of Car is checked
+        against.
+        """
+        cls.vocabulary = vocabulary
 
 
 config = Config()
@@ -0,0 +1,68 @@
+import os
+import json
+
+import joblib
+import pytest
+
+# Token da API usado pelos testes das rotas; definido antes de importar o app
+AUTH_TOKEN = "test-token"
+os.environ.setdefault("AUTH_TOKEN", AUTH_TOKEN)
+
+from apps.car.columnar import read_dataset  # noqa: E402
+from settings import artifact_paths, WARMUP_FIXTURE_PATH  # noqa: E402
+
+PATHS = artifact_paths()
+
+# O randfor_model.pkl não é versionado: os testes que precisam do modelo
+# são pulados quando ele não está em artifacts/
+requires_model = pytest.mark.skipif(
+    not os.path.exists(PATHS['model']),
+    reason=f"{PATHS['model']} não encontrado")
+
+
+@pytest.fixture(scope="session")
+def transformer():
+    return joblib.load(PATHS['transformer'])
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    """
+    The training dataset (clean_original_df) as the API loads it.
+    """
+    return read_dataset(PATHS['original_df'], categorical=True)
+
+
+@pytest.fixture(scope="session")
+def fixture_car():
+    with open(WARMUP_FIXTURE_PATH) as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope="session")
+def state():
+    """
+    A fully loaded (and warmed) application state.
+    """
+    if not os.path.exists(PATHS['model']):
+        pytest.skip(f"{PATHS['model']} não encontrado")
+    import main
+    state = main.load_state()
+    main.warmup_state(state)
+    return state
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    In-process client of the application, started (artifacts loaded and
+    warmed) once per session.
+    """
+    if not os.path.exists(PATHS['model']):
+        pytest.skip(f"{PATHS['model']} não encontrado")
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(
+            main.app,
+            headers={"Authorization": f"Bearer {os.environ['AUTH_TOKEN']}"}) as client:
+        yield client
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from apps.admin import routes as admin_routes
+from apps.auth.middlewares import allowed_token_hashes
+
+ADMIN_TOKEN = "admin-token"
+
+
+@pytest.fixture
+def reloads(client, monkeypatch):
+    # Conta as recargas sem recarregar de fato os artefatos
+    calls = []
+
+    async def reload():
+        calls.append(True)
+        await asyncio.sleep(0)
+        return {"version": "stub"}
+
+    monkeypatch.setattr(client.app.state.RELOADER, "reload", reload)
+    return calls
+
+
+def test_reload_is_disabled_without_admin_token(client, reloads, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN_HASHES", ())
+    response = client.post("/admin/reload",
+                           headers={"X-Admin-Token": ADMIN_TOKEN})
+    assert response.status_code == 403
+    assert reloads == []
+
+
+def test_reload_requires_the_admin_token(client, reloads, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN_HASHES",
+                        allowed_token_hashes(ADMIN_TOKEN, None))
+    # O token da API, sozinho ou como token de administração, não basta
+    assert client.post("/admin/reload").status_code == 403
+    api_token = client.headers["Authorization"].removeprefix("Bearer ")
+    assert client.post("/admin/reload",
+                       headers={"X-Admin-Token": api_token}).status_code == 403
+    assert reloads == []
+
+    response = client.post("/admin/reload",
+                           headers={"X-Admin-Token": ADMIN_TOKEN})
+    assert response.status_code == 200
+    assert response.json() == {"version": "stub"}
+    assert reloads == [True]
+
+
+def test_admin_token_does_not_replace_the_api_token(client, reloads, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN_HASHES",
+                        allowed_token_hashes(ADMIN_TOKEN, None))
+    response = client.post("/admin/reload", headers={
+        "Authorization": "", "X-Admin-Token": ADMIN_TOKEN})
+    assert response.status_code == 401
+    assert reloads == []
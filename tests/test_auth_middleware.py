@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.auth.middlewares import (
+    AuthMiddleware, PUBLIC_PATHS, UNAUTHORIZED_BODY, allowed_token_hashes)
+from apps.auth.utils import hash_auth_token
+
+TOKEN = "plain-token"
+HASHED_TOKEN = "hashed-token"
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+
+    @app.get("/{path:path}")
+    async def echo(path: str):
+        return {"path": path}
+
+    # Um token em texto puro (AUTH_TOKEN) e outro só pelo hash
+    # (AUTH_TOKEN_HASHES)
+    hashes = allowed_token_hashes(TOKEN, hash_auth_token(HASHED_TOKEN))
+    app.add_middleware(AuthMiddleware, token_hashes=hashes)
+    return TestClient(app)
+
+
+def test_probes_and_metrics_are_public():
+    assert {"/metrics", "/health/live", "/health/ready"} <= PUBLIC_PATHS
+
+
+@pytest.mark.parametrize("path", sorted(PUBLIC_PATHS))
+def test_public_paths_need_no_token(client, path):
+    assert client.get(path).status_code == 200
+
+
+@pytest.mark.parametrize("token", [TOKEN, HASHED_TOKEN])
+def test_accepted_tokens(client, token):
+    response = client.get("/car/list-brands",
+                          headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json() == {"path": "car/list-brands"}
+
+
+@pytest.mark.parametrize("authorization", [
+    None,
+    "",
+    "Bearer",
+    "Bearer ",
+    "Bearer wrong-token",
+    f"Bearer {TOKEN}x",
+    f"bearer {TOKEN}",
+    f"Bearer  {TOKEN}",
+    f"Basic {TOKEN}",
+    f"Bearer {hash_auth_token(HASHED_TOKEN)}",  # o hash não é o token
+])
+def test_missing_or_malformed_token_is_rejected(client, authorization):
+    headers = {} if authorization is None else {"Authorization": authorization}
+    response = client.get("/car/list-brands", headers=headers)
+    assert response.status_code == 401
+    assert response.content == UNAUTHORIZED_BODY
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_public_path_prefixes_are_not_public(client):
+    assert client.get("/health/live/x").status_code == 401
+    assert client.get("/metrics/").status_code == 401
+
+
+def test_without_tokens_everything_private_is_rejected():
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware, token_hashes=())
+    client = TestClient(app)
+    assert client.get("/car/list-brands").status_code == 401
+    assert client.get("/car/list-brands",
+                      headers={"Authorization": "Bearer "}).status_code == 401
+
+
+@pytest.mark.parametrize("scope_type", ["lifespan", "websocket"])
+def test_non_http_scopes_pass_through(scope_type):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["type"])
+
+    async def send(message):
+        raise AssertionError(f"resposta inesperada: {message}")
+
+    middleware = AuthMiddleware(app, token_hashes=())
+    scope = {"type": scope_type, "path": "/ws", "headers": []}
+    asyncio.run(middleware(scope, None, send))
+    assert calls == [scope_type]
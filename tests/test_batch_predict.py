@@ -0,0 +1,66 @@
+import json
+
+from settings import BATCH_PREDICT_MAX_ITEMS
+
+
+def ndjson(*lines) -> str:
+    return "\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n"
+
+
+def test_mixed_batch_prices_the_valid_items(client, fixture_car):
+    expected = client.post("/car/predict", json=fixture_car).json()["predict"]
+    items = [
+        fixture_car,
+        {**fixture_car, "brand": "XX"},
+        {**fixture_car, "mileage": "muitos"},
+        42,
+        {**fixture_car, "year_model": fixture_car["year_model"] - 1},
+    ]
+    response = client.post("/car/predict/batch", json=items)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (5, 2, 3)
+
+    results = body["results"]
+    assert [result["index"] for result in results] == list(range(5))
+    assert results[0] == {"index": 0, "predict": expected}
+    assert "error" not in results[4] and results[4]["predict"]
+    for result in results[1:4]:
+        assert "predict" not in result and result["error"]
+    assert results[1]["error"][0]["loc"] == ["brand"]
+    assert results[2]["error"][0]["loc"] == ["mileage"]
+    assert results[3]["error"] == [{"loc": [], "msg": "Item deve ser um objeto JSON"}]
+
+
+def test_ndjson_malformed_line_is_an_item_error(client, fixture_car):
+    body = ndjson(fixture_car, '{"brand": "FIAT",', {**fixture_car, "state": "RJ"},
+                  fixture_car)
+    response = client.post("/car/predict/batch", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 4
+    assert results[0]["predict"] == results[3]["predict"]
+    assert results[1]["error"] == [{"loc": [], "msg": "Item deve ser um objeto JSON"}]
+    assert results[2]["error"][0]["loc"] == ["state"]
+
+
+def test_validate_only_does_not_predict(client, fixture_car):
+    body = client.post("/car/predict/batch?validate_only=true",
+                       json=[fixture_car, {**fixture_car, "gear": "XX"}]).json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert body["results"][0] == {"index": 0}
+
+
+def test_batch_limits(client, fixture_car):
+    too_large = client.post("/car/predict/batch",
+                            json=[fixture_car] * (BATCH_PREDICT_MAX_ITEMS + 1))
+    assert too_large.status_code == 413
+    assert str(BATCH_PREDICT_MAX_ITEMS) in too_large.json()["detail"]
+    assert client.post("/car/predict/batch",
+                       json=[fixture_car] * BATCH_PREDICT_MAX_ITEMS,
+                       params={"validate_only": "true"}).status_code == 200
+    assert client.post("/car/predict/batch", content="[{",
+                       headers={"Content-Type": "application/json"}).status_code == 400
+    assert client.post("/car/predict/batch", json=fixture_car).status_code == 400
@@ -0,0 +1,72 @@
+import pytest
+
+from apps.car import cache as cache_module
+from apps.car.cache import PredictionCache
+
+CAR = {"brand": "FIAT", "model": "UNO", "year_model": 2015, "mileage": 80000}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_key_is_canonical_and_versioned():
+    key = PredictionCache.make_key(CAR, "v1")
+    assert PredictionCache.make_key(dict(reversed(CAR.items())), "v1") == key
+    assert PredictionCache.make_key(CAR, "v2") != key
+    assert PredictionCache.make_key({**CAR, "mileage": 80001}, "v1") != key
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(maxsize=4, ttl=60)
+    cache.set("a", 1.0)
+    clock[0] += 59.9
+    assert cache.get("a") == 1.0
+    clock[0] += 0.1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_without_ttl_entries_do_not_expire(clock):
+    cache = PredictionCache(maxsize=4)
+    cache.set("a", 1.0)
+    clock[0] += 10 ** 9
+    assert cache.get("a") == 1.0
+
+
+def test_least_recently_used_is_evicted():
+    cache = PredictionCache(maxsize=2)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    assert cache.get("a") == 1.0  # "b" passa a ser o menos usado
+    cache.set("c", 3.0)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1.0, 3.0)
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("a", 4.0)  # regravar também renova a entrada
+    cache.set("d", 5.0)
+    assert cache.get("c") is None
+    assert cache.get("a") == 4.0
+
+
+def test_maxsize_zero_disables_the_cache():
+    cache = PredictionCache(maxsize=0)
+    cache.set("a", 1.0)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_set_version_clears_only_on_change():
+    cache = PredictionCache(maxsize=4)
+    cache.set_version("v1")
+    cache.set("a", 1.0)
+    cache.set_version("v1")
+    assert cache.get("a") == 1.0
+    cache.set_version("v2")
+    assert cache.get("a") is None
+    assert cache.stats()["version"] == "v2"
@@ -0,0 +1,127 @@
+import json
+
+import pandas as pd
+import pytest
+from starlette.responses import JSONResponse
+
+import main
+from apps.car.catalogue import Catalogue
+from settings import BRAND_MODELS_BODYWORK_PATH, CATALOGUE_CACHE_MAX_AGE
+from conftest import requires_model
+
+pytestmark = requires_model
+
+
+def baseline_category_page(data_valid, category, page, page_size):
+    # As rotas antes das páginas pré-serializadas
+    valid_values = data_valid[category].dropna().unique().tolist()
+    total_results = len(valid_values)
+    total_pages = (total_results + page_size - 1) // page_size
+    if page > total_pages:
+        page = total_pages
+    start = (page - 1) * page_size
+    return {"page": page, "page_size": page_size, "total_pages": total_pages,
+            "total_results": total_results,
+            category: valid_values[start:start + page_size]}
+
+
+def body_of(content) -> bytes:
+    return JSONResponse(content).body
+
+
+def catalogue_requests(state):
+    """
+    Every catalogue route with the response the previous routes built.
+    """
+    requests = []
+    for category in ("fuel", "gear"):
+        total = state.DATA_VALID[category].dropna().nunique()
+        for page_size in (1, 3, 10, total + 5):
+            for page in range(1, total + 3):
+                requests.append((
+                    f"/car/list/{category}?page={page}&page_size={page_size}",
+                    baseline_category_page(
+                        state.DATA_VALID, category, page, page_size)))
+    brands = state.BRAND_MODELS_BODYWORK
+    requests.append(("/car/list-brands", {"brands": list(brands)}))
+    for brand in list(brands)[:5]:
+        requests.append((f"/car/list-brands?brand={brand.lower()}",
+                         {"brand": brand, "models": list(brands[brand])}))
+        for model, bodyworks in list(brands[brand].items())[:3]:
+            requests.append((
+                f"/car/list-brands?brand={brand}&model={model}",
+                {"brand": brand, "model": model, "bodyworks": bodyworks}))
+    cities = state.STATE_CITIES
+    requests.append(("/car/list-states", {"states": cities.columns.tolist()}))
+    for uf in cities.columns:
+        requests.append((f"/car/list-states?state={uf.lower()}",
+                         {"state": uf, "cities": cities[uf].dropna().tolist()}))
+    return requests
+
+
+def test_bodies_match_the_previous_routes(client):
+    for url, expected in catalogue_requests(client.app.state):
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert response.content == body_of(expected), url
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["cache-control"] == (
+            f"public, max-age={CATALOGUE_CACHE_MAX_AGE}")
+
+
+def test_etag_is_stable(client):
+    state = client.app.state
+    rebuilt = Catalogue(
+        state.DATA_VALID, state.STATE_CITIES, state.BRAND_MODELS_BODYWORK)
+    first = client.get("/car/list-brands").headers["etag"]
+    assert client.get("/car/list-brands").headers["etag"] == first
+    # Mesmo conteúdo, mesmo ETag, em outra carga ou outro worker
+    assert rebuilt.brands.etag == first
+    assert client.get("/car/list/fuel?page=2&page_size=3").headers["etag"] == (
+        rebuilt.category_page("fuel", 2, 3).etag)
+    assert len({client.get(url).headers["etag"]
+                for url in ("/car/list-brands", "/car/list-states",
+                            "/car/list/fuel", "/car/list/gear")}) == 4
+
+
+@pytest.mark.parametrize("if_none_match", [
+    "{etag}", "W/{etag}", '"outro", {etag}', ' W/"outro" , W/{etag} ', "*"])
+def test_if_none_match_returns_304(client, if_none_match):
+    etag = client.get("/car/list-states?state=SP").headers["etag"]
+    response = client.get("/car/list-states?state=SP", headers={
+        "If-None-Match": if_none_match.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-type" not in response.headers
+
+
+@pytest.mark.parametrize("if_none_match", ['"outro"', 'W/"outro"', ""])
+def test_other_etags_return_the_body(client, if_none_match):
+    response = client.get("/car/list-states?state=SP",
+                          headers={"If-None-Match": if_none_match})
+    assert response.status_code == 200
+    assert response.json()["state"] == "SP"
+
+
+def test_etag_changes_after_a_reload(client, tmp_path, monkeypatch):
+    with open(BRAND_MODELS_BODYWORK_PATH) as file:
+        brands = json.load(file)
+    path = tmp_path / "brand_model_bodywork.json"
+    path.write_text(json.dumps({**brands, "ZZ MOTORS": {"ZZ": ["SUV"]}}))
+
+    etag = client.get("/car/list-brands").headers["etag"]
+    reloader = client.app.state.RELOADER
+    try:
+        monkeypatch.setattr(main, "BRAND_MODELS_BODYWORK_PATH", str(path))
+        # A recarga roda no event loop do app, como em POST /admin/reload
+        client.portal.call(reloader.reload)
+        response = client.get("/car/list-brands",
+                              headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["brands"][-1] == "ZZ MOTORS"
+    finally:
+        monkeypatch.undo()
+        client.portal.call(reloader.reload)
+    assert client.get("/car/list-brands").headers["etag"] == etag
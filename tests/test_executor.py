@@ -0,0 +1,67 @@
+import time
+import asyncio
+import threading
+
+import pytest
+from threadpoolctl import threadpool_info, threadpool_limits
+
+from apps.car.exceptions import PredictionQueueFullException
+from apps.car.executor import PredictionExecutor
+
+
+def blas_threads() -> set:
+    return {library['num_threads'] for library in threadpool_info()
+            if library['user_api'] == 'blas'}
+
+
+def test_blas_limit_holds_across_overlapping_calls():
+    if not blas_threads():
+        pytest.skip("nenhuma biblioteca BLAS carregada")
+    workers = 4
+    executor = PredictionExecutor(max_workers=workers, blas_threads=1)
+    # As chamadas só seguem quando todas as threads do pool estão dentro
+    barrier = threading.Barrier(workers, timeout=5)
+
+    def overlapping():
+        barrier.wait()
+        inside = blas_threads()
+        time.sleep(0.01)
+        return inside
+
+    async def run_all():
+        return await asyncio.gather(
+            *(executor.run(overlapping) for _ in range(workers * 3)))
+
+    try:
+        with threadpool_limits(limits=2, user_api='blas'):
+            executor.limit_threadpools()
+            assert blas_threads() == {1}
+            assert asyncio.run(run_all()) == [{1}] * workers * 3
+            # Nenhuma chamada restaura um limite salvo por outra
+            assert blas_threads() == {1}
+    finally:
+        executor.shutdown()
+
+
+def test_queue_full_is_rejected():
+    executor = PredictionExecutor(max_workers=1, max_queue=0)
+
+    async def run_two():
+        started = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def block():
+            loop.call_soon_threadsafe(started.set)
+            time.sleep(0.2)
+
+        first = asyncio.ensure_future(executor.run(block))
+        await started.wait()
+        with pytest.raises(PredictionQueueFullException):
+            await executor.run(block)
+        await first
+
+    try:
+        asyncio.run(run_two())
+        assert executor.stats()["rejected"] == 1
+    finally:
+        executor.shutdown()
@@ -0,0 +1,173 @@
+"""
+Paridade do feature store com o `transform_data` por requisição que ele
+substituiu: as médias por grupo pré-calculadas (FeatureStatistics), o
+`transform_data` atual e o FeatureLayout produzem exatamente a matriz de
+features do caminho antigo, colunas na mesma ordem.
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from apps.car.data_processing import transform_data
+from apps.car.feature_layout import FeatureLayout
+from apps.car.feature_store import FeatureStatistics
+from apps.car.model_schema import ModelSchema
+from apps.car.reference_data import RowIndex, categorize
+from settings import artifact_paths, X_TEST_PATH
+
+PATHS = artifact_paths()
+
+CAR_COLUMNS = ['brand', 'model', 'year_model', 'mileage', 'gear', 'fuel',
+               'bodywork', 'city', 'state']
+
+
+def baseline_transform_data(input_data, NORMALIZER, TRANSFORMER, X_test, df):
+    """
+    The per-request `transform_data` before the feature store, verbatim:
+    every group mean is a scan of the dataset.
+    """
+    current_year = pd.Timestamp.now().year
+    input_data['age_years'] = current_year - input_data['year_model']
+
+    input_data['brand_avg_price'] = input_data['brand'].apply(
+        lambda x: df[df['brand'] == x]['price'].mean() if x in df['brand'].values else 0
+    )
+    input_data['state_avg_price'] = input_data['state'].apply(
+        lambda x: df[df['state'] == x]['price'].mean() if x in df['state'].values else 0
+    )
+    input_data['city_avg_price'] = input_data['city'].apply(
+        lambda x: df[df['city'] == x]['price'].mean() if x in df['city'].values else 0
+    )
+
+    def calculate_price_deviation(row):
+        group = df[(df['model'] == row['model']) & (
+            df['year_model'] == row['year_model'])]
+        group_avg_price = group['price'].mean() if not group.empty else 0
+        return group_avg_price - row['brand_avg_price']
+
+    input_data['price_deviation'] = input_data.apply(
+        calculate_price_deviation, axis=1)
+
+    input_data['is_luxury_brand'] = input_data['brand'].apply(
+        lambda x: 1 if x in ['AUDI', 'BMW', 'MERCEDES', 'PORSCHE'] else 0
+    )
+
+    categorical_columns = [
+        'brand', 'model', 'gear', 'fuel', 'bodywork', 'city', 'state']
+    numerical_columns = [
+        'year_model', 'mileage', 'age_years', 'price_deviation',
+        'brand_avg_price', 'state_avg_price', 'city_avg_price',
+        'is_luxury_brand']
+
+    encoded_categorical = TRANSFORMER.transform(
+        input_data[categorical_columns])
+    encoded_categorical_df = pd.DataFrame(
+        encoded_categorical,
+        columns=TRANSFORMER.get_feature_names_out(categorical_columns),
+        index=input_data.index
+    )
+    normalized_numeric = NORMALIZER.transform(input_data[numerical_columns])
+    normalized_numeric_df = pd.DataFrame(
+        normalized_numeric,
+        columns=numerical_columns,
+        index=input_data.index
+    )
+    final_input_df = pd.concat(
+        [normalized_numeric_df, encoded_categorical_df], axis=1)
+
+    missing_columns = set(X_test.columns) - set(final_input_df.columns)
+    for col in missing_columns:
+        final_input_df[col] = 0
+    final_input_df = final_input_df[X_test.columns]
+
+    return final_input_df
+
+
+@pytest.fixture(scope="module")
+def normalizer():
+    return joblib.load(PATHS['normalizer'])
+
+
+@pytest.fixture(scope="module")
+def X_test():
+    return pd.read_csv(X_TEST_PATH)
+
+
+@pytest.fixture(scope="module")
+def baseline_df():
+    # O dataset como o caminho antigo o lia, direto do CSV
+    return pd.read_csv(PATHS['original_df'])
+
+
+@pytest.fixture(scope="module")
+def stats(dataset, transformer):
+    # Como em main.load_state
+    df = categorize(dataset, transformer)
+    index = RowIndex(df, [column for column in transformer.feature_names_in_
+                          if column in df.columns])
+    return FeatureStatistics.from_dataframe(df, index)
+
+
+@pytest.fixture(scope="module")
+def cars(baseline_df, fixture_car):
+    sample = baseline_df[CAR_COLUMNS].sample(300, random_state=0)
+    unseen = [
+        # Todos os valores categóricos desconhecidos pelo dataset/encoder
+        dict(brand='XX', model='YY', year_model=1990, mileage=1,
+             gear='XX', fuel='XX', bodywork='XX', city='ZZ', state='QQ'),
+        # Valores conhecidos, mas (modelo, ano) sem registros
+        dict(brand='HYUNDAI', model='HB20', year_model=2031, mileage=1,
+             gear='MANUAL', fuel='FLEX', bodywork='SUV', city='SAO PAULO',
+             state='SP'),
+        # Cidade conhecida em outro estado
+        {**fixture_car, 'state': 'RJ'},
+    ]
+    return pd.concat(
+        [pd.DataFrame([fixture_car]), sample, pd.DataFrame(unseen)],
+        ignore_index=True)[CAR_COLUMNS]
+
+
+@pytest.fixture(scope="module")
+def expected(cars, normalizer, transformer, X_test, baseline_df):
+    return baseline_transform_data(
+        cars.copy(), normalizer, transformer, X_test, baseline_df)
+
+
+def test_transform_data_matches_baseline(cars, expected, normalizer,
+                                         transformer, X_test, stats):
+    features = transform_data(
+        cars.copy(), normalizer, transformer, list(X_test.columns), stats)
+    assert list(features.columns) == list(X_test.columns)
+    assert np.array_equal(features.to_numpy(), expected.to_numpy())
+
+
+def test_transform_data_matches_baseline_per_row(cars, normalizer,
+                                                 transformer, X_test, stats,
+                                                 baseline_df):
+    for position in [0, 1, len(cars) - 3, len(cars) - 2, len(cars) - 1]:
+        car = cars.iloc[[position]].reset_index(drop=True)
+        features = transform_data(
+            car.copy(), normalizer, transformer, list(X_test.columns), stats)
+        assert np.array_equal(
+            features.to_numpy(),
+            baseline_transform_data(car.copy(), normalizer, transformer,
+                                    X_test, baseline_df).to_numpy())
+
+
+def test_feature_layout_matches_baseline(cars, expected, normalizer,
+                                         transformer, stats):
+    schema = ModelSchema.load(PATHS['model_schema'])
+    assert schema.feature_names == list(expected.columns)
+    layout = FeatureLayout(normalizer, transformer, schema.feature_names)
+    records = cars.to_dict('records')
+
+    assert np.array_equal(layout.transform_rows(records, stats),
+                          expected.to_numpy())
+    # Lotes pequenos seguem o caminho linha a linha
+    assert np.array_equal(layout.transform_rows(records[-5:], stats),
+                          expected.to_numpy()[-5:])
+    assert layout.transform_rows([], stats).shape == (0, layout.n_features)
+    for position, car in enumerate(records):
+        assert np.array_equal(layout.transform_row(car, stats)[0],
+                              expected.to_numpy()[position])
@@ -0,0 +1,56 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from apps.car.forest import FlatForest
+from settings import artifact_paths, X_TEST_PATH
+from conftest import requires_model
+
+pytestmark = requires_model
+
+
+@pytest.fixture(scope="module")
+def model():
+    model = joblib.load(artifact_paths()['model'])
+    model.n_jobs = 1
+    return model
+
+
+@pytest.fixture(scope="module")
+def X_test():
+    # Como o modelo recebe as features: arrays, sem nomes de colunas
+    return pd.read_csv(X_TEST_PATH).to_numpy()
+
+
+def test_predict_matches_sklearn_on_x_test(model, X_test):
+    # INFERENCE_BACKEND=flat troca o modelo de produção pelo FlatForest:
+    # as previsões têm de ser idênticas bit a bit
+    forest = FlatForest.from_sklearn(model)
+    assert np.array_equal(forest.predict(X_test), model.predict(X_test))
+
+    # Sem o fallback para o sklearn acima de max_batch_size
+    forest = FlatForest.from_sklearn(model, max_batch_size=len(X_test))
+    assert np.array_equal(forest.predict(X_test), model.predict(X_test))
+
+
+def test_predict_matches_sklearn_per_batch(model, X_test):
+    forest = FlatForest.from_sklearn(model)
+    expected = model.predict(X_test)
+    for start in range(0, len(X_test), forest.max_batch_size):
+        stop = start + forest.max_batch_size
+        assert np.array_equal(forest.predict(X_test[start:stop]),
+                              expected[start:stop])
+    for position in range(0, len(X_test), 97):
+        assert np.array_equal(forest.predict(X_test[[position]]),
+                              expected[[position]])
+
+
+def test_predict_quantiles_mean_matches_predict(model, X_test):
+    forest = FlatForest.from_sklearn(model)
+    batch = X_test[:forest.max_batch_size]
+    y_hat, quantiles = forest.predict_quantiles(batch, [0.5])
+    assert np.array_equal(y_hat, model.predict(batch))
+    trees = np.stack([estimator.predict(batch)
+                      for estimator in model.estimators_])
+    assert np.allclose(quantiles[0], np.median(trees, axis=0))
@@ -0,0 +1,86 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+
+from apps.car.market_scan import SCAN_COLUMNS, grid_columns, grid_size
+from settings import MARKET_SCAN_MAX_VARIANTS
+
+YEARS = [2016, 2018, 2020]
+MILEAGES = [0, 25000, 50000, 75000]
+LOCATIONS = [{"city": "SAO PAULO", "state": "SP"},
+             {"city": "CURITIBA", "state": "PR"}]
+
+
+@pytest.fixture(scope="module")
+def scan(fixture_car):
+    return {"car": fixture_car, "year_model": YEARS,
+            "mileage": {"start": 0, "stop": 75000, "step": 25000},
+            "locations": LOCATIONS}
+
+
+def expanded_cars(car):
+    # Ordem C da grade: o ano varia mais devagar, a localização mais rápido
+    return [{**car, "year_model": year, "mileage": mileage, **location}
+            for year in YEARS for mileage in MILEAGES for location in LOCATIONS]
+
+
+def test_grid_columns_order():
+    locations = [(location["city"], location["state"]) for location in LOCATIONS]
+    size = grid_size(YEARS, MILEAGES, locations)
+    columns = grid_columns(YEARS, MILEAGES, locations, np.arange(size) * 100)
+    assert size == len(YEARS) * len(MILEAGES) * len(LOCATIONS)
+    rows = list(zip(*(columns[name] for name in SCAN_COLUMNS)))
+    assert [row[:4] for row in rows] == [
+        (car["year_model"], car["mileage"], car["city"], car["state"])
+        for car in expanded_cars({})]
+    assert columns["predict"][:2] == ["0,00", "1,00"]
+
+
+def test_scan_matches_batch_predictions(client, scan, fixture_car):
+    response = client.post("/car/scan", json=scan)
+    assert response.status_code == 200
+    body = response.json()
+    cars = expanded_cars(fixture_car)
+    assert body["size"] == len(cars) == 24
+    assert list(body["columns"]) == SCAN_COLUMNS
+    assert body["columns"]["year_model"] == [car["year_model"] for car in cars]
+    assert body["columns"]["mileage"] == [car["mileage"] for car in cars]
+    assert body["columns"]["city"] == [car["city"] for car in cars]
+    assert body["columns"]["state"] == [car["state"] for car in cars]
+
+    batch = client.post("/car/predict/batch", json=cars).json()
+    assert body["columns"]["predict"] == [
+        result["predict"] for result in batch["results"]]
+
+
+def test_scan_csv_matches_json(client, scan):
+    columns = client.post("/car/scan?format=raw", json=scan).json()["columns"]
+    response = client.post("/car/scan?output=csv&format=raw", json=scan)
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == SCAN_COLUMNS
+    assert rows[1:] == [[str(value) for value in row]
+                        for row in zip(*(columns[name] for name in SCAN_COLUMNS))]
+
+
+def test_omitted_axes_are_fixed_to_the_car(client, fixture_car):
+    body = client.post("/car/scan", json={"car": fixture_car,
+                                          "year_model": YEARS}).json()
+    assert body["size"] == len(YEARS)
+    assert body["columns"]["mileage"] == [fixture_car["mileage"]] * len(YEARS)
+    assert body["columns"]["city"] == [fixture_car["city"]] * len(YEARS)
+
+
+def test_scan_limits(client, fixture_car):
+    too_large = {"car": fixture_car,
+                 "mileage": {"start": 0, "stop": MARKET_SCAN_MAX_VARIANTS}}
+    assert client.post("/car/scan", json=too_large).status_code == 413
+    assert client.post("/car/scan", json={"car": fixture_car, "mileage": []}).status_code == 422
+    assert client.post("/car/scan", json={
+        "car": fixture_car,
+        "locations": [{"city": "SAO PAULO", "state": "RJ"}]}).status_code == 422
+    assert client.post("/car/scan", json={
+        "car": fixture_car,
+        "year_model": {"start": 2020, "stop": 2010}}).status_code == 422
@@ -0,0 +1,36 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.auth.middlewares import allowed_token_hashes
+from apps.metrics import routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(routes, "METRICS_TOKEN_HASHES",
+                        allowed_token_hashes("metrics-token", None))
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("authorization, status_code", [
+    ("Bearer metrics-token", 200),
+    (None, 401),
+    ("Bearer wrong-token", 401),
+    ("Bearer metrics-token-and-more", 401),
+    # "Bearer " fora do início não é removido
+    ("metricsBearer -token", 401),
+    ("metrics-Bearer token", 401),
+])
+def test_metrics_token(client, authorization, status_code):
+    headers = {} if authorization is None else {"Authorization": authorization}
+    assert client.get("/metrics", headers=headers).status_code == status_code
+
+
+def test_metrics_without_token_are_public(monkeypatch):
+    monkeypatch.setattr(routes, "METRICS_TOKEN_HASHES", ())
+    app = FastAPI()
+    app.include_router(routes.router)
+    assert TestClient(app).get("/metrics").status_code == 200
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from apps.car.utils import format_price, format_prices, price_value, price_values, raw_prices
+
+
+@pytest.mark.parametrize("cents, text", [
+    (0, "0,00"),
+    (5, "0,05"),
+    (12345, "123,45"),
+    (8057110, "80.571,10"),
+    (99999999, "999.999,99"),
+    (108532356, "1.085.323,56"),
+    (123456789012, "1.234.567.890,12"),
+    (10 ** 17, "1.000.000.000.000.000,00"),
+    (-123456, "-1.234,56"),
+    (8057110.99, "80.571,10"),
+])
+def test_format_price(cents, text):
+    assert format_price(cents) == text
+    assert format_prices([cents]).tolist() == [text]
+
+
+def test_format_prices_matches_format_price_at_every_magnitude():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([
+        10 ** rng.uniform(0, 17, 20000),
+        -10 ** rng.uniform(0, 17, 2000),
+        # Fronteiras de cada quantidade de dígitos
+        10.0 ** np.arange(18), 10.0 ** np.arange(1, 18) - 1,
+    ])
+    assert format_prices(values).tolist() == [format_price(value) for value in values]
+
+
+def test_format_prices_of_8_and_more_digits():
+    values = np.arange(10 ** 7, 10 ** 7 + 2000) * 997
+    assert format_prices(values).tolist() == [format_price(value) for value in values]
+
+
+def test_format_prices_empty():
+    assert format_prices([]).tolist() == []
+    assert price_values([], "raw") == []
+
+
+def test_raw_prices_match_the_text():
+    values = np.array([8057110.99, 108532356.0, 12345.5, -123456.7])
+    assert raw_prices(values).tolist() == [80571.1, 1085323.56, 123.45, -1234.56]
+    assert price_values(values, "raw") == [price_value(value, "raw") for value in values]
+    assert price_values(values) == [price_value(value) for value in values]
+
+
+def test_format_query_parameter(client, fixture_car):
+    brl = client.post("/car/predict", json=fixture_car).json()["predict"]
+    raw = client.post("/car/predict?format=raw", json=fixture_car).json()["predict"]
+    assert isinstance(raw, float)
+    assert format_price(round(raw * 100)) == brl
+
+    batch = client.post("/car/predict/batch?format=raw", json=[fixture_car]).json()
+    assert batch["results"][0]["predict"] == raw
+
+    interval = client.post(
+        "/car/predict?interval=true&format=raw", json=fixture_car).json()
+    assert interval["predict"] == raw
+    assert all(isinstance(value, float)
+               for value in interval["interval"]["quantiles"].values())
+
+    brand = client.post("/car/brand_predict/BMW?format=raw").json()
+    assert all(isinstance(prediction["predicted_value"], float)
+               for prediction in brand["predictions"])
+
+    assert client.post("/car/predict?format=xx", json=fixture_car).status_code == 422
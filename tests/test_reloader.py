@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from apps.admin.exceptions import ArtifactReloadException
+from apps.admin.reloader import ArtifactReloader
+from apps.car.cache import PredictionCache
+from apps.car.schemas import Car
+from apps.car.vocabulary import Vocabulary
+from settings import Config, config
+
+CAR = {"brand": "FIAT", "model": "UNO", "year_model": 2015, "mileage": 80000,
+       "gear": "MANUAL", "fuel": "FLEX", "bodywork": "HATCH",
+       "city": "SAO PAULO", "state": "SP"}
+
+
+def make_state(brands: dict, version: str):
+    vocabulary = Vocabulary(
+        brands, ["MANUAL"], ["FLEX"], ["HATCH"], {"SP": ["SAO PAULO"]})
+    return SimpleNamespace(
+        VOCABULARY=vocabulary, BRAND_MODELS_BODYWORK=brands,
+        MODEL_VERSION=version, PREDICTION_CACHE=PredictionCache(maxsize=8))
+
+
+@pytest.fixture(autouse=True)
+def restore_config(monkeypatch):
+    for name in ("vocabulary", "valid_brands", "brand_models_bodywork"):
+        monkeypatch.setattr(Config, name, getattr(Config, name))
+
+
+def reloader_with(active, loaded, warmup):
+    app = SimpleNamespace(state=SimpleNamespace())
+    reloader = ArtifactReloader(app, lambda _: loaded, warmup, "artifacts")
+    reloader.activate(active)
+    return reloader
+
+
+def test_activate_switches_the_vocabulary():
+    active = make_state({"FIAT": ["UNO"]}, "v1")
+    loaded = make_state({"FORD": ["KA"]}, "v2")
+    reloader = reloader_with(active, loaded, lambda state: None)
+    assert config.vocabulary is active.VOCABULARY
+    Car(**CAR)
+
+    asyncio.run(reloader.reload())
+    assert config.vocabulary is loaded.VOCABULARY
+    with pytest.raises(ValidationError):
+        Car(**CAR)
+
+
+def test_failed_reload_keeps_the_active_vocabulary():
+    active = make_state({"FIAT": ["UNO"]}, "v1")
+    loaded = make_state({"FORD": ["KA"]}, "v2")
+
+    def warmup(state):
+        # O aquecimento valida contra o vocabulário do estado novo
+        Car.model_validate(
+            {**CAR, "brand": "FORD", "model": "KA"},
+            context={"vocabulary": state.VOCABULARY})
+        raise RuntimeError("bundle quebrado")
+
+    reloader = reloader_with(active, loaded, warmup)
+    with pytest.raises(ArtifactReloadException):
+        asyncio.run(reloader.reload())
+
+    assert config.vocabulary is active.VOCABULARY
+    assert Car(**CAR).brand == "FIAT"
+
+
+def test_reload_clears_the_shared_prediction_cache():
+    cache = PredictionCache(maxsize=8)
+    active = make_state({"FIAT": ["UNO"]}, "v1")
+    loaded = make_state({"FIAT": ["UNO"]}, "v2")
+    active.PREDICTION_CACHE = loaded.PREDICTION_CACHE = cache
+    reloader = reloader_with(active, loaded, lambda state: None)
+    cache.set(PredictionCache.make_key(CAR, "v1"), 1.0)
+
+    asyncio.run(reloader.reload())
+    assert cache.stats()["version"] == "v2"
+    assert cache.stats()["size"] == 0
+
+
+def test_failed_reload_keeps_the_prediction_cache():
+    cache = PredictionCache(maxsize=8)
+    active = make_state({"FIAT": ["UNO"]}, "v1")
+    loaded = make_state({"FIAT": ["UNO"]}, "v2")
+    active.PREDICTION_CACHE = loaded.PREDICTION_CACHE = cache
+
+    def warmup(state):
+        raise RuntimeError("bundle quebrado")
+
+    reloader = reloader_with(active, loaded, warmup)
+    key = PredictionCache.make_key(CAR, "v1")
+    cache.set(key, 1.0)
+    with pytest.raises(ArtifactReloadException):
+        asyncio.run(reloader.reload())
+    assert cache.stats()["version"] == "v1"
+    assert cache.get(key) == 1.0
@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+from apps.car.exceptions import InvalidSearchTypeException
+from apps.car.search import SEARCH_TYPES, SearchIndex, normalize
+
+BRANDS = {
+    "FIAT": {"UNO": ["HATCH"], "PALIO WEEKEND": ["PERUA"], "STRADA": ["PICAPE"]},
+    "VOLKSWAGEN": {"GOL": ["HATCH"], "SAVEIRO": ["PICAPE"], "SANTANA": ["SEDAN"]},
+}
+STATE_CITIES = pd.DataFrame({
+    "MA": ["SÃO LUÍS", "SÃO JOSÉ DE RIBAMAR", None, None],
+    "SP": ["SÃO PAULO", "SANTOS", "SANTO ANDRÉ", "SÃO LUIZ DO PARAITINGA"],
+})
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(BRANDS, STATE_CITIES)
+
+
+def names(results) -> list:
+    return [result.get("city") or result.get("model") or result.get("bodywork")
+            or result["brand"] for result in results]
+
+
+def test_normalize():
+    assert normalize("  São   Luís ") == "SAO LUIS"
+    assert normalize("ação") == "ACAO"
+    assert normalize("Santo André") == normalize("SANTO ANDRE")
+
+
+@pytest.mark.parametrize("query", ["sao l", "SÃO L", "São   Lu", "SAO LU"])
+def test_accent_and_case_insensitive(index, query):
+    assert names(index.search(query, ["city"])) == [
+        "SÃO LUÍS", "SÃO LUIZ DO PARAITINGA"]
+
+
+def test_later_words_match_by_prefix(index):
+    # "luis" encontra "SÃO LUÍS"; "weekend", o "PALIO WEEKEND"
+    assert names(index.search("luis", ["city"])) == ["SÃO LUÍS"]
+    assert names(index.search("weeke")) == ["PALIO WEEKEND"]
+    assert names(index.search("paraitinga")) == ["SÃO LUIZ DO PARAITINGA"]
+    # Só o início das palavras: o meio de uma palavra não casa
+    assert index.search("aulo") == []
+    assert index.search("eekend") == []
+    assert index.search("  ") == []
+
+
+def test_whole_names_come_before_word_matches(index):
+    # Nomes que começam pelo termo, em ordem alfabética, e depois as
+    # palavras seguintes; cada entrada aparece uma vez
+    assert names(index.search("san")) == [
+        "SANTANA", "SANTO ANDRÉ", "SANTOS"]
+    assert names(index.search("p")) == [
+        "PALIO WEEKEND", "PERUA", "PICAPE",
+        "SÃO LUIZ DO PARAITINGA", "SÃO PAULO"]
+    assert names(index.search("s", limit=100)) == [
+        "SANTANA", "SANTO ANDRÉ", "SANTOS", "SÃO JOSÉ DE RIBAMAR",
+        "SÃO LUÍS", "SÃO LUIZ DO PARAITINGA", "SÃO PAULO", "SAVEIRO",
+        "SEDAN", "STRADA"]
+
+
+def test_limit_keeps_the_order(index):
+    everything = index.search("s", limit=100)
+    for limit in range(1, len(everything) + 1):
+        assert index.search("s", limit=limit) == everything[:limit]
+
+
+def test_types_and_scopes(index):
+    assert index.search("fiat") == [{"type": "brand", "brand": "FIAT"}]
+    assert index.search("picape") == [{"type": "bodywork", "bodywork": "PICAPE"}]
+    assert names(index.search("sa", ["model"])) == ["SANTANA", "SAVEIRO"]
+    assert names(index.search("sa", ["model"], brand="FIAT")) == []
+    assert names(index.search("s", ["model"], brand="FIAT")) == ["STRADA"]
+    assert names(index.search("sao", ["city"], state="MA")) == [
+        "SÃO JOSÉ DE RIBAMAR", "SÃO LUÍS"]
+    assert index.search("sao", ["city"], state="MA")[0] == {
+        "type": "city", "state": "MA", "city": "SÃO JOSÉ DE RIBAMAR"}
+
+
+def test_invalid_search_type_exception():
+    error = InvalidSearchTypeException("color", SEARCH_TYPES)
+    assert error.status_code == 400
+    assert "color" in error.detail and "brand, model, bodywork, city" in error.detail
+
+
+@pytest.mark.parametrize("type_", ["color", "brand,color", "brand,"])
+def test_route_rejects_unknown_types(client, type_):
+    response = client.get("/car/search", params={"q": "a", "type": type_})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("type inválido")
+
+
+def test_route(client):
+    body = client.get("/car/search",
+                      params={"q": "são pa", "type": "City", "state": "sp"}).json()
+    assert body["query"] == "são pa"
+    assert {"type": "city", "state": "SP", "city": "SAO PAULO"} in body["results"]
+    assert len(client.get("/car/search",
+                          params={"q": "s", "limit": 3}).json()["results"]) == 3
+    assert client.get("/car/search", params={"q": "a", "brand": "xx"}).status_code == 400
+    assert client.get("/car/search", params={"q": "a", "state": "xx"}).status_code == 400
+    assert client.get("/car/search", params={"q": "a", "limit": 101}).status_code == 422
@@ -0,0 +1,40 @@
+import time
+import threading
+
+from apps.metrics.stages import STAGE_SECONDS, observe_stage, stages_not_recorded
+
+
+def count(stage: str) -> int:
+    series = STAGE_SECONDS._values.get((stage,))
+    return 0 if series is None else series[2]
+
+
+def test_stages_not_recorded():
+    before = count('test_stage')
+    observe_stage('test_stage', time.perf_counter())
+    assert count('test_stage') == before + 1
+
+    with stages_not_recorded():
+        observe_stage('test_stage', time.perf_counter())
+    assert count('test_stage') == before + 1
+
+    observe_stage('test_stage', time.perf_counter())
+    assert count('test_stage') == before + 2
+
+
+def test_other_threads_keep_recording():
+    before = count('test_thread_stage')
+    inside, done = threading.Event(), threading.Event()
+
+    def warmup():
+        with stages_not_recorded():
+            inside.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=warmup)
+    thread.start()
+    inside.wait(5)
+    observe_stage('test_thread_stage', time.perf_counter())
+    done.set()
+    thread.join()
+    assert count('test_thread_stage') == before + 1
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from apps.car.training import StageCache, latest_listings, prepare_dataset, read_crawl
+
+CRAWL = 'data/machinetable.csv'
+
+
+def listing(id, crawl_date, price, city='SAO PAULO'):
+    return {'id': id, 'crawl_date': crawl_date, 'price': price,
+            'brand': 'FIAT', 'model': 'UNO', 'year_model': 2015,
+            'mileage': 80000, 'gear': 'MANUAL', 'fuel': 'FLEX',
+            'bodywork': 'HATCH', 'city': city, 'state': 'SP'}
+
+
+def test_latest_listings_keeps_the_latest_crawl_of_each_id():
+    raw = pd.DataFrame([
+        listing('a', '2025-01-20 10:00:00-03:00', 300),
+        listing('b', '2025-01-18 10:00:00-03:00', 100),
+        listing('a', '2025-01-18 10:00:00-03:00', 200),
+        listing('c', None, 400),
+        listing('c', '2025-01-19 10:00:00-03:00', 500),
+        listing('b', '2025-01-18 10:00:00-03:00', 150),
+    ])
+    latest = latest_listings(raw)
+    # Na ordem do dump; empate no mesmo instante: a última linha
+    assert latest['id'].tolist() == ['a', 'c', 'b']
+    assert latest['price'].tolist() == [300, 500, 150]
+
+
+def test_relisted_ids_enter_training_once():
+    raw = read_crawl([CRAWL]).head(200)
+    # Os 50 primeiros anúncios recapturados dois dias depois
+    relisted = raw.head(50).assign(crawl_date='2099-01-01 00:00:00-03:00')
+    clean, _, partitions = prepare_dataset(
+        pd.concat([raw, relisted], ignore_index=True), StageCache(), n_jobs=1)
+    expected, _, _ = prepare_dataset(raw, StageCache(), n_jobs=1)
+    assert len(clean) == len(expected)
+    assert partitions['2099-01-01']['raw_rows'] == 50
+
+
+BUNDLE = ['randfor_model.pkl', 'scaler.pkl', 'onehotencoder.pkl',
+          'model_schema.json', 'clean_original_df.csv', 'X_test.csv',
+          'training_report.json']
+
+
+def test_cli_exports_a_loadable_bundle(tmp_path):
+    result = subprocess.run(
+        [sys.executable, '-m', 'apps.car.training', CRAWL,
+         '--output', str(tmp_path), '--cache-dir', '',
+         '--n-estimators', '5', '--n-jobs', '1'],
+        capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout)
+    assert sorted(os.listdir(tmp_path)) == sorted(BUNDLE)
+    with open(tmp_path / 'training_report.json') as file:
+        assert json.load(file) == {k: v for k, v in report.items() if k != 'seconds'}
+    assert report['params']['n_estimators'] == 5
+    assert report['metrics']['test_rows'] == len(pd.read_csv(tmp_path / 'X_test.csv'))
+
+    import main
+    state = main.load_state(str(tmp_path))
+    # O aquecimento rejeita o estado se alguma previsão falhar ou não for finita
+    main.warmup_state(state)
+    assert state.WARMUP['cars'] > 0
+    assert len(state.ORIGINAL_DF) == report['rows']
+    X_test = pd.read_csv(tmp_path / 'X_test.csv')
+    assert np.isfinite(state.MODEL.predict(X_test[state.MODEL_SCHEMA.feature_names].to_numpy())).all()
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from apps.car.columnar import read_dataset
+from apps.car.schemas import Car
+from apps.car.vocabulary import Vocabulary
+from settings import BRAND_MODELS_BODYWORK_PATH, DATA_VALID_PATH, STATE_CITIES_PATH
+
+CATEGORICAL_FIELDS = ['brand', 'model', 'gear', 'fuel', 'bodywork', 'city', 'state']
+
+
+@pytest.fixture(scope="module")
+def vocabulary(dataset, transformer):
+    # Montado como em main.load_state
+    with open(BRAND_MODELS_BODYWORK_PATH) as file:
+        brand_models_bodywork = json.load(file)
+    return Vocabulary.from_data(
+        brand_models_bodywork, read_dataset(DATA_VALID_PATH),
+        read_dataset(STATE_CITIES_PATH), dataset, transformer)
+
+
+def test_every_training_row_is_accepted(vocabulary, dataset):
+    rejected = [
+        (position, errors)
+        for position, row in enumerate(
+            dataset[CATEGORICAL_FIELDS].astype(object).to_dict('records'))
+        for errors in [vocabulary.errors(row)] if errors]
+    assert rejected == []
+
+
+def test_encoder_categories_are_accepted(vocabulary, transformer):
+    for column, categories in zip(
+            transformer.feature_names_in_, transformer.categories_):
+        if column in ('gear', 'fuel', 'bodywork'):
+            assert set(categories) <= getattr(vocabulary, column + 's')
+
+
+def test_fixture_car_is_accepted(vocabulary, fixture_car):
+    assert vocabulary.errors(fixture_car) == []
+
+
+def test_hierarchy_is_checked(vocabulary, fixture_car):
+    errors = vocabulary.errors(
+        {**fixture_car, "model": "X6", "city": "SAO PAULO", "state": "RJ"})
+    assert [error["loc"] for error in errors] == [["model"], ["state"]]
+
+
+def test_errors_match_car_validators(vocabulary, fixture_car, monkeypatch):
+    from settings import config
+    monkeypatch.setattr(config, "vocabulary", vocabulary)
+    payloads = [
+        {**fixture_car, "brand": "XX"},
+        {**fixture_car, "model": "X6"},
+        {**fixture_car, "gear": "XX", "fuel": "XX", "bodywork": "XX"},
+        {**fixture_car, "city": "XX", "state": "XX"},
+    ]
+    for payload in payloads:
+        with pytest.raises(ValidationError) as raised:
+            Car(**payload)
+        expected = [{"loc": list(error["loc"]), "msg": error["msg"]}
+                    for error in raised.value.errors()]
+        assert vocabulary.errors(payload) == expected
@@ -0,0 +1,16 @@
+from apps.car.warmup import replay, representative_cars
+from apps.metrics.stages import STAGE_SECONDS
+from settings import WARMUP_FIXTURE_PATH
+
+
+def stage_counts() -> dict:
+    return {labels: series[2] for labels, series in STAGE_SECONDS._values.items()}
+
+
+def test_replay_is_not_recorded_in_stage_metrics(state):
+    cars = representative_cars(WARMUP_FIXTURE_PATH, state.BRAND_MODELS_BODYWORK)
+    before = stage_counts()
+    warmup = replay(state, cars, budget_seconds=5)
+    assert warmup["cars"] == len(cars)
+    assert warmup["invalid"] == 0
+    assert stage_counts() == before